@@ -191,15 +191,17 @@ async def get_ap_live_data(
 async def get_ap_history(
     host: str,
     period: str = "24h",
+    max_points: int | None = None,
     service: APService = Depends(get_ap_service),
     current_user: User = Depends(require_technician),
 ):
     """
     Obtiene historial de métricas (tráfico, señal, clientes conectados) para gráficos.
-    Periodos soportados: '24h', '7d', '30d'.
+    Periodos soportados: '24h', '7d', '30d'. Como máximo max_points puntos
+    (HISTORY_MAX_POINTS por defecto).
     """
     try:
-        return await service.get_ap_history(host, period)
+        return await service.get_ap_history(host, period, max_points)
     except APNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except APDataError as e:
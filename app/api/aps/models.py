@@ -117,5 +117,6 @@ class HistoryDataPoint(BaseModel):
 class APHistoryResponse(BaseModel):
     host: str
     hostname: str | None = None
+    resolution: str = "raw"  # "raw" | "1h" | "1d"
     history: list[HistoryDataPoint]
     model_config = ConfigDict(from_attributes=True)
@@ -73,7 +73,7 @@ async def ap_resources_stream(websocket: WebSocket, host: str):
                     interval = 2
 
             # Read from cache
-            data = stats_cache.get(host)
+            data = await stats_cache.get_async(host)
 
             if data:
                 if "error" in data:
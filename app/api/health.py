@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 from app.utils.cache.manager import cache_manager
+from app.db.status_buffer import status_buffer
 from app.services.bot_manager import bot_manager
+from app.services.monitor_job import read_monitor_load
+from app.services.poll_leases import poll_leases
+from app.services.polling_engine import polling_engine
+from app.utils.device_clients.airos_session import airos_sessions
+from app.utils.device_clients.mikrotik.capabilities import capability_cache
+from app.utils.device_clients.mikrotik.client_index import client_index
+from app.utils.device_clients.mikrotik.connection import session_pool
 
 router = APIRouter()
 
@@ -10,6 +18,13 @@ async def get_system_health():
     Returns the system health status including:
     - Cache status (Legacy/Redict)
     - Bot status (Client/Tech)
+    - Polling engine (jobs, workers in flight, dispatch lag)
+    - Live polling leases held by this worker (multi-worker with Redict)
+    - Monitor job load per time slot (last cycle)
+    - RouterOS session pool / AirOS session cache (reuse vs new logins)
+    - MikroTik wireless capability cache (probes avoided)
+    - MikroTik CPE enrichment index (ARP/DHCP resyncs vs targeted lookups)
+    - Device status write-behind buffer (immediate vs batched writes)
     """
     # Cache Stats
     cache_stats = cache_manager.get_stats()
@@ -20,5 +35,13 @@ async def get_system_health():
     return {
         "status": "ok",
         "cache": cache_stats,
-        "bots": bot_stats
+        "bots": bot_stats,
+        "polling": polling_engine.get_stats(),
+        "poll_leases": poll_leases.get_stats(),
+        "monitor_load": read_monitor_load(),
+        "router_sessions": session_pool.get_stats(),
+        "airos_sessions": airos_sessions.get_stats(),
+        "wireless_capabilities": capability_cache.get_stats(),
+        "client_index": client_index.get_stats(),
+        "status_buffer": status_buffer.get_stats(),
     }
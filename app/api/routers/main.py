@@ -112,7 +112,7 @@ async def router_resources_stream(websocket: WebSocket, host: str):
                 interval = 2
 
             # Leer del Cache
-            data = stats_cache.get(host)
+            data = await stats_cache.get_async(host)
 
             if data:
                 if "error" in data:
@@ -352,17 +352,20 @@ async def get_queue_stats(
 async def get_router_history(
     host: str,
     range_hours: int = 24,
+    max_points: int | None = None,
     current_user: User = Depends(require_technician),
     session: AsyncSession = Depends(get_session),
 ):
     """
     Get historical stats for a router (CPU, Memory, etc.) over time.
-    Default range is last 24 hours.
+    Default range is last 24 hours. Long ranges are served from the 1h/1d
+    rollups (averages plus <metric>_min/<metric>_max) so the response stays
+    within max_points points.
     """
     from ...db.stats_db import get_router_monitor_stats_history
 
-    data = await get_router_monitor_stats_history(session, host, range_hours)
-    return {"status": "success", "data": data}
+    resolution, data = await get_router_monitor_stats_history(session, host, range_hours, max_points)
+    return {"status": "success", "resolution": resolution, "data": data}
 
 
 # --- Inclusión de los otros módulos de la API de routers ---
@@ -485,7 +488,7 @@ async def repair_router_connection(
 
     elif action == "unprovision":
         # Reset connection state
-        reset_result = monitor_scheduler.reset_connection(host)
+        reset_result = await monitor_scheduler.reset_connection(host)
 
         # Mark as not provisioned
         update_data = {"is_provisioned": False}
@@ -35,22 +35,13 @@ async def get_top_aps_by_airtime(
     Returns top APs by airtime usage.
     """
     try:
-        # We need the latest stats for each AP.
-        # Efficient way in SQLModel: Join AP with APStats on subquery?
-        # Or just window function via raw SQL like stats_db, but APStats is now in same DB.
-        
-        # Using raw SQL for window function support is cleaner for "latest by group"
+        # We need the latest stats for each AP: ap_latest_stats holds exactly
+        # one row per AP, so this no longer scans the apstats history.
         query = text(f"""
-            WITH LatestStats AS (
-                SELECT 
-                    ap_host, airtime_total_usage,
-                    ROW_NUMBER() OVER(PARTITION BY ap_host ORDER BY timestamp DESC) as rn
-                FROM apstats
-                WHERE airtime_total_usage IS NOT NULL
-            )
             SELECT a.hostname, a.host, s.airtime_total_usage
             FROM aps as a 
-            JOIN LatestStats s ON a.host = s.ap_host AND s.rn = 1
+            JOIN ap_latest_stats s ON a.host = s.ap_host
+            WHERE s.airtime_total_usage IS NOT NULL
             ORDER BY s.airtime_total_usage DESC 
             LIMIT :limit;
         """)
@@ -82,16 +73,9 @@ async def get_top_cpes_by_weak_signal(
 ):
     try:
         query = text(f"""
-            WITH LatestCPEStats AS (
-                SELECT 
-                    *,
-                    ROW_NUMBER() OVER(PARTITION BY cpe_mac ORDER BY timestamp DESC) as rn
-                FROM cpestats
-                WHERE signal IS NOT NULL
-            )
             SELECT cpe_hostname, cpe_mac, ap_host, signal
-            FROM LatestCPEStats
-            WHERE rn = 1
+            FROM cpe_latest_stats
+            WHERE signal IS NOT NULL
             ORDER BY signal ASC 
             LIMIT :limit;
         """)
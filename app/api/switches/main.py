@@ -115,7 +115,7 @@ async def switch_resources_stream(websocket: WebSocket, host: str):
         stats_cache = cache_manager.get_store("switch_stats")
 
         while True:
-            data = stats_cache.get(host)
+            data = await stats_cache.get_async(host)
 
             if data:
                 if "error" in data:
@@ -24,7 +24,16 @@ from app.models.switch import Switch
 from app.models.ticket import Ticket
 from app.models.user import User
 from app.models.zona import Zona
-from app.models.stats import RouterStats, APStats, CPEStats, EventLog, DisconnectionEvent
+from app.models.stats import (
+    RouterStats,
+    APStats,
+    APLatestStats,
+    CPEStats,
+    CPELatestStats,
+    StatsRollup,
+    EventLog,
+    DisconnectionEvent,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -56,6 +65,20 @@ def bootstrap_system() -> None:
             else:
                 raise e
 
+        # 1b. Latest-stats tables (one row per AP / CPE) from existing history
+        from app.db.stats_db import backfill_latest_stats
+        try:
+            with Session(sync_engine) as session:
+                backfill_latest_stats(session)
+        except Exception as e:
+            logger.warning(f"⚠️ [Bootstrap] Could not backfill latest stats: {e}")
+
+        # 1c. PostgreSQL: stats/event tables partitioned by timestamp (retention drops partitions)
+        if not _is_sqlite_dialect():
+            from app.db.retention_db import setup_partitioning
+            with Session(sync_engine) as session:
+                setup_partitioning(session)
+
         # 2. Initialize default data (dialect-aware)
         if _is_sqlite_dialect():
             # Legacy SQLite initialization with raw SQL
@@ -53,7 +53,9 @@ class ConnectionManager:
         
         self._listener_started = True
         
+        near_cache = None
         try:
+            from app.utils.cache.near_cache import near_cache
             from app.utils.cache.redict_store import redict_manager
             
             if not redict_manager.is_connected:
@@ -68,8 +70,17 @@ class ConnectionManager:
             
             await pubsub.subscribe("chat:updates")
             logger.info("✅ Escuchando canal 'chat:updates' de Redict")
+
+            # Invalidaciones del near-cache (mismo listener, otro canal)
+            near_channel = near_cache.channel.encode()
+            if near_cache.stores:
+                await pubsub.subscribe(near_cache.channel)
+                near_cache.activate()
             
             async for message in pubsub.listen():
+                if message["type"] == "message" and message["channel"] == near_channel:
+                    near_cache.handle_message(message["data"])
+                    continue
                 logger.debug(f"📬 Redict raw message: {message}")
                 if message["type"] == "message":
                     try:
@@ -93,6 +104,8 @@ class ConnectionManager:
             logger.error(f"Error en Redict listener: {e}")
         finally:
             self._listener_started = False
+            if near_cache is not None and near_cache.active:
+                near_cache.deactivate()
 
 
 manager = ConnectionManager()
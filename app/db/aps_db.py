@@ -49,28 +49,34 @@ async def get_ap_status(session: AsyncSession, host: str) -> str | None:
         return None
 
 
+def ap_status_fields(status: str, data: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Columnas de AP a actualizar tras un poll (metadatos solo si está online)."""
+    now = datetime.utcnow()
+    updates = {"last_status": status, "last_checked": now}
+
+    if status == DeviceStatus.ONLINE and data:
+        if "host" in data and isinstance(data.get("host"), dict):
+            # Legacy Ubiquiti format
+            host_info = data.get("host", {})
+            interfaces = data.get("interfaces", [{}, {}])
+            updates["mac"] = interfaces[1].get("hwaddr") if len(interfaces) > 1 else None
+            updates["hostname"] = host_info.get("hostname")
+            updates["model"] = host_info.get("devmodel")
+            updates["firmware"] = host_info.get("fwversion")
+        else:
+            updates["mac"] = data.get("mac")
+            updates["hostname"] = data.get("hostname")
+            updates["model"] = data.get("model")
+            updates["firmware"] = data.get("firmware")
+
+        updates["last_seen"] = now
+    return updates
+
+
 async def update_ap_status(session: AsyncSession, host: str, status: str, data: dict[str, Any] | None = None):
     """Actualiza el estado de un AP, y opcionalmente sus metadatos si está online."""
     try:
-        now = datetime.utcnow()
-        updates = {"last_status": status, "last_checked": now}
-        
-        if status == DeviceStatus.ONLINE and data:
-            if "host" in data and isinstance(data.get("host"), dict):
-                # Legacy Ubiquiti format
-                host_info = data.get("host", {})
-                interfaces = data.get("interfaces", [{}, {}])
-                updates["mac"] = interfaces[1].get("hwaddr") if len(interfaces) > 1 else None
-                updates["hostname"] = host_info.get("hostname")
-                updates["model"] = host_info.get("devmodel")
-                updates["firmware"] = host_info.get("fwversion")
-            else:
-                updates["mac"] = data.get("mac")
-                updates["hostname"] = data.get("hostname")
-                updates["model"] = data.get("model")
-                updates["firmware"] = data.get("firmware")
-                
-            updates["last_seen"] = now
+        updates = ap_status_fields(status, data)
 
         # Use efficient update
         stmt = select(AP).where(AP.host == host)
@@ -129,18 +135,12 @@ async def create_ap_in_db(session: AsyncSession, ap_data: dict[str, Any]) -> dic
 async def get_all_aps_with_stats(session: AsyncSession) -> list[dict[str, Any]]:
     """Obtiene todos los APs, uniendo los datos de estado más recientes de la DB de estadísticas."""
     try:
-        # Unified query using SQLModel/SQLAlchemy text for Window Function
+        # Latest stats per AP are kept in ap_latest_stats (upserted with each save)
         query = text("""
-            WITH LatestStats AS (
-                SELECT 
-                    ap_host, client_count, airtime_total_usage,
-                    ROW_NUMBER() OVER(PARTITION BY ap_host ORDER BY timestamp DESC) as rn
-                FROM apstats
-            )
             SELECT a.*, z.nombre as zona_nombre, s.client_count, s.airtime_total_usage
             FROM aps AS a
             LEFT JOIN zonas AS z ON a.zona_id = z.id
-            LEFT JOIN LatestStats AS s ON a.host = s.ap_host AND s.rn = 1
+            LEFT JOIN ap_latest_stats AS s ON a.host = s.ap_host
             ORDER BY a.host;
         """)
         
@@ -167,18 +167,13 @@ async def get_ap_by_host_with_stats(session: AsyncSession, host: str) -> dict[st
     """Obtiene un AP específico, uniendo sus datos de estado más recientes."""
     try:
         query = text("""
-            WITH LatestStats AS (
-                SELECT *, ROW_NUMBER() OVER(PARTITION BY ap_host ORDER BY timestamp DESC) as rn
-                FROM apstats
-                WHERE ap_host = :host
-            )
             SELECT 
                 a.*, z.nombre as zona_nombre, s.client_count, s.airtime_total_usage, s.airtime_tx_usage, 
                 s.airtime_rx_usage, s.total_throughput_tx, s.total_throughput_rx, s.noise_floor, s.chanbw, 
                 s.frequency, s.essid, s.total_tx_bytes, s.total_rx_bytes, s.gps_lat, s.gps_lon, s.gps_sats
             FROM aps AS a
             LEFT JOIN zonas AS z ON a.zona_id = z.id
-            LEFT JOIN LatestStats AS s ON a.host = s.ap_host AND s.rn = 1
+            LEFT JOIN ap_latest_stats AS s ON a.host = s.ap_host
             WHERE a.host = :host;
         """)
         
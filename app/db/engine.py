@@ -58,5 +58,11 @@ async def create_db_and_tables():
     Create all tables defined in SQLModel models.
     Call this at application startup after importing all models.
     """
+    from app.db.engine_sync import create_missing_indexes
+
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    # Fuera de la transacción: en PostgreSQL los índices se crean CONCURRENTLY
+    async with engine.connect() as conn:
+        await conn.run_sync(create_missing_indexes)
+        await conn.commit()
@@ -4,12 +4,17 @@ Synchronous SQLModel database engine.
 Supports SQLite (default) and PostgreSQL via DATABASE_URL_SYNC environment variable.
 """
 
+import logging
 import os
+import re
 from collections.abc import Generator
 
-from sqlalchemy import event
+from sqlalchemy import Engine, event, inspect
+from sqlalchemy.schema import CreateIndex
 from sqlmodel import Session, SQLModel, create_engine
 
+logger = logging.getLogger(__name__)
+
 # --- Database URL Configuration ---
 # Read DATABASE_URL_SYNC from environment. If not set, default to SQLite.
 DATABASE_URL_SYNC = os.getenv("DATABASE_URL_SYNC")
@@ -46,8 +51,60 @@ def get_sync_session() -> Generator[Session, None, None]:
         yield session
 
 
+def _create_index_concurrently(conn, index) -> None:
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS: no bloquea escrituras en la tabla."""
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+    ddl = re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX CONCURRENTLY ", ddl, count=1)
+    try:
+        conn.exec_driver_sql(ddl)
+    except Exception:
+        # Un CONCURRENTLY fallido deja el índice INVALID y IF NOT EXISTS lo saltaría siempre
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+        raise
+
+
+def create_missing_indexes(bind) -> list[str]:
+    """
+    create_all() solo crea índices junto con tablas nuevas; en bases ya
+    existentes los índices declarados después (ej. __table_args__ de
+    app/models/stats.py) se crean aquí. Idempotente (checkfirst).
+
+    En PostgreSQL se crean con CREATE INDEX CONCURRENTLY en una conexión
+    autocommit, para no bloquear los INSERT de stats mientras se construye el
+    índice de una tabla grande. CONCURRENTLY no puede ir en una transacción ni
+    esperar a una abierta: pasar un Engine o una Connection sin transacción
+    (si ya hay una, se crean de forma normal dentro de ella).
+    """
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            created = create_missing_indexes(conn)
+            conn.commit()
+            return created
+
+    concurrently = bind.dialect.name == "postgresql" and not bind.in_transaction()
+    if concurrently:
+        bind.execution_options(isolation_level="AUTOCOMMIT")
+
+    created = []
+    inspector = inspect(bind)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for index in table.indexes:
+            if not inspector.has_index(table.name, index.name):
+                if concurrently:
+                    _create_index_concurrently(bind, index)
+                else:
+                    index.create(bind, checkfirst=True)
+                created.append(index.name)
+    return created
+
+
 def create_sync_db_and_tables():
     """
     Create all tables with SYNC engine.
     """
     SQLModel.metadata.create_all(sync_engine)
+    created = create_missing_indexes(sync_engine)
+    if created:
+        logger.info(f"[DB] Created missing indexes: {', '.join(created)}")
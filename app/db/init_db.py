@@ -41,10 +41,18 @@ def _setup_inventory_db():
         ("client_bot_token", ""),
         ("days_before_due", "5"),
         ("default_monitor_interval", "300"),
+        ("monitor_schedule_mode", "burst"),  # burst | spread (reparte checks en el intervalo)
         ("dashboard_refresh_interval", "5"),
         ("suspension_run_hour", "02:00"),
         ("db_backup_run_hour", "04:00"),
         ("cpe_stale_cycles", "3"),  # Number of cycles to wait before marking CPE offline
+        ("retention_run_hour", "03:30"),
+        # Días de histórico crudo por tabla (0 = sin límite)
+        ("retention_days_cpestats", "30"),
+        ("retention_days_apstats", "90"),
+        ("retention_days_routerstats", "90"),
+        ("retention_days_event_logs", "90"),
+        ("retention_days_disconnection_events", "90"),
     ]
     cursor.executemany(
         "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", default_settings
@@ -0,0 +1,295 @@
+# app/db/retention_db.py
+"""
+Retención del histórico de alto volumen (cpestats, apstats, routerstats,
+event_logs, disconnection_events).
+
+- Días de retención por tabla en settings (`retention_days_<tabla>`, 0 = sin
+  límite). Los gráficos de rangos largos salen de stats_rollups, que no se
+  purga aquí.
+- SQLite (y PostgreSQL sin particionar): DELETE por lotes de
+  RETENTION_BATCH_SIZE filas, cada uno en su propia transacción y con una
+  pausa entre lotes, para no retener el lock de escritura (el monitor sigue
+  guardando stats mientras tanto).
+- PostgreSQL: las tablas se convierten a particionado por rango de timestamp
+  (STATS_PARTITION_DAYS días por partición). Purgar es un DROP TABLE de las
+  particiones vencidas en lugar de borrar fila a fila. Una partición DEFAULT
+  recoge lo que cae fuera de las particiones creadas (p. ej. si el job no
+  corrió durante semanas), así los INSERT nunca fallan; ensure_partitions()
+  mueve esas filas a su partición al crearla.
+"""
+
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, text
+from sqlmodel import Session
+
+from ..models.setting import Setting
+from ..models.stats import APStats, CPEStats, DisconnectionEvent, EventLog, RouterStats
+from .rollups_db import bucket_start
+
+logger = logging.getLogger(__name__)
+
+RETENTION_TABLES = {
+    "cpestats": CPEStats,
+    "apstats": APStats,
+    "routerstats": RouterStats,
+    "event_logs": EventLog,
+    "disconnection_events": DisconnectionEvent,
+}
+DEFAULT_RETENTION_DAYS = {
+    "cpestats": 30,
+    "apstats": 90,
+    "routerstats": 90,
+    "event_logs": 90,
+    "disconnection_events": 90,
+}
+
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+STATS_PG_PARTITIONING = os.getenv("STATS_PG_PARTITIONING", "true").lower() == "true"
+STATS_PARTITION_DAYS = int(os.getenv("STATS_PARTITION_DAYS", "7"))
+PARTITIONS_AHEAD = 3  # Particiones futuras pre-creadas (el job corre a diario)
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def retention_setting_key(table: str) -> str:
+    return f"retention_days_{table}"
+
+
+def get_retention_days(session: Session, table: str) -> int:
+    setting = session.get(Setting, retention_setting_key(table))
+    try:
+        return int(setting.value) if setting and setting.value != "" else DEFAULT_RETENTION_DAYS[table]
+    except (ValueError, TypeError):
+        return DEFAULT_RETENTION_DAYS[table]
+
+
+def delete_expired_rows(
+    session: Session,
+    model,
+    cutoff: datetime,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    pause: float = RETENTION_BATCH_PAUSE,
+) -> int:
+    """Borra filas con timestamp < cutoff en lotes acotados. Devuelve filas borradas."""
+    table = model.__table__
+    total = 0
+    while True:
+        batch = select(table.c.id).where(table.c.timestamp < cutoff).limit(batch_size)
+        deleted = session.execute(delete(table).where(table.c.id.in_(batch))).rowcount
+        session.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+        time.sleep(pause)
+
+
+# --- PostgreSQL: particionado por rango ---
+
+
+def _partition_step() -> timedelta:
+    return timedelta(days=STATS_PARTITION_DAYS)
+
+
+def is_partitioned(session: Session, table: str) -> bool:
+    return bool(
+        session.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}
+        ).scalar()
+    )
+
+
+def list_partitions(session: Session, table: str) -> list[tuple[str, datetime | None]]:
+    """(nombre, límite superior) de cada partición; None si no tiene (DEFAULT)."""
+    rows = session.execute(
+        text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:t)
+        """),
+        {"t": table},
+    ).all()
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND.search(bound or "")
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None))
+    return partitions
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def _create_partition(session: Session, table: str, name: str, lower: datetime, upper: datetime) -> None:
+    """
+    Crea la partición [lower, upper). Si la DEFAULT ya tiene filas de ese rango,
+    CREATE ... PARTITION OF fallaría: se crea suelta, se mueven las filas y se
+    adjunta, todo en la transacción del llamador.
+    """
+    default = default_partition(table)
+    ts = '"timestamp"'
+    bounds = {"lower": lower, "upper": upper}
+    values = f"FOR VALUES FROM ('{lower.isoformat(' ')}') TO ('{upper.isoformat(' ')}')"
+    stranded = session.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {ts} >= :lower AND {ts} < :upper)'),  # nosec B608
+        bounds,
+    ).scalar()
+    if not stranded:
+        session.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {values}'))  # nosec B608
+        return
+
+    session.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+    moved = session.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE {ts} >= :lower AND {ts} < :upper RETURNING *) '  # nosec B608
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    ).rowcount
+    session.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {values}'))  # nosec B608
+    logger.warning(f"[Retention] {moved} filas de {default} movidas a {name}")
+
+
+def ensure_partitions(session: Session, table: str, now: datetime | None = None) -> list[str]:
+    """
+    Crea la partición DEFAULT si falta y las particiones de rango que falten
+    hasta PARTITIONS_AHEAD por delante de `now`.
+    """
+    session.execute(
+        text(f'CREATE TABLE IF NOT EXISTS "{default_partition(table)}" PARTITION OF "{table}" DEFAULT')  # nosec B608
+    )
+    step = _partition_step()
+    now = now or datetime.utcnow()
+    horizon = bucket_start(now, step) + step * (PARTITIONS_AHEAD + 1)
+    uppers = [upper for _, upper in list_partitions(session, table) if upper]
+    lower = max(uppers) if uppers else bucket_start(now, step)
+
+    created = []
+    while lower < horizon:
+        upper = lower + step
+        name = f"{table}_p{lower:%Y%m%d}"
+        _create_partition(session, table, name, lower, upper)
+        created.append(name)
+        lower = upper
+    session.commit()
+    return created
+
+
+def drop_expired_partitions(session: Session, table: str, cutoff: datetime) -> list[str]:
+    """
+    DROP de las particiones cuyo rango termina antes de cutoff. Lo vencido que
+    haya quedado en la DEFAULT (filas anteriores a la primera partición) se
+    borra fila a fila.
+    """
+    dropped = []
+    for name, upper in list_partitions(session, table):
+        if upper is not None and upper <= cutoff:
+            session.execute(text(f'DROP TABLE "{name}"'))  # nosec B608 - Nombre leído de pg_class
+            dropped.append(name)
+    session.execute(
+        text(f'DELETE FROM "{default_partition(table)}" WHERE "timestamp" < :cutoff'),  # nosec B608
+        {"cutoff": cutoff},
+    )
+    session.commit()
+    return dropped
+
+
+def migrate_to_partitioned(session: Session, model, now: datetime | None = None) -> bool:
+    """
+    Convierte una tabla de histórico en particionada por rango de timestamp.
+
+    La tabla existente no se copia: se renombra a <tabla>_legacy y se adjunta
+    como partición (MINVALUE, inicio de la siguiente partición), así que la
+    migración no reescribe filas; la partición legacy se elimina entera cuando
+    vence. Sus índices se reutilizan al crear los del padre. Idempotente.
+    """
+    table = model.__tablename__
+    if is_partitioned(session, table):
+        return False
+
+    step = _partition_step()
+    now = now or datetime.utcnow()
+    legacy = f"{table}_legacy"
+    ts = '"timestamp"'
+
+    session.execute(text(f'ALTER TABLE "{table}" RENAME TO "{legacy}"'))
+    session.execute(text(f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{table}_pkey" TO "{legacy}_pkey"'))
+    for index in model.__table__.indexes:
+        session.execute(text(f'ALTER INDEX IF EXISTS "{index.name}" RENAME TO "{index.name}_legacy"'))
+
+    session.execute(
+        text(f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS) PARTITION BY RANGE ({ts})')
+    )
+    session.execute(text(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, {ts})'))
+    sequence = session.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": legacy}).scalar()
+    if sequence:
+        session.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id'))
+
+    newest = session.execute(text(f'SELECT max({ts}) FROM "{legacy}"')).scalar()  # nosec B608
+    if newest is None:
+        session.execute(text(f'DROP TABLE "{legacy}"'))
+    else:
+        upper = bucket_start(max(now, newest), step) + step
+        bound = upper.isoformat(" ")
+        # CHECK validado antes de adjuntar: ATTACH no vuelve a recorrer la tabla
+        session.execute(
+            text(f'ALTER TABLE "{legacy}" ADD CONSTRAINT "{legacy}_range" CHECK ({ts} < \'{bound}\') NOT VALID')
+        )
+        session.execute(text(f'ALTER TABLE "{legacy}" VALIDATE CONSTRAINT "{legacy}_range"'))
+        session.execute(
+            text(f'ALTER TABLE "{table}" ATTACH PARTITION "{legacy}" FOR VALUES FROM (MINVALUE) TO (\'{bound}\')')
+        )
+
+    for index in model.__table__.indexes:
+        index.create(session.connection())
+    session.commit()
+
+    ensure_partitions(session, table, now)
+    logger.info(f"[Retention] {table} convertida a particionada por {ts} ({STATS_PARTITION_DAYS} días)")
+    return True
+
+
+def setup_partitioning(session: Session) -> None:
+    """Bootstrap (solo PostgreSQL): migra las tablas y crea particiones futuras."""
+    if session.bind.dialect.name != "postgresql" or not STATS_PG_PARTITIONING:
+        return
+    for table, model in RETENTION_TABLES.items():
+        try:
+            migrate_to_partitioned(session, model)
+            ensure_partitions(session, table)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"[Retention] No se pudo particionar {table}: {e}")
+
+
+# --- Job ---
+
+
+def apply_retention(session: Session, now: datetime | None = None) -> dict[str, dict[str, int]]:
+    """
+    Purga cada tabla según su retención. En PostgreSQL particionado además
+    pre-crea las particiones futuras (aunque la retención esté desactivada).
+    """
+    now = now or datetime.utcnow()
+    postgres = session.bind.dialect.name == "postgresql"
+    result = {}
+    for table, model in RETENTION_TABLES.items():
+        partitioned = postgres and is_partitioned(session, table)
+        if partitioned:
+            ensure_partitions(session, table, now)
+
+        days = get_retention_days(session, table)
+        if days <= 0:
+            continue
+        cutoff = now - timedelta(days=days)
+        if partitioned:
+            dropped = drop_expired_partitions(session, table, cutoff)
+            result[table] = {"partitions_dropped": len(dropped)}
+        else:
+            result[table] = {"rows_deleted": delete_expired_rows(session, model, cutoff)}
+    return result
@@ -0,0 +1,265 @@
+# app/db/rollups_db.py
+"""
+Rollups del histórico de routers y APs (buckets de 1 hora y 1 día).
+
+Los gráficos de 7d/30d devolvían cada fila cruda: ~8.600 objetos ORM por AP
+a 5 minutos. Ahora:
+
+- El crudo (una fila por ciclo del monitor) sigue en routerstats / apstats.
+- run_rollups() (job del scheduler) agrega los buckets completos en
+  stats_rollups con min/avg/max/last por métrica. Es incremental: retoma desde
+  el último bucket guardado y lo recalcula por si llegaron filas tarde.
+- get_history_points() elige la resolución según el rango y el presupuesto de
+  puntos (HISTORY_MAX_POINTS). Lo posterior al último bucket agregado se
+  calcula al vuelo desde el crudo, así el gráfico llega hasta "ahora".
+"""
+
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.stats import APStats, RouterStats, StatsRollup
+from .stats_db import upsert_statement
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_POINTS = int(os.getenv("HISTORY_MAX_POINTS", "1000"))
+
+# Resoluciones agregadas, de la más fina a la más gruesa
+RESOLUTIONS = {
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+EPOCH = datetime(1970, 1, 1)
+ROLLUP_WINDOW = timedelta(days=1)  # Crudo leído por consulta en el job
+
+
+@dataclass(frozen=True)
+class RollupSource:
+    model: type
+    host_field: str
+    metrics: tuple[str, ...]
+
+    @property
+    def host_column(self):
+        return getattr(self.model, self.host_field)
+
+
+ROLLUP_SOURCES = {
+    "router": RollupSource(
+        RouterStats,
+        "router_host",
+        ("cpu_load", "free_memory", "total_memory", "free_hdd", "total_hdd", "voltage", "temperature"),
+    ),
+    "ap": RollupSource(
+        APStats,
+        "ap_host",
+        (
+            "client_count",
+            "cpuload",
+            "freeram",
+            "noise_floor",
+            "airtime_total_usage",
+            "airtime_tx_usage",
+            "airtime_rx_usage",
+            "total_throughput_tx",
+            "total_throughput_rx",
+        ),
+    ),
+}
+
+
+def bucket_start(ts: datetime, step: timedelta) -> datetime:
+    """Inicio del bucket (alineado a UTC) que contiene `ts`."""
+    return ts - (ts - EPOCH) % step
+
+
+def _aggregate(
+    rows: Iterable[tuple], metrics: tuple[str, ...], step: timedelta
+) -> dict[tuple[str, datetime], tuple[int, dict[str, list]]]:
+    """
+    rows: (host, timestamp, *valores) ordenadas por timestamp.
+    Returns: (host, bucket) -> (samples, {métrica: [min, avg, max, last]}).
+    """
+    acc: dict[tuple[str, datetime], list] = {}
+    for host, ts, *values in rows:
+        key = (host, bucket_start(ts, step))
+        entry = acc.get(key)
+        if entry is None:
+            # [samples, [[min, sum, count, max, last], ...]]
+            entry = acc[key] = [0, [[None, 0.0, 0, None, None] for _ in metrics]]
+        entry[0] += 1
+        for m, value in zip(entry[1], values):
+            if value is None:
+                continue
+            m[0] = value if m[0] is None else min(m[0], value)
+            m[3] = value if m[3] is None else max(m[3], value)
+            m[1] += value
+            m[2] += 1
+            m[4] = value
+
+    return {
+        key: (
+            samples,
+            {
+                name: [m[0], round(m[1] / m[2], 3) if m[2] else None, m[3], m[4]]
+                for name, m in zip(metrics, per_metric)
+            },
+        )
+        for key, (samples, per_metric) in acc.items()
+    }
+
+
+def _raw_statement(src: RollupSource, start: datetime, end: datetime, host: str | None = None):
+    statement = select(
+        src.host_column, src.model.timestamp, *(getattr(src.model, m) for m in src.metrics)
+    ).where(src.model.timestamp >= start, src.model.timestamp < end)
+    if host is not None:
+        statement = statement.where(src.host_column == host)
+    return statement.order_by(src.model.timestamp.asc())
+
+
+# --- Job (sync, proceso del scheduler) ---
+
+
+def rollup_source(session: Session, source: str, resolution: str, now: datetime | None = None) -> int:
+    """Agrega los buckets completos pendientes de una fuente. Devuelve filas escritas."""
+    src = ROLLUP_SOURCES[source]
+    step = RESOLUTIONS[resolution]
+    end = bucket_start(now or datetime.utcnow(), step)
+
+    start = session.exec(
+        select(func.max(StatsRollup.bucket)).where(
+            StatsRollup.source == source, StatsRollup.resolution == resolution
+        )
+    ).one()
+    if start is None:
+        # Primera ejecución: desde el inicio del histórico
+        first = session.exec(select(func.min(src.model.timestamp))).one()
+        if first is None:
+            return 0
+        start = bucket_start(first, step)
+
+    written = 0
+    window = max(step, ROLLUP_WINDOW)
+    while start < end:
+        stop = min(start + window, end)
+        buckets = _aggregate(session.exec(_raw_statement(src, start, stop)), src.metrics, step)
+        rows = [
+            {
+                "source": source,
+                "resolution": resolution,
+                "host": host,
+                "bucket": bucket,
+                "samples": samples,
+                "metrics": metrics,
+            }
+            for (host, bucket), (samples, metrics) in buckets.items()
+        ]
+        if rows:
+            session.execute(upsert_statement(session, StatsRollup), rows)
+        session.commit()
+        written += len(rows)
+        start = stop
+    return written
+
+
+def run_rollups(session: Session, now: datetime | None = None) -> dict[str, int]:
+    """Todas las fuentes y resoluciones. Idempotente."""
+    now = now or datetime.utcnow()
+    result = {}
+    for source in ROLLUP_SOURCES:
+        for resolution in RESOLUTIONS:
+            result[f"{source}:{resolution}"] = rollup_source(session, source, resolution, now)
+    return result
+
+
+# --- Lectura (async, API) ---
+
+
+def pick_resolution(start: datetime, end: datetime, max_points: int) -> str:
+    """La resolución agregada más fina que cabe en el presupuesto (o la más gruesa)."""
+    span = end - start
+    for resolution, step in RESOLUTIONS.items():
+        if span / step <= max_points:
+            return resolution
+    return list(RESOLUTIONS)[-1]
+
+
+def _bucket_point(bucket: datetime, metrics: dict[str, list]) -> dict[str, Any]:
+    point: dict[str, Any] = {"timestamp": bucket}
+    for name, (low, avg, high, _last) in metrics.items():
+        point[name] = avg
+        point[f"{name}_min"] = low
+        point[f"{name}_max"] = high
+    return point
+
+
+async def get_history_points(
+    session: AsyncSession,
+    source: str,
+    host: str,
+    start: datetime,
+    end: datetime | None = None,
+    max_points: int = HISTORY_MAX_POINTS,
+) -> tuple[str, list[dict[str, Any]]]:
+    """
+    Serie histórica acotada a `max_points` puntos.
+
+    Returns:
+        (resolution, points). resolution es "raw", "1h" o "1d". Cada punto trae
+        "timestamp" y una clave por métrica; los agregados traen además
+        "<métrica>_min" / "<métrica>_max" (el valor principal es la media).
+    """
+    src = ROLLUP_SOURCES[source]
+    end = end or datetime.utcnow()
+    max_points = max(1, min(max_points, HISTORY_MAX_POINTS))
+
+    raw_count = (
+        await session.exec(
+            select(func.count())
+            .select_from(src.model)
+            .where(src.host_column == host, src.model.timestamp >= start, src.model.timestamp < end)
+        )
+    ).one()
+    if raw_count <= max_points:
+        rows = await session.exec(_raw_statement(src, start, end, host))
+        return "raw", [
+            {"timestamp": ts, **dict(zip(src.metrics, values))} for _host, ts, *values in rows
+        ]
+
+    resolution = pick_resolution(start, end, max_points)
+    step = RESOLUTIONS[resolution]
+    rollups = (
+        await session.exec(
+            select(StatsRollup)
+            .where(
+                StatsRollup.source == source,
+                StatsRollup.resolution == resolution,
+                StatsRollup.host == host,
+                StatsRollup.bucket >= bucket_start(start, step),
+                StatsRollup.bucket < end,
+            )
+            .order_by(StatsRollup.bucket.asc())
+        )
+    ).all()
+    points = [_bucket_point(r.bucket, r.metrics) for r in rollups]
+
+    # Cola aún no agregada por el job (bucket en curso, o todo si nunca corrió)
+    tail_start = rollups[-1].bucket + step if rollups else bucket_start(start, step)
+    if tail_start < end:
+        tail = _aggregate(
+            await session.exec(_raw_statement(src, tail_start, end, host)), src.metrics, step
+        )
+        points += [_bucket_point(bucket, metrics) for (_h, bucket), (_s, metrics) in sorted(tail.items())]
+
+    if len(points) > max_points:
+        points = points[:: math.ceil(len(points) / max_points)]
+    return resolution, points
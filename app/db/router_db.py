@@ -136,21 +136,24 @@ async def get_router_status(session: AsyncSession, host: str) -> str | None:
         return None
 
 
+def router_status_fields(status: str, data: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Columnas de router a actualizar tras un poll (metadatos solo si está online)."""
+    update_data = {"last_status": status, "last_checked": datetime.utcnow()}
+
+    if status == DeviceStatus.ONLINE and data:
+        update_data["hostname"] = data.get("name")
+        update_data["model"] = data.get("board-name")
+        update_data["firmware"] = data.get("version")
+    return update_data
+
+
 async def update_router_status(session: AsyncSession, host: str, status: str, data: dict[str, Any] | None = None):
     """
     Actualiza el estado de un router en la base de datos.
     Si el estado es 'online', también actualiza el hostname, modelo y firmware.
     """
     try:
-        now = datetime.utcnow()
-        update_data = {"last_status": status, "last_checked": now}
-
-        if status == DeviceStatus.ONLINE and data:
-            update_data["hostname"] = data.get("name")
-            update_data["model"] = data.get("board-name")
-            update_data["firmware"] = data.get("version")
-
-        await update_router_in_db(session, host, update_data)
+        await update_router_in_db(session, host, router_status_fields(status, data))
 
     except Exception as e:
         logging.error(f"Error en router_db.update_router_status para {host}: {e}")
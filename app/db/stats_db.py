@@ -1,16 +1,28 @@
 
+import asyncio
 import logging
+import os
+import time
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import text
-from sqlmodel import select
+from sqlalchemy import insert, text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..models.stats import APStats, CPEStats, DisconnectionEvent, RouterStats
+from ..models.stats import (
+    APLatestStats,
+    APStats,
+    CPELatestStats,
+    CPEStats,
+    DisconnectionEvent,
+    RouterStats,
+)
 from ..services.cpe_service import CPEService
 from ..db.engine import get_session
 
+if TYPE_CHECKING:
+    from ..utils.device_clients.adapters.base import DeviceStatus
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,25 +53,295 @@ async def save_router_monitor_stats(
 
 
 async def get_router_monitor_stats_history(
-    session: AsyncSession, router_host: str, range_hours: int = 24
-) -> list[RouterStats]:
-    """Obtiene historial de estadísticas de router."""
+    session: AsyncSession, router_host: str, range_hours: int = 24, max_points: int | None = None
+) -> tuple[str, list[dict[str, Any]]]:
+    """
+    Obtiene historial de estadísticas de router, acotado a max_points puntos.
+    Returns: (resolution, points) - ver rollups_db.get_history_points.
+    """
+    from datetime import timedelta
+
+    from .rollups_db import HISTORY_MAX_POINTS, get_history_points
+
     try:
         # Calculate time threshold in Python to be DB-agnostic
-        from datetime import timedelta
         threshold = datetime.utcnow() - timedelta(hours=range_hours)
-        
-        statement = (
-            select(RouterStats)
-            .where(RouterStats.router_host == router_host)
-            .where(RouterStats.timestamp >= threshold)
-            .order_by(RouterStats.timestamp.asc())
+        return await get_history_points(
+            session, "router", router_host, threshold, max_points=max_points or HISTORY_MAX_POINTS
         )
-        result = await session.exec(statement)
-        return list(result.all())
     except Exception as e:
         logger.error(f"Error fetching router history for {router_host}: {e}")
-        return []
+        return "raw", []
+
+
+def upsert_statement(session, model):
+    """
+    INSERT ... ON CONFLICT (pk) DO UPDATE para SQLite y PostgreSQL.
+    Las filas van como parámetros (`session.execute(stmt, rows)`, executemany):
+    la sentencia compilada se cachea, a diferencia de .values([...]).
+    """
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    key = [c.name for c in model.__table__.primary_key]
+    stmt = insert(model.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=key,
+        set_={c.name: stmt.excluded[c.name] for c in model.__table__.columns if c.name not in key},
+    )
+
+
+COPY_MIN_ROWS = 200  # Con asyncpg, COPY a partir de este número de filas
+
+# Lote del monitor: se escribe al juntar STATS_BATCH_APS APs o a los
+# STATS_BATCH_MAX_AGE segundos del primero (modo spread), y al final del ciclo
+STATS_BATCH_APS = int(os.getenv("STATS_BATCH_APS", "50"))
+STATS_BATCH_MAX_AGE = float(os.getenv("STATS_BATCH_MAX_AGE", "10"))
+
+
+def _blank_row(model) -> dict[str, Any]:
+    """Todas las columnas (sin id): insert().values/executemany exigen las mismas claves."""
+    return {c.name: None for c in model.__table__.columns if c.name != "id"}
+
+
+async def _upsert_latest_stats(
+    session: AsyncSession, ap_rows: list[dict[str, Any]], cpe_rows: list[dict[str, Any]]
+) -> None:
+    """
+    Mantiene ap_latest_stats / cpe_latest_stats (última fila por AP y por MAC)
+    dentro de la transacción del histórico, para que las vistas de "estado
+    actual" no tengan que recorrer apstats/cpestats con ROW_NUMBER().
+    """
+    # Una fila por clave (ON CONFLICT no admite la misma clave dos veces por sentencia)
+    for model, rows, key in (
+        (APLatestStats, ap_rows, "ap_host"),
+        (CPELatestStats, cpe_rows, "cpe_mac"),
+    ):
+        latest = list({row[key]: row for row in rows if row[key]}.values())
+        if latest:
+            await session.execute(upsert_statement(session, model), latest)
+
+
+async def _bulk_insert(session: AsyncSession, model, rows: list[dict[str, Any]]) -> None:
+    """
+    INSERT de muchas filas en un round-trip (executemany de Core, sin objetos
+    ORM). En PostgreSQL con asyncpg y lotes grandes usa COPY.
+    """
+    if not rows:
+        return
+    if len(rows) >= COPY_MIN_ROWS and session.bind.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+        return
+    await session.execute(insert(model.__table__), rows)
+
+
+async def write_stats_rows(
+    session: AsyncSession,
+    ap_rows: list[dict[str, Any]],
+    cpe_rows: list[dict[str, Any]],
+    event_rows: list[dict[str, Any]] | None = None,
+) -> None:
+    """Histórico + tablas latest en la transacción actual (el llamador hace commit)."""
+    await _bulk_insert(session, APStats, ap_rows)
+    await _bulk_insert(session, CPEStats, cpe_rows)
+    await _bulk_insert(session, DisconnectionEvent, event_rows or [])
+    await _upsert_latest_stats(session, ap_rows, cpe_rows)
+
+
+def backfill_latest_stats(session) -> None:
+    """
+    Rellena ap_latest_stats / cpe_latest_stats desde el histórico si están
+    vacías (instalaciones anteriores a estas tablas). Sesión sync; idempotente.
+    """
+    for model, history, key in (
+        (APLatestStats, "apstats", "ap_host"),
+        (CPELatestStats, "cpestats", "cpe_mac"),
+    ):
+        table = model.__tablename__
+        if session.exec(text(f"SELECT 1 FROM {table} LIMIT 1")).first():  # nosec B608
+            continue
+        columns = ", ".join(c.name for c in model.__table__.columns)
+        session.exec(
+            text(f"""
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM (
+                    SELECT {columns},
+                           ROW_NUMBER() OVER(PARTITION BY {key} ORDER BY timestamp DESC) as rn
+                    FROM {history}
+                ) AS s
+                WHERE s.rn = 1
+                ON CONFLICT DO NOTHING
+            """)  # nosec B608 - Identifiers come from the models
+        )
+        session.commit()
+        logger.info(f"[Stats] {table} backfilled from {history}")
+
+
+def status_to_rows(
+    ap_host: str, status: "DeviceStatus", vendor: str = "ubiquiti", timestamp: datetime | None = None
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """DeviceStatus -> (fila de apstats, filas de cpestats)."""
+    timestamp = timestamp or datetime.utcnow()
+    ap_row = _blank_row(APStats) | {
+        "timestamp": timestamp,
+        "ap_host": ap_host,
+        "vendor": vendor,
+        "uptime": status.uptime,
+        "cpuload": status.extra.get("cpu_load"),
+        "freeram": status.extra.get("free_memory"),
+        "client_count": status.client_count,
+        "noise_floor": status.noise_floor,
+        "total_throughput_tx": status.tx_throughput,
+        "total_throughput_rx": status.rx_throughput,
+        "airtime_total_usage": status.airtime_usage,
+        "airtime_tx_usage": status.extra.get("airtime_tx"),
+        "airtime_rx_usage": status.extra.get("airtime_rx"),
+        "frequency": status.frequency,
+        "chanbw": status.channel_width,
+        "essid": status.essid,
+        "total_tx_bytes": status.tx_bytes,
+        "total_rx_bytes": status.rx_bytes,
+        "gps_lat": status.gps_lat,
+        "gps_lon": status.gps_lon,
+        "gps_sats": status.extra.get("gps_sats"),
+    }
+
+    blank = _blank_row(CPEStats)
+    cpe_rows = [
+        blank
+        | {
+            "timestamp": timestamp,
+            "ap_host": ap_host,
+            "vendor": vendor,
+            "cpe_mac": client.mac,
+            "cpe_hostname": client.hostname,
+            "ip_address": client.ip_address,
+            "signal": client.signal,
+            "signal_chain0": client.signal_chain0,
+            "signal_chain1": client.signal_chain1,
+            "noisefloor": client.noisefloor,
+            "cpe_tx_power": client.extra.get("tx_power"),
+            "distance": client.extra.get("distance"),
+            "dl_capacity": client.extra.get("dl_capacity"),
+            "ul_capacity": client.extra.get("ul_capacity"),
+            "airmax_cinr_rx": client.extra.get("airmax_cinr_rx"),
+            "airmax_usage_rx": client.extra.get("airmax_usage_rx"),
+            "airmax_cinr_tx": client.extra.get("airmax_cinr_tx"),
+            "airmax_usage_tx": client.extra.get("airmax_usage_tx"),
+            "throughput_rx_kbps": client.rx_throughput_kbps,
+            "throughput_tx_kbps": client.tx_throughput_kbps,
+            "total_rx_bytes": client.rx_bytes,
+            "total_tx_bytes": client.tx_bytes,
+            "cpe_uptime": client.uptime,
+            "ccq": client.ccq,
+            "tx_rate": client.tx_rate,
+            "rx_rate": client.rx_rate,
+            "ssid": client.ssid,
+            "band": client.band,
+        }
+        for client in status.clients
+    ]
+    return ap_row, cpe_rows
+
+
+def snapshot_to_rows(
+    ap_host: str, data: dict, timestamp: datetime | None = None
+) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Snapshot AirOS (formato del polling) -> (apstats, cpestats, disconnection_events)."""
+    timestamp = timestamp or datetime.utcnow()
+    wireless_info = data.get("wireless", {})
+    throughput_info = wireless_info.get("throughput", {})
+    polling_info = wireless_info.get("polling", {})
+    ath0 = data.get("interfaces", [{}, {}])[1].get("status", {})
+    gps = data.get("gps", {})
+
+    ap_row = _blank_row(APStats) | {
+        "timestamp": timestamp,
+        "ap_host": ap_host,
+        "vendor": "ubiquiti",
+        "uptime": data.get("host", {}).get("uptime"),
+        "cpuload": data.get("host", {}).get("cpuload"),
+        "freeram": data.get("host", {}).get("freeram"),
+        "client_count": wireless_info.get("count"),
+        "noise_floor": wireless_info.get("noisef"),
+        "total_throughput_tx": throughput_info.get("tx"),
+        "total_throughput_rx": throughput_info.get("rx"),
+        "airtime_total_usage": polling_info.get("use"),
+        "airtime_tx_usage": polling_info.get("tx_use"),
+        "airtime_rx_usage": polling_info.get("rx_use"),
+        "frequency": wireless_info.get("frequency"),
+        "chanbw": wireless_info.get("chanbw"),
+        "essid": wireless_info.get("essid"),
+        "total_tx_bytes": ath0.get("tx_bytes"),
+        "total_rx_bytes": ath0.get("rx_bytes"),
+        "gps_lat": gps.get("lat"),
+        "gps_lon": gps.get("lon"),
+        "gps_sats": gps.get("sats"),
+    }
+
+    blank = _blank_row(CPEStats)
+    cpe_rows = []
+    for cpe in wireless_info.get("sta", []):
+        remote = cpe.get("remote", {})
+        stats = cpe.get("stats", {})
+        airmax = cpe.get("airmax", {})
+        eth = remote.get("ethlist", [{}])[0]
+        chainrssi = cpe.get("chainrssi", [None, None])
+        cpe_rows.append(
+            blank
+            | {
+                "timestamp": timestamp,
+                "ap_host": ap_host,
+                "vendor": "ubiquiti",
+                "cpe_mac": cpe.get("mac"),
+                "cpe_hostname": remote.get("hostname"),
+                "ip_address": cpe.get("lastip"),
+                "signal": cpe.get("signal"),
+                "signal_chain0": chainrssi[0],
+                "signal_chain1": chainrssi[1],
+                "noisefloor": cpe.get("noisefloor"),
+                "cpe_tx_power": remote.get("tx_power"),
+                "distance": cpe.get("distance"),
+                "dl_capacity": airmax.get("dl_capacity"),
+                "ul_capacity": airmax.get("ul_capacity"),
+                "airmax_cinr_rx": airmax.get("rx", {}).get("cinr"),
+                "airmax_usage_rx": airmax.get("rx", {}).get("usage"),
+                "airmax_cinr_tx": airmax.get("tx", {}).get("cinr"),
+                "airmax_usage_tx": airmax.get("tx", {}).get("usage"),
+                "throughput_rx_kbps": remote.get("rx_throughput"),
+                "throughput_tx_kbps": remote.get("tx_throughput"),
+                "total_rx_bytes": stats.get("rx_bytes"),
+                "total_tx_bytes": stats.get("tx_bytes"),
+                "cpe_uptime": remote.get("uptime"),
+                "eth_plugged": eth.get("plugged"),
+                "eth_speed": eth.get("speed"),
+                "eth_cable_len": eth.get("cable_len"),
+            }
+        )
+
+    blank = _blank_row(DisconnectionEvent)
+    event_rows = [
+        blank
+        | {
+            "timestamp": timestamp,
+            "ap_host": ap_host,
+            "cpe_mac": event.get("mac"),
+            "cpe_hostname": event.get("hostname"),
+            "reason_code": event.get("reason_code"),
+            "connection_duration": event.get("disconnect_duration"),
+        }
+        for event in wireless_info.get("sta_disconnected", [])
+    ]
+    return ap_row, cpe_rows, event_rows
 
 
 async def save_device_stats(
@@ -67,199 +349,104 @@ async def save_device_stats(
 ):
     """Guarda estado del AP y sus clientes (CPEs)."""
     try:
-        # 1. AP Stats
-        ap_stats = APStats(
-            ap_host=ap_host,
-            vendor=vendor,
-            uptime=status.uptime,
-            cpuload=status.extra.get("cpu_load"),
-            freeram=status.extra.get("free_memory"),
-            client_count=status.client_count,
-            noise_floor=status.noise_floor,
-            total_throughput_tx=status.tx_throughput,
-            total_throughput_rx=status.rx_throughput,
-            airtime_usage=status.airtime_usage,
-            airtime_tx=status.extra.get("airtime_tx"),
-            airtime_rx=status.extra.get("airtime_rx"),
-            frequency=status.frequency,
-            chanbw=status.channel_width,
-            essid=status.essid,
-            total_tx_bytes=status.tx_bytes,
-            total_rx_bytes=status.rx_bytes,
-            gps_lat=status.gps_lat,
-            gps_lon=status.gps_lon,
-            gps_sats=status.extra.get("gps_sats"),
-        )
-        session.add(ap_stats)
-
-        # 2. CPE Stats
-        for client in status.clients:
-            cpe_stats = CPEStats(
-                ap_host=ap_host,
-                vendor=vendor,
-                cpe_mac=client.mac,
-                cpe_hostname=client.hostname,
-                ip_address=client.ip_address,
-                signal=client.signal,
-                signal_chain0=client.signal_chain0,
-                signal_chain1=client.signal_chain1,
-                noisefloor=client.noisefloor,
-                cpe_tx_power=client.extra.get("tx_power"),
-                distance=client.extra.get("distance"),
-                dl_capacity=client.extra.get("dl_capacity"),
-                ul_capacity=client.extra.get("ul_capacity"),
-                airmax_cinr_rx=client.extra.get("airmax_cinr_rx"),
-                airmax_usage_rx=client.extra.get("airmax_usage_rx"),
-                airmax_cinr_tx=client.extra.get("airmax_cinr_tx"),
-                airmax_usage_tx=client.extra.get("airmax_usage_tx"),
-                throughput_rx_kbps=client.rx_throughput_kbps,
-                throughput_tx_kbps=client.tx_throughput_kbps,
-                total_rx_bytes=client.rx_bytes,
-                total_tx_bytes=client.tx_bytes,
-                cpe_uptime=client.uptime,
-                ccq=client.ccq,
-                tx_rate=client.tx_rate,
-                rx_rate=client.rx_rate,
-                ssid=client.ssid,
-                band=client.band,
-            )
-            session.add(cpe_stats)
-
+        ap_row, cpe_rows = status_to_rows(ap_host, status, vendor)
+        await write_stats_rows(session, [ap_row], cpe_rows)
         await session.commit()
         logger.info(f"Stats guardados para {ap_host} y clientes.")
-
-        # Update Inventory (Needs separate logic or call CPEService)
-        # Note: CPEService update_inventory_from_status is sync and creates its own session usually.
-        # But we are in async context. We should probably use an async version or run it in thread.
-        # Ideally, refactor CPEService to be async too. For now, skipping or assuming caller handles it?
-        # The original code called CPEService.update_inventory_from_status at the end.
-        # I should probably do that too. BUT CPEService uses `get_sync_session`.
-        # I can call it via current async session if I refactor CPEService, OR keeps it separate.
-        # Given "Unify Database", I should probably use the SAME session?
-        # But `CPEService` is designed for sync.
-        # I will leave the inventory update part to the caller (MonitorService) or use a separate sync call 
-        # inside `run_in_thread`/mixed mode if absolutely necessary.
-        # Actually, `MonitorService` *already* calls `update_ap_status` which updates AP.
-        # But `CPEService.update_inventory_from_status` updates CPEs.
-        # I'll implement a helper to call CPEService using the async session if possible, 
-        # but CPEService expects Sync Session. 
-        # I'll omit the CPEService call here and let MonitorService handle it or added it back as a TODO.
-        # Original code:
-        # with next(get_sync_session()) as session:
-        #     service = CPEService(session)
-        #     service.update_inventory_from_status(status)
-        
-        # I will replicate this pattern but async-friendly? No, `get_sync_session` blocks.
-        # I'll let `MonitorService` handle the inventory update logic separately to keep `stats_db` pure.
-        
+        # El inventario de CPEs lo actualiza MonitorService por separado.
     except Exception as e:
         logger.error(f"Error saving stats for {ap_host}: {e}")
 
 
 async def save_full_snapshot(session: AsyncSession, ap_host: str, data: dict):
     """Guarda snapshot completo (Monitor polling format)."""
-    # Logic similar to save_device_stats but parsing 'data' dict
-    # Skipping implementation for brevity unless requested, can map similarly.
-    # The user plan mentioned "Rewrite save_device_stats and save_full_snapshot".
-    # I should implement it.
     try:
-        wireless_info = data.get("wireless", {})
-        throughput_info = wireless_info.get("throughput", {})
-        polling_info = wireless_info.get("polling", {})
-        ath0 = data.get("interfaces", [{}, {}])[1].get("status", {})
-        gps = data.get("gps", {})
-
-        ap_stats = APStats(
-            ap_host=ap_host,
-            uptime=data.get("host", {}).get("uptime"),
-            cpuload=data.get("host", {}).get("cpuload"),
-            freeram=data.get("host", {}).get("freeram"),
-            client_count=wireless_info.get("count"),
-            noise_floor=wireless_info.get("noisef"),
-            total_throughput_tx=throughput_info.get("tx"),
-            total_throughput_rx=throughput_info.get("rx"),
-            airtime_total_usage=polling_info.get("use"),
-            airtime_tx_usage=polling_info.get("tx_use"),
-            airtime_rx_usage=polling_info.get("rx_use"),
-            frequency=wireless_info.get("frequency"),
-            chanbw=wireless_info.get("chanbw"),
-            essid=wireless_info.get("essid"),
-            total_tx_bytes=ath0.get("tx_bytes"),
-            total_rx_bytes=ath0.get("rx_bytes"),
-            gps_lat=gps.get("lat"),
-            gps_lon=gps.get("lon"),
-            gps_sats=gps.get("sats"),
-        )
-        session.add(ap_stats)
-
-        for cpe in wireless_info.get("sta", []):
-            remote = cpe.get("remote", {})
-            stats = cpe.get("stats", {})
-            airmax = cpe.get("airmax", {})
-            eth = remote.get("ethlist", [{}])[0]
-            chainrssi = cpe.get("chainrssi", [None, None])
-
-            session.add(CPEStats(
-                ap_host=ap_host,
-                cpe_mac=cpe.get("mac"),
-                cpe_hostname=remote.get("hostname"),
-                ip_address=cpe.get("lastip"),
-                signal=cpe.get("signal"),
-                signal_chain0=chainrssi[0],
-                signal_chain1=chainrssi[1],
-                noisefloor=cpe.get("noisefloor"),
-                cpe_tx_power=remote.get("tx_power"),
-                distance=cpe.get("distance"),
-                dl_capacity=airmax.get("dl_capacity"),
-                ul_capacity=airmax.get("ul_capacity"),
-                airmax_cinr_rx=airmax.get("rx", {}).get("cinr"),
-                airmax_usage_rx=airmax.get("rx", {}).get("usage"),
-                airmax_cinr_tx=airmax.get("tx", {}).get("cinr"),
-                airmax_usage_tx=airmax.get("tx", {}).get("usage"),
-                throughput_rx_kbps=remote.get("rx_throughput"),
-                throughput_tx_kbps=remote.get("tx_throughput"),
-                total_rx_bytes=stats.get("rx_bytes"),
-                total_tx_bytes=stats.get("tx_bytes"),
-                cpe_uptime=remote.get("uptime"),
-                eth_plugged=eth.get("plugged"),
-                eth_speed=eth.get("speed"),
-                eth_cable_len=eth.get("cable_len")
-            ))
-
-        for event in wireless_info.get("sta_disconnected", []):
-            session.add(DisconnectionEvent(
-                ap_host=ap_host,
-                cpe_mac=event.get("mac"),
-                cpe_hostname=event.get("hostname"),
-                reason_code=event.get("reason_code"),
-                connection_duration=event.get("disconnect_duration")
-            ))
-
+        ap_row, cpe_rows, event_rows = snapshot_to_rows(ap_host, data)
+        await write_stats_rows(session, [ap_row], cpe_rows, event_rows)
         await session.commit()
     except Exception as e:
         logger.error(f"Error saving snapshot for {ap_host}: {e}")
 
 
+class StatsBatch:
+    """
+    Acumula las filas de varios APs de un ciclo del monitor y las escribe en
+    una sola transacción (un executemany/COPY por tabla) en lugar de un
+    commit con N objetos ORM por AP.
+    """
+
+    def __init__(self, max_aps: int = STATS_BATCH_APS, max_age: float = STATS_BATCH_MAX_AGE):
+        self.max_aps = max_aps
+        self.max_age = max_age
+        self.ap_rows: list[dict[str, Any]] = []
+        self.cpe_rows: list[dict[str, Any]] = []
+        self.event_rows: list[dict[str, Any]] = []
+        self._first_added: float | None = None
+        self._lock = asyncio.Lock()
+        self.stats = {"flushes": 0, "aps": 0, "cpes": 0, "failed_flushes": 0}
+
+    def add_status(self, ap_host: str, status: "DeviceStatus", vendor: str = "ubiquiti") -> None:
+        ap_row, cpe_rows = status_to_rows(ap_host, status, vendor)
+        self._add([ap_row], cpe_rows, [])
+
+    def add_snapshot(self, ap_host: str, data: dict) -> None:
+        self._add(*snapshot_to_rows(ap_host, data))
+
+    def _add(self, ap_rows, cpe_rows, event_rows) -> None:
+        if self._first_added is None:
+            self._first_added = time.monotonic()
+        self.ap_rows += ap_rows
+        self.cpe_rows += cpe_rows
+        self.event_rows += event_rows
+
+    def should_flush(self) -> bool:
+        return len(self.ap_rows) >= self.max_aps or (
+            self._first_added is not None and time.monotonic() - self._first_added >= self.max_age
+        )
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Escribe lo acumulado. Devuelve el número de APs escritos."""
+        async with self._lock:
+            ap_rows, cpe_rows, event_rows = self.ap_rows, self.cpe_rows, self.event_rows
+            if not ap_rows:
+                return 0
+            self.ap_rows, self.cpe_rows, self.event_rows = [], [], []
+            self._first_added = None
+
+            started = time.monotonic()
+            try:
+                await write_stats_rows(session, ap_rows, cpe_rows, event_rows)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                self.stats["failed_flushes"] += 1
+                logger.error(f"Error guardando lote de stats ({len(ap_rows)} APs): {e}")
+                return 0
+
+            self.stats["flushes"] += 1
+            self.stats["aps"] += len(ap_rows)
+            self.stats["cpes"] += len(cpe_rows)
+            logger.info(
+                f"[Stats] Lote guardado: {len(ap_rows)} APs, {len(cpe_rows)} CPEs "
+                f"en {(time.monotonic() - started) * 1000:.0f}ms"
+            )
+            return len(ap_rows)
+
+
 async def get_cpes_for_ap_from_stats(
     session: AsyncSession, host: str, status_filter: str = None
 ) -> list[dict[str, Any]]:
     """
     Obtiene lista de CPEs recientes combinando stats y tabla de inventario (cpes).
     """
-    # Use raw SQL for Window Function efficiency
+    # Latest row per CPE comes from cpe_latest_stats (no scan of the history)
     query = text("""
-        WITH LatestCPEStats AS (
-            SELECT 
-                *,
-                ROW_NUMBER() OVER(PARTITION BY cpe_mac ORDER BY timestamp DESC) as rn
-            FROM cpestats
-        )
         SELECT 
             s.*, 
             c.is_enabled
-        FROM LatestCPEStats s
+        FROM cpe_latest_stats s
         LEFT JOIN cpes c ON s.cpe_mac = c.mac
-        WHERE s.rn = 1 AND s.ap_host = :host
+        WHERE s.ap_host = :host
     """)
 
     try:
@@ -0,0 +1,187 @@
+# app/db/status_buffer.py
+"""
+Write-behind del estado de routers, APs y switches (last_status,
+last_checked, hostname, modelo, firmware).
+
+Los schedulers en vivo actualizaban la fila del dispositivo en cada poll (cada
+1-3 s por host): una transacción por host y tick que en SQLite competía por el
+lock de escritura con los stats ("database is locked"). Ahora:
+
+- Las actualizaciones se fusionan en memoria por (tipo, host).
+- Si cambia last_status (o es el primer dato desde el arranque) se escribe al
+  momento: la UI y las alertas ven online/offline sin retraso.
+- El resto se vuelca cada STATUS_FLUSH_INTERVAL segundos en una transacción,
+  con un UPDATE executemany por combinación de columnas y sin reescribir
+  metadatos que no cambiaron desde la última escritura.
+- Escrituras inmediatas y volcados se serializan (asyncio.Lock): un volcado en
+  curso no puede pisar con un last_status viejo un cambio escrito mientras tanto.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any
+
+from sqlalchemy import bindparam, update
+
+from ..models.ap import AP
+from ..models.router import Router
+from ..models.switch import Switch
+from .engine import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", "15"))
+
+# Siempre se escriben: el proceso del scheduler (monitor_job) también actualiza
+# last_status, así que el valor "ya escrito" de este proceso puede no ser el de la BD
+ALWAYS_WRITTEN = frozenset({"last_status", "last_checked"})
+
+STATUS_MODELS = {
+    "router": Router,
+    "ap": AP,
+    "switch": Switch,
+}
+
+
+def _update_statement(kind: str, columns: tuple[str, ...]):
+    table = STATUS_MODELS[kind].__table__
+    return (
+        update(table)
+        .where(table.c.host == bindparam("b_host"))
+        .values({column: bindparam(f"b_{column}") for column in columns})
+    )
+
+
+class StatusWriteBuffer:
+    """
+    Uso (desde el event loop de la API):
+
+        await status_buffer.update("ap", host, aps_db.ap_status_fields(status, data))
+        ...
+        await status_buffer.close()  # shutdown: vuelca lo pendiente
+    """
+
+    def __init__(self, flush_interval: float = STATUS_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[str, str], dict[str, Any]] = {}
+        self._written: dict[tuple[str, str], dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._stats = {
+            "updates": 0,
+            "immediate_writes": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "skipped_unchanged": 0,
+            "errors": 0,
+        }
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def update(self, kind: str, host: str, fields: dict[str, Any]) -> None:
+        """Encola el estado de un dispositivo; escribe ya si cambió last_status."""
+        self._ensure_task()
+        self._stats["updates"] += 1
+        key = (kind, host)
+        self._pending.setdefault(key, {}).update(fields)
+
+        written = self._written.get(key)
+        if written is None or written.get("last_status") != fields.get("last_status"):
+            await self._write_now(key)
+
+    async def _write_now(self, key: tuple[str, str]) -> None:
+        async with self._lock:
+            await self._write_now_locked(key)
+
+    async def _write_now_locked(self, key: tuple[str, str]) -> None:
+        fields = self._pending.pop(key, None)
+        if not fields:
+            return
+        kind, host = key
+        try:
+            async with async_session_maker() as session:
+                columns = tuple(sorted(fields))
+                await session.execute(
+                    _update_statement(kind, columns),
+                    [{"b_host": host, **{f"b_{c}": fields[c] for c in columns}}],
+                )
+                await session.commit()
+        except Exception as e:
+            self._stats["errors"] += 1
+            self._requeue({key: fields})
+            logger.error(f"[StatusBuffer] Error escribiendo estado de {kind} {host}: {e}")
+            return
+        self._stats["immediate_writes"] += 1
+        self._written.setdefault(key, {}).update(fields)
+
+    def _requeue(self, batch: dict[tuple[str, str], dict[str, Any]]) -> None:
+        """Devuelve al buffer lo que no se pudo escribir (lo más nuevo manda)."""
+        for key, fields in batch.items():
+            self._pending[key] = {**fields, **self._pending.get(key, {})}
+
+    async def flush(self) -> int:
+        """Vuelca todo lo pendiente. Devuelve filas actualizadas."""
+        async with self._lock:
+            return await self._flush_locked()
+
+    async def _flush_locked(self) -> int:
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        groups: dict[tuple[str, tuple[str, ...]], list[dict[str, Any]]] = defaultdict(list)
+        for (kind, host), fields in batch.items():
+            written = self._written.get((kind, host), {})
+            changed = {
+                k: v for k, v in fields.items() if k in ALWAYS_WRITTEN or written.get(k) != v
+            }
+            self._stats["skipped_unchanged"] += len(fields) - len(changed)
+            columns = tuple(sorted(changed))
+            groups[(kind, columns)].append(
+                {"b_host": host, **{f"b_{c}": changed[c] for c in columns}}
+            )
+
+        try:
+            async with async_session_maker() as session:
+                for (kind, columns), rows in groups.items():
+                    await session.execute(_update_statement(kind, columns), rows)
+                await session.commit()
+        except Exception as e:
+            self._stats["errors"] += 1
+            self._requeue(batch)
+            logger.error(f"[StatusBuffer] Error volcando {len(batch)} estados: {e}")
+            return 0
+
+        for key, fields in batch.items():
+            self._written.setdefault(key, {}).update(fields)
+        self._stats["flushes"] += 1
+        self._stats["rows_flushed"] += len(batch)
+        logger.debug(f"[StatusBuffer] {len(batch)} estados volcados en {len(groups)} UPDATE")
+        return len(batch)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "hosts": len(self._written),
+            "flush_interval": self.flush_interval,
+        }
+
+
+# Singleton
+status_buffer = StatusWriteBuffer()
@@ -85,8 +85,16 @@ async def on_startup():
         else:
             print("⚠️ Redict no disponible, usando cache en memoria")
 
+    # --- Cache V3: Iniciar PollingEngine ---
+    # Motor único de polling (heap por next-due + pools de workers por vendor).
+    # Los schedulers de abajo solo gestionan suscripciones y registran hosts aquí.
+    from .services.polling_engine import polling_engine
+
+    asyncio.create_task(polling_engine.run())
+    print("✅ PollingEngine iniciado")
+
     # --- Cache V2: Iniciar MonitorScheduler ---
-    # Este scheduler consulta routers suscritos y llena el cache
+    # Este scheduler gestiona los routers suscritos; el PollingEngine llena el cache
     # Los WebSockets leen del cache en lugar de conectar directamente
     from .services.monitor_scheduler import monitor_scheduler
 
@@ -124,12 +132,27 @@ async def on_shutdown():
     """Cleanup on application shutdown"""
     # Desconectar Redict si estaba conectado
     if os.getenv("CACHE_BACKEND") == "redict":
+        from .services.poll_leases import poll_leases
         from .utils.cache.redict_store import redict_manager
 
         if redict_manager.is_connected:
+            # Ceder los dispositivos que sondeaba este worker a los demás
+            await poll_leases.release_all()
             await redict_manager.disconnect()
             print("✅ Redict desconectado")
 
+    # Detener PollingEngine
+    from .services.polling_engine import polling_engine
+    polling_engine.stop()
+
+    # Cerrar las sesiones RouterOS API-SSL del cliente asyncio
+    from .utils.device_clients.mikrotik.async_api import async_api_cache
+    await async_api_cache.close_all()
+
+    # Volcar estados pendientes del write-behind
+    from .db.status_buffer import status_buffer
+    await status_buffer.close()
+
     # Detener Bots
     from .services.bot_manager import bot_manager
     await bot_manager.stop()
@@ -1,9 +1,19 @@
 from datetime import datetime
-from typing import Optional
-from sqlmodel import Field, SQLModel
+from typing import Any, Optional
+from sqlalchemy import JSON, Index
+from sqlmodel import Column, Field, SQLModel
+
+# Índices compuestos (host, timestamp): las consultas de histórico filtran por
+# equipo y rango de fechas y ordenan por timestamp. Las tablas existentes los
+# reciben en el arranque (engine_sync.create_missing_indexes).
 
 
 class RouterStats(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_routerstats_host_ts", "router_host", "timestamp"),
+        Index("ix_routerstats_ts", "timestamp"),  # Ventanas del job de rollups y retención
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     router_host: str
@@ -19,8 +29,7 @@ class RouterStats(SQLModel, table=True):
     version: Optional[str] = None
 
 
-class APStats(SQLModel, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
+class APStatsBase(SQLModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     ap_host: str
     vendor: Optional[str] = "ubiquiti"
@@ -44,8 +53,25 @@ class APStats(SQLModel, table=True):
     gps_sats: Optional[int] = None
 
 
-class CPEStats(SQLModel, table=True):
+class APStats(APStatsBase, table=True):
+    """Histórico: una fila por AP y ciclo de monitoreo."""
+
+    __table_args__ = (
+        Index("ix_apstats_host_ts", "ap_host", "timestamp"),
+        Index("ix_apstats_ts", "timestamp"),  # Ventanas del job de rollups y retención
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+
+
+class APLatestStats(APStatsBase, table=True):
+    """Última fila de apstats por AP (upsert en la misma transacción que el histórico)."""
+
+    __tablename__ = "ap_latest_stats"
+    ap_host: str = Field(primary_key=True)
+
+
+class CPEStatsBase(SQLModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     ap_host: str
     vendor: Optional[str] = "ubiquiti"
@@ -79,8 +105,49 @@ class CPEStats(SQLModel, table=True):
     eth_cable_len: Optional[str] = None
 
 
+class CPEStats(CPEStatsBase, table=True):
+    """Histórico: una fila por CPE y ciclo de monitoreo."""
+
+    __table_args__ = (
+        Index("ix_cpestats_mac_ts", "cpe_mac", "timestamp"),
+        Index("ix_cpestats_ap_ts", "ap_host", "timestamp"),
+        Index("ix_cpestats_ts", "timestamp"),  # Retención por lotes
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+class CPELatestStats(CPEStatsBase, table=True):
+    """Última fila de cpestats por MAC (upsert en la misma transacción que el histórico)."""
+
+    __tablename__ = "cpe_latest_stats"
+    __table_args__ = (Index("ix_cpe_latest_stats_ap", "ap_host"),)
+    cpe_mac: str = Field(primary_key=True)
+
+
+class StatsRollup(SQLModel, table=True):
+    """
+    Agregado de routerstats/apstats por host y bucket (1h o 1d).
+    metrics: {métrica: [min, avg, max, last]} (ver app/db/rollups_db.py).
+    """
+
+    __tablename__ = "stats_rollups"
+    __table_args__ = (Index("ix_stats_rollups_res_bucket", "source", "resolution", "bucket"),)
+
+    source: str = Field(primary_key=True)  # "router" | "ap"
+    resolution: str = Field(primary_key=True)  # "1h" | "1d"
+    host: str = Field(primary_key=True)
+    bucket: datetime = Field(primary_key=True)  # Inicio del bucket (UTC)
+    samples: int = 0
+    metrics: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+
+
 class EventLog(SQLModel, table=True):
     __tablename__ = "event_logs"  # Keep exact table name for compatibility if needed
+    __table_args__ = (
+        Index("ix_event_logs_ts", "timestamp"),  # Paginación global (ORDER BY timestamp DESC)
+        Index("ix_event_logs_host_ts", "device_host", "timestamp"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     device_host: str
     device_type: str
@@ -91,6 +158,11 @@ class EventLog(SQLModel, table=True):
 
 class DisconnectionEvent(SQLModel, table=True):
     __tablename__ = "disconnection_events"
+    __table_args__ = (
+        Index("ix_disconnection_events_ap_ts", "ap_host", "timestamp"),
+        Index("ix_disconnection_events_mac_ts", "cpe_mac", "timestamp"),
+        Index("ix_disconnection_events_ts", "timestamp"),  # Retención por lotes
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     ap_host: str
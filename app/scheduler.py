@@ -153,6 +153,38 @@ def run_scheduler(log_queue=None):
         replace_existing=True,
     )
 
+    # --- Job 5: Rollups del histórico (1h / 1d) ---
+    from .services.rollup_job import ROLLUP_INTERVAL_MINUTES, run_rollup_cycle
+
+    logger.info(f"Programando Rollups de histórico cada {ROLLUP_INTERVAL_MINUTES} minutos")
+    scheduler.add_job(
+        run_rollup_cycle,
+        trigger=IntervalTrigger(minutes=ROLLUP_INTERVAL_MINUTES),
+        id="rollup_job",
+        name="Stats Rollups",
+        replace_existing=True,
+    )
+
+    # --- Job 6: Retención del histórico (Diario) ---
+    from .services.retention_job import run_retention_cycle
+
+    retention_hour = get_setting_sync("retention_run_hour") or "03:30"
+    try:
+        r_h, r_m = retention_hour.split(":")
+        r_h = int(r_h)
+        r_m = int(r_m)
+    except Exception:
+        r_h, r_m = 3, 30
+
+    logger.info(f"Programando Retención de histórico diaria a las {r_h:02d}:{r_m:02d}")
+    scheduler.add_job(
+        run_retention_cycle,
+        trigger=CronTrigger(hour=r_h, minute=r_m),
+        id="retention_job",
+        name="Stats Retention",
+        replace_existing=True,
+    )
+
     # Iniciar el scheduler
     scheduler.start()
     logger.info("✅ Scheduler iniciado exitosamente")
@@ -5,6 +5,7 @@ from datetime import datetime
 from ..core.constants import CredentialKeys, DeviceVendor
 from ..utils.device_clients.adapter_factory import get_device_adapter
 from ..utils.device_clients.adapters.base import BaseDeviceAdapter, DeviceStatus
+from ..utils.device_clients.airos_session import UBIQUITI_ASYNC_HTTP
 from .base_connector import BaseDeviceConnector
 
 logger = logging.getLogger(__name__)
@@ -69,83 +70,103 @@ class APConnector(BaseDeviceConnector):
 
         try:
             status: DeviceStatus = adapter.get_status()
+            return self._status_to_stats(host, status)
+        except Exception as e:
+            self.logger.error(f"Error fetching stats from {host}: {e}")
+            raise
+
+    def supports_async(self, host: str) -> bool:
+        """True si el adaptador del AP puede consultarse sin thread (httpx.AsyncClient)."""
+        adapter = self._adapters.get(host)
+        return UBIQUITI_ASYNC_HTTP and hasattr(adapter, "get_status_async")
 
-            if not status.is_online:
-                return {"error": status.last_error or "AP offline"}
-
-            # Convert clients to serializable format
-            clients_list = []
-            for client in status.clients:
-                clients_list.append(
-                    {
-                        "mac": client.mac,
-                        "hostname": client.hostname,
-                        "ip_address": client.ip_address,
-                        "signal": client.signal,
-                        "signal_chain0": client.signal_chain0,
-                        "signal_chain1": client.signal_chain1,
-                        "noisefloor": client.noisefloor,
-                        "tx_rate": client.tx_rate,
-                        "rx_rate": client.rx_rate,
-                        "ccq": client.ccq,
-                        "tx_bytes": client.tx_bytes,
-                        "rx_bytes": client.rx_bytes,
-                        "tx_throughput_kbps": client.tx_throughput_kbps,
-                        "rx_throughput_kbps": client.rx_throughput_kbps,
-                        "extra": client.extra,
-                    }
-                )
-
-            # Format uptime
-            uptime_str = "--"
-            if status.uptime:
-                days = status.uptime // 86400
-                hours = (status.uptime % 86400) // 3600
-                minutes = (status.uptime % 3600) // 60
-                if days > 0:
-                    uptime_str = f"{days}d {hours}h {minutes}m"
-                elif hours > 0:
-                    uptime_str = f"{hours}h {minutes}m"
-                else:
-                    uptime_str = f"{minutes}m"
-
-            # Build response
-            return {
-                "host": host,
-                "hostname": status.hostname,
-                "model": status.model,
-                "mac": status.mac,
-                "firmware": status.firmware,
-                "vendor": status.vendor,
-                "client_count": status.client_count or len(clients_list),
-                "noise_floor": status.noise_floor,
-                "chanbw": status.channel_width,
-                "frequency": status.frequency,
-                "essid": status.essid,
-                "total_tx_bytes": status.tx_bytes,
-                "total_rx_bytes": status.rx_bytes,
-                "total_throughput_tx": status.tx_throughput,
-                "total_throughput_rx": status.rx_throughput,
-                "airtime_total_usage": status.airtime_usage,
-                "airtime_tx_usage": status.extra.get("airtime_tx") if status.extra else None,
-                "airtime_rx_usage": status.extra.get("airtime_rx") if status.extra else None,
-                "clients": clients_list,
-                "extra": {
-                    "cpu_load": status.extra.get("cpu_load", 0) if status.extra else 0,
-                    "free_memory": status.extra.get("free_memory") if status.extra else None,
-                    "total_memory": status.extra.get("total_memory") if status.extra else None,
-                    "uptime": uptime_str,
-                    "platform": status.extra.get("platform") if status.extra else None,
-                    "wireless_type": status.extra.get("wireless_type") if status.extra else None,
-                },
-                "interfaces": status.interfaces,
-                "timestamp": datetime.now().isoformat(),
-            }
+    async def fetch_ap_stats_async(self, host: str) -> dict:
+        """Variante async de fetch_ap_stats (solo adaptadores con get_status_async)."""
+        if host not in self._adapters:
+            raise ValueError(f"AP {host} is not subscribed")
 
+        try:
+            status: DeviceStatus = await self._adapters[host].get_status_async()
+            return self._status_to_stats(host, status)
         except Exception as e:
             self.logger.error(f"Error fetching stats from {host}: {e}")
             raise
 
+    @staticmethod
+    def _status_to_stats(host: str, status: DeviceStatus) -> dict:
+        """Convierte el DeviceStatus del adaptador al formato de ap_stats."""
+        if not status.is_online:
+            return {"error": status.last_error or "AP offline"}
+
+        # Convert clients to serializable format
+        clients_list = []
+        for client in status.clients:
+            clients_list.append(
+                {
+                    "mac": client.mac,
+                    "hostname": client.hostname,
+                    "ip_address": client.ip_address,
+                    "signal": client.signal,
+                    "signal_chain0": client.signal_chain0,
+                    "signal_chain1": client.signal_chain1,
+                    "noisefloor": client.noisefloor,
+                    "tx_rate": client.tx_rate,
+                    "rx_rate": client.rx_rate,
+                    "ccq": client.ccq,
+                    "tx_bytes": client.tx_bytes,
+                    "rx_bytes": client.rx_bytes,
+                    "tx_throughput_kbps": client.tx_throughput_kbps,
+                    "rx_throughput_kbps": client.rx_throughput_kbps,
+                    "extra": client.extra,
+                }
+            )
+
+        # Format uptime
+        uptime_str = "--"
+        if status.uptime:
+            days = status.uptime // 86400
+            hours = (status.uptime % 86400) // 3600
+            minutes = (status.uptime % 3600) // 60
+            if days > 0:
+                uptime_str = f"{days}d {hours}h {minutes}m"
+            elif hours > 0:
+                uptime_str = f"{hours}h {minutes}m"
+            else:
+                uptime_str = f"{minutes}m"
+
+        # Build response
+        return {
+            "host": host,
+            "hostname": status.hostname,
+            "model": status.model,
+            "mac": status.mac,
+            "firmware": status.firmware,
+            "vendor": status.vendor,
+            "client_count": status.client_count or len(clients_list),
+            "noise_floor": status.noise_floor,
+            "chanbw": status.channel_width,
+            "frequency": status.frequency,
+            "essid": status.essid,
+            "total_tx_bytes": status.tx_bytes,
+            "total_rx_bytes": status.rx_bytes,
+            "total_throughput_tx": status.tx_throughput,
+            "total_throughput_rx": status.rx_throughput,
+            "airtime_total_usage": status.airtime_usage,
+            "airtime_tx_usage": status.extra.get("airtime_tx") if status.extra else None,
+            "airtime_rx_usage": status.extra.get("airtime_rx") if status.extra else None,
+            "clients": clients_list,
+            "extra": {
+                "cpu_load": status.extra.get("cpu_load", 0) if status.extra else 0,
+                "free_memory": status.extra.get("free_memory") if status.extra else None,
+                "total_memory": status.extra.get("total_memory") if status.extra else None,
+                "uptime": uptime_str,
+                "platform": status.extra.get("platform") if status.extra else None,
+                "wireless_type": status.extra.get("wireless_type") if status.extra else None,
+            },
+            "interfaces": status.interfaces,
+            "timestamp": datetime.now().isoformat(),
+        }
+
 
 # Singleton instance
 ap_connector = APConnector()
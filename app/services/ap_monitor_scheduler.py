@@ -1,9 +1,10 @@
 # app/services/ap_monitor_scheduler.py
 """
-APMonitorScheduler: Scheduler centralizado para polling de APs.
+APMonitorScheduler: Gestor de suscripciones para polling de APs.
 Análogo a MonitorScheduler pero para dispositivos AP multi-vendor.
 
 V2: Respeta intervalos individuales por dispositivo.
+V3: El polling lo ejecuta PollingEngine (pool de workers por vendor).
 """
 
 import asyncio
@@ -11,11 +12,13 @@ import logging
 import os
 from datetime import datetime
 
-from ..core.constants import DeviceStatus
+from ..core.constants import DeviceStatus, DeviceVendor
 from ..db import aps_db
-from ..db.engine import async_session_maker
+from ..db.status_buffer import status_buffer
 from ..utils.cache import cache_manager
 from .ap_connector import ap_connector
+from .poll_leases import poll_leases
+from .polling_engine import polling_engine
 
 logger = logging.getLogger(__name__)
 
@@ -23,20 +26,19 @@ logger = logging.getLogger(__name__)
 UNSUBSCRIBE_TIMEOUT = int(os.getenv("AP_MONITOR_UNSUBSCRIBE_TIMEOUT", "30"))
 CLEANUP_CHECK_INTERVAL = 10  # Check for expired APs every 10 seconds
 DEFAULT_POLL_INTERVAL = 3  # Default polling interval in seconds
-TICK_INTERVAL = 1.0  # How often the scheduler checks for pending polls
 
 
 class APMonitorScheduler:
-    """Scheduler centralizado: polling paralelo a APs con timeout de desconexión."""
+    """Gestor de suscripciones de APs con timeout de desconexión (polling vía PollingEngine)."""
 
     def __init__(self):
         self._running = False
         self._subscribed_aps: dict[
             str, dict
-        ] = {}  # host -> {ref_count, last_unsubscribe_time, interval, last_poll_time}
+        ] = {}  # host -> {ref_count, last_unsubscribe_time, interval, last_poll_time, vendor}
         self.UNSUBSCRIBE_TIMEOUT = UNSUBSCRIBE_TIMEOUT
         logger.info(
-            f"[APMonitorScheduler] Inicializado (Tick: {TICK_INTERVAL}s, Default Interval: {DEFAULT_POLL_INTERVAL}s)"
+            f"[APMonitorScheduler] Inicializado (Default Interval: {DEFAULT_POLL_INTERVAL}s)"
         )
 
     async def subscribe(self, host: str, creds: dict, interval: int = None) -> None:
@@ -55,25 +57,31 @@ class APMonitorScheduler:
                 "ref_count": 0,
                 "last_unsubscribe_time": None,
                 "interval": effective_interval,
-                "last_poll_time": None,  # None = poll immediately on first tick
+                "last_poll_time": None,
+                "vendor": creds.get("vendor", DeviceVendor.MIKROTIK),
             }
 
         info = self._subscribed_aps[host]
         was_zero = info["ref_count"] <= 0
+        interval_changed = info["interval"] != effective_interval
 
         info["ref_count"] += 1
         info["last_unsubscribe_time"] = None  # Cancel any pending cleanup
         info["interval"] = effective_interval  # Always update interval
+        info["vendor"] = creds.get("vendor", DeviceVendor.MIKROTIK)
 
         if was_zero:
-            # Force immediate poll on resubscription
-            info["last_poll_time"] = None
             logger.info(
                 f"[APMonitorScheduler] Resubscribed to {host} (interval={effective_interval}s) - pending cleanup cancelled"
             )
 
         try:
             await ap_connector.subscribe(host, creds)
+            # Resuscripción: poll inmediato. Cambio de intervalo: reprograma sin adelantar.
+            if was_zero or not polling_engine.is_scheduled(self._job_key(host)):
+                self._schedule(host)
+            elif interval_changed:
+                self._schedule(host, delay=effective_interval)
             logger.info(
                 f"[APMonitorScheduler] Subscribed to {host} (ref_count={info['ref_count']}, interval={effective_interval}s)"
             )
@@ -95,6 +103,8 @@ class APMonitorScheduler:
 
         if info["ref_count"] <= 0:
             info["last_unsubscribe_time"] = datetime.now()
+            polling_engine.unschedule(self._job_key(host))
+            await poll_leases.release(self._job_key(host))
             logger.info(
                 f"[APMonitorScheduler] Marked {host} for cleanup in {self.UNSUBSCRIBE_TIMEOUT}s (ref_count=0)"
             )
@@ -138,18 +148,21 @@ class APMonitorScheduler:
             return
 
         del self._subscribed_aps[host]
-        cache_manager.get_store("ap_stats").delete(host)
+        polling_engine.unschedule(self._job_key(host))
+        await poll_leases.release(self._job_key(host))
+        # Si otro worker sigue sondeándolo, la entrada compartida es suya (caduca sola)
+        if not await poll_leases.polled_elsewhere(self._job_key(host)):
+            await cache_manager.get_store("ap_stats").delete_async(host)
         ap_connector.cleanup(host)
 
         logger.info(f"[APMonitorScheduler] Fully unsubscribed from {host} (timeout expired)")
 
 
     async def _update_db_status(self, host: str, status: str, result: dict = None):
-        """Actualiza el estado del AP en la base de datos."""
+        """Encola el estado del AP (write-behind: ver db/status_buffer.py)."""
         try:
-            async with async_session_maker() as session:
-                await aps_db.update_ap_status(session, host, status, result)
-            logger.debug(f"[APMonitorScheduler] DB updated: {host} -> {status}")
+            await status_buffer.update("ap", host, aps_db.ap_status_fields(status, result))
+            logger.debug(f"[APMonitorScheduler] DB status queued: {host} -> {status}")
         except Exception as e:
             logger.error(f"[APMonitorScheduler] Failed to update DB for {host}: {e}")
 
@@ -163,7 +176,7 @@ class APMonitorScheduler:
         try:
             result = await self._poll_host(host)
             if result and "error" not in result:
-                stats_cache.set(host, result)
+                await stats_cache.set_async(host, result)
                 await self._update_db_status(host, DeviceStatus.ONLINE, result)
                 return result
             else:
@@ -174,84 +187,82 @@ class APMonitorScheduler:
             await self._update_db_status(host, DeviceStatus.OFFLINE)
             return {"error": str(e)}
 
+    @staticmethod
+    def _job_key(host: str) -> str:
+        return f"ap:{host}"
+
+    def _schedule(self, host: str, delay: float = 0.0) -> None:
+        """Registra el AP en el PollingEngine usando su intervalo y el pool de su vendor."""
+        info = self._subscribed_aps[host]
+
+        async def on_result(result):
+            await self._handle_poll_result(host, result)
+
+        if ap_connector.supports_async(host):
+
+            async def fetch():
+                return await ap_connector.fetch_ap_stats_async(host)
+
+        else:
+
+            def fetch():
+                return ap_connector.fetch_ap_stats(host)
+
+        interval = info.get("interval", DEFAULT_POLL_INTERVAL)
+        polling_engine.schedule(
+            self._job_key(host),
+            fetch=fetch,
+            on_result=on_result,
+            interval=interval,
+            pool=info.get("vendor", DeviceVendor.MIKROTIK),
+            delay=delay,
+            claim=poll_leases.claimer(self._job_key(host), interval),
+        )
+
+    async def _handle_poll_result(self, host: str, result) -> None:
+        """Procesa el resultado de un poll: cache y estado en DB."""
+        info = self._subscribed_aps.get(host)
+        if info is None or info["ref_count"] <= 0:
+            return
+
+        info["last_poll_time"] = datetime.now()
+        stats_cache = cache_manager.get_store("ap_stats", default_ttl=60)
+
+        if isinstance(result, Exception):
+            logger.error(f"[APMonitorScheduler] Error polling {host}: {result}")
+            await stats_cache.set_async(host, {"error": str(result)})
+            await self._update_db_status(host, DeviceStatus.OFFLINE)
+        elif result and "error" not in result:
+            await stats_cache.set_async(host, result)
+            await self._update_db_status(host, DeviceStatus.ONLINE, result)
+            logger.debug(f"[APMonitorScheduler] Polled {host} successfully")
+        elif result:
+            await stats_cache.set_async(host, result)
+            await self._update_db_status(host, DeviceStatus.OFFLINE)
+
     async def run(self):
         """
-        Loop principal Async con intervalos individuales por AP.
-
-        El loop corre cada TICK_INTERVAL segundos y verifica qué APs
-        necesitan ser sondeados basándose en su intervalo configurado.
+        Loop de mantenimiento (limpieza de suscripciones expiradas).
+        Cada AP se sondea según su propio intervalo dentro de PollingEngine.
         """
         self._running = True
-        logger.info(f"[APMonitorScheduler] Iniciando loop de polling (tick={TICK_INTERVAL}s)...")
-        cleanup_task = asyncio.create_task(self._cleanup_task())
-        stats_cache = cache_manager.get_store("ap_stats", default_ttl=60)
+        logger.info("[APMonitorScheduler] Iniciando (polling delegado a PollingEngine)...")
 
         try:
-            while self._running:
-                current_time = datetime.now()
-                targets = list(self._subscribed_aps.items())
-
-                if not targets:
-                    await asyncio.sleep(TICK_INTERVAL)
-                    continue
-
-                # Filter to active APs that are due for polling
-                hosts_to_poll = []
-                for host, info in targets:
-                    if info["ref_count"] <= 0:
-                        continue
-
-                    last_poll = info.get("last_poll_time")
-                    interval = info.get("interval", DEFAULT_POLL_INTERVAL)
-
-                    # Poll if never polled or interval has elapsed
-                    if last_poll is None:
-                        hosts_to_poll.append(host)
-                    else:
-                        elapsed = (current_time - last_poll).total_seconds()
-                        if elapsed >= interval:
-                            hosts_to_poll.append(host)
-
-                if not hosts_to_poll:
-                    await asyncio.sleep(TICK_INTERVAL)
-                    continue
-
-                # Poll all due hosts in parallel
-                tasks = [self._poll_host(host) for host in hosts_to_poll]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                poll_time = datetime.now()
-                for host, result in zip(hosts_to_poll, results):
-                    # Update last_poll_time regardless of result
-                    if host in self._subscribed_aps:
-                        self._subscribed_aps[host]["last_poll_time"] = poll_time
-
-                    if isinstance(result, Exception):
-                        logger.error(f"[APMonitorScheduler] Error polling {host}: {result}")
-                        stats_cache.set(host, {"error": str(result)})
-                        await self._update_db_status(host, DeviceStatus.OFFLINE)
-                    elif result and "error" not in result:
-                        stats_cache.set(host, result)
-                        await self._update_db_status(host, DeviceStatus.ONLINE, result)
-                        logger.debug(f"[APMonitorScheduler] Polled {host} successfully")
-                    elif result:
-                        stats_cache.set(host, result)
-                        await self._update_db_status(host, DeviceStatus.OFFLINE)
-
-                await asyncio.sleep(TICK_INTERVAL)
+            await self._cleanup_task()
         finally:
             self._running = False
-            cleanup_task.cancel()
-            try:
-                await cleanup_task
-            except asyncio.CancelledError:
-                pass
 
         logger.info("[APMonitorScheduler] Detenido.")
 
     async def _poll_host(self, host: str) -> dict:
-        """Ejecuta la consulta al AP en un thread separado."""
-        return await asyncio.to_thread(ap_connector.fetch_ap_stats, host)
+        """Ejecuta la consulta al AP en el pool de workers de su vendor."""
+        if ap_connector.supports_async(host):
+            return await ap_connector.fetch_ap_stats_async(host)
+        info = self._subscribed_aps.get(host, {})
+        return await polling_engine.run_blocking(
+            info.get("vendor", DeviceVendor.MIKROTIK), ap_connector.fetch_ap_stats, host
+        )
 
 
 # Singleton
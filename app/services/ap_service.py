@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Any
 
 from sqlalchemy import func
-from sqlmodel import select, col
+from sqlmodel import col
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..api.aps.models import (
@@ -15,9 +15,8 @@ from ..api.aps.models import (
     HistoryDataPoint,
 )
 from ..core.constants import DeviceStatus, DeviceVendor
-from ..db import stats_db, aps_db
+from ..db import stats_db, aps_db, rollups_db
 from ..models.ap import AP
-from ..models.stats import APStats
 from ..utils.device_clients.adapter_factory import get_device_adapter
 from ..utils.device_clients.mikrotik import wireless as mikrotik_wireless
 from ..utils.security import decrypt_data, encrypt_data
@@ -163,7 +162,7 @@ class APService:
 
         try:
             api = adapter._get_api()
-            clients_data = mikrotik_wireless.get_connected_clients(api, fetch_arp=True)
+            clients_data = mikrotik_wireless.get_connected_clients(api, fetch_arp=True, host=host)
             
             now = datetime.utcnow()
             synced_count = 0
@@ -351,7 +350,7 @@ class APService:
 
         try:
             api = adapter._get_api()
-            detailed = mikrotik_wireless.get_wireless_interfaces_detailed(api)
+            detailed = mikrotik_wireless.get_wireless_interfaces_detailed(api, host)
             return [
                 {
                     "name": i["name"],
@@ -380,8 +379,13 @@ class APService:
         finally:
             adapter.disconnect()
 
-    async def get_ap_history(self, host: str, period: str = "24h") -> APHistoryResponse:
-        """Obtiene datos históricos de un AP desde la DB de estadísticas."""
+    async def get_ap_history(
+        self, host: str, period: str = "24h", max_points: int | None = None
+    ) -> APHistoryResponse:
+        """
+        Obtiene datos históricos de un AP desde la DB de estadísticas.
+        Rangos largos salen de los rollups 1h/1d (media por bucket).
+        """
         ap_info = await aps_db.get_ap_by_host_with_stats(self.session, host)
         hostname = ap_info.get("hostname", host) if ap_info else host
 
@@ -397,29 +401,30 @@ class APService:
         start_time = datetime.utcnow() - delta
 
         try:
-            # Stats Query using APStats model
-            stmt = select(APStats).where(
-                APStats.ap_host == host, 
-                APStats.timestamp >= start_time
-            ).order_by(APStats.timestamp.asc())
-            
-            result = await self.session.exec(stmt)
-            rows = result.all()
-            
-            # Map APStats model to HistoryDataPoint
-            history_points = []
-            for row in rows:
-                history_points.append(HistoryDataPoint(
-                    timestamp=row.timestamp,
-                    client_count=row.client_count,
-                    airtime_total_usage=row.airtime_total_usage,
-                    total_throughput_tx=row.total_throughput_tx,
-                    total_throughput_rx=row.total_throughput_rx
-                ))
+            resolution, points = await rollups_db.get_history_points(
+                self.session, "ap", host, start_time,
+                max_points=max_points or rollups_db.HISTORY_MAX_POINTS,
+            )
+
+            def as_int(value):
+                return round(value) if value is not None else None
+
+            # Map points to HistoryDataPoint
+            history_points = [
+                HistoryDataPoint(
+                    timestamp=p["timestamp"],
+                    client_count=as_int(p["client_count"]),
+                    airtime_total_usage=as_int(p["airtime_total_usage"]),
+                    total_throughput_tx=as_int(p["total_throughput_tx"]),
+                    total_throughput_rx=as_int(p["total_throughput_rx"]),
+                )
+                for p in points
+            ]
 
             return APHistoryResponse(
                 host=host,
                 hostname=hostname,
+                resolution=resolution,
                 history=history_points,
             )
         except Exception as e:
@@ -6,24 +6,27 @@ Refactored to use SQLModel ORM.
 
 import logging
 import uuid
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, datetime
 from typing import Any
 
-from sqlmodel import Session
-
+from sqlmodel import Session, func, select, update
 
 from dateutil.relativedelta import relativedelta
 
 from ..models.client import Client
 from ..models.payment import Payment
-from ..models.router import Router
+from ..models.plan import Plan
+from ..models.service import ClientService as ClientServiceModel
 from ..models.setting import Setting
 from .client_service import ClientService
 from .payment_service import PaymentService
-from .router_service import RouterService
+from .suspension_executor import ActionResult, RouterCall, ServiceAction, SuspensionExecutor
 
 logger = logging.getLogger(__name__)
 
+BILLING_UPDATE_CHUNK = 500  # IDs por IN (...) en los UPDATE / SELECT masivos
+
 
 class BillingService:
     """
@@ -44,13 +47,14 @@ class BillingService:
         from .plan_service import PlanService
 
         self.plan_service = PlanService(session)
+        # Plan/Router rows (and decrypted router passwords) for this run
+        self.lookup = self.client_service.lookup
 
-    def _get_router_by_host(self, host: str) -> Router:
-        """Helper to get router credentials from database."""
-        router = self.session.get(Router, host)
-        if not router:
-            raise ValueError(f"Router {host} not found in database")
-        return router
+    def _plan(self, plan_id: int | None) -> Plan:
+        plan = self.lookup.plan(plan_id)
+        if not plan:
+            raise ValueError(f"Plan {plan_id} no encontrado")
+        return plan
 
     def reactivate_client_services(
         self, client_id: uuid.UUID, payment_data: dict[str, Any]
@@ -80,74 +84,18 @@ class BillingService:
             services = self.client_service.get_client_services(client_id)
 
             activation_errors = []
-            if services:
-                for service in services:
-                    try:
-                        host = service["router_host"]
-                        ip = service.get("ip_address")
-
-                        # Get suspension method from PLAN (not service)
-                        method = None
-                        plan_obj = None
-                        if service.get("plan_id"):
-                            plan_obj = self.plan_service.get_by_id(service["plan_id"])
-                            if plan_obj:
-                                method = getattr(plan_obj, "suspension_method", None)
-
-                        # Fallback to service's method for backward compatibility
-                        if not method:
-                            method = service.get("suspension_method", "queue_limit")
-
-                        # Get router credentials
-                        router = self._get_router_by_host(host)
-
-                        with RouterService(host, router) as rs:
-                            if method == "address_list" and ip:
-                                # Get address list config from plan
-                                plan_strategy = (
-                                    getattr(plan_obj, "address_list_strategy", "blacklist")
-                                    if plan_obj
-                                    else "blacklist"
-                                )
-                                plan_list_name = (
-                                    getattr(plan_obj, "address_list_name", "morosos")
-                                    if plan_obj
-                                    else "morosos"
-                                )
-
-                                rs.activate_user_address_list(
-                                    ip, list_name=plan_list_name, strategy=plan_strategy
-                                )
-                                logger.info(
-                                    f"Servicio {service['id']} (IP: {ip}) reactivado via Address List."
-                                )
-
-                            elif method == "queue_limit" and ip:
-                                # Need to know the original plan speed
-                                plan_obj = self.plan_service.get_by_id(service["plan_id"])
-                                plan = plan_obj.model_dump()
-                                if plan:
-                                    rs.activate_user_limit(ip, plan["max_limit"])
-                                    logger.info(
-                                        f"Servicio {service['id']} (IP: {ip}) reactivado via Queue Limit."
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"No se encontró plan para el servicio {service['id']}, no se pudo restaurar el límite de velocidad."
-                                    )
-
-                            elif method == "pppoe_secret_disable":
-                                if service.get("router_secret_id"):
-                                    rs.set_pppoe_secret_status(
-                                        service["router_secret_id"], disable=False
-                                    )
-                                    logger.info(
-                                        f"Servicio PPPoE reactivado para {service.get('pppoe_username', 'N/A')}"
-                                    )
-
-                    except Exception as e:
-                        logger.error(f"Error reactivando servicio {service['id']}: {e}")
-                        activation_errors.append(str(e))
+            actions = []
+            for service in services:
+                try:
+                    action = self._reactivation_action(service)
+                    if action.calls:
+                        actions.append(action)
+                except Exception as e:
+                    logger.error(f"Error reactivando servicio {service['id']}: {e}")
+                    activation_errors.append(str(e))
+
+            results = self._run_router_actions(actions)
+            activation_errors += [r.error for r in results if not r.ok]
 
             if activation_errors:
                 # Leave note in payment if there was technical error
@@ -163,186 +111,285 @@ class BillingService:
 
         return new_payment
 
+    def _billing_audit_statement(self, cycle: str):
+        """
+        (client_id, service_status, billing_day, has_paid) of every non-cancelled
+        client in one query. billing_day is the one of the latest service, falling
+        back to the client's own; has_paid checks for a payment of `cycle`.
+        """
+        latest = self.client_service.ranked_services_subquery()
+        has_paid = (
+            select(Payment.id)
+            .where(Payment.client_id == Client.id, Payment.mes_correspondiente == cycle)
+            .exists()
+        )
+        return (
+            select(
+                Client.id,
+                Client.service_status,
+                func.coalesce(func.nullif(latest.c.billing_day, 0), Client.billing_day),
+                has_paid,
+            )
+            .outerjoin(latest, (latest.c.client_id == Client.id) & (latest.c.rn == 1))
+            .where(Client.service_status != "cancelled")
+        )
+
+    @staticmethod
+    def _next_billing_status(
+        current_status: str, billing_day: int, has_paid: bool, today: date, days_before: int
+    ) -> tuple[str, str | None]:
+        """
+        New status for a client and the technical action it requires
+        ("suspend", "enable" or None).
+        """
+        try:
+            due_date = today.replace(day=billing_day)
+        except ValueError:
+            due_date = today.replace(day=28)
+
+        if has_paid:
+            # If paid, technically reactivate in case it was cut
+            if current_status != "active":
+                return "active", "enable"
+            return current_status, None
+
+        # Calculate day difference
+        days_diff = (due_date - today).days
+
+        if days_diff < 0:
+            # Past due date -> SUSPEND
+            if current_status != "suspended":
+                return "suspended", "suspend"
+        elif days_diff <= days_before:
+            # X days remaining -> PENDING
+            if current_status != "suspended":
+                return "pendiente", None
+        elif current_status == "pendiente":
+            # Many days remaining -> ACTIVE (assuming previous cycle ok)
+            return "active", None
+        return current_status, None
+
     def process_daily_suspensions(self) -> dict[str, int]:
         """
         Review ALL clients and update their status (Active/ Pending/Suspended).
+
+        Set-based: due dates and paid status come from a single query, status
+        changes are written as bulk UPDATEs in one transaction, and the technical
+        suspensions/reactivations are grouped so each router is connected once.
         """
         logger.info("Iniciando auditoría de estados de facturación...")
 
         try:
-            from ..models.setting import Setting
-            
-            # Use self.session (sync)
             setting_obj = self.session.get(Setting, "days_before_due")
             days_before = int(setting_obj.value if setting_obj else 5)
         except (ValueError, AttributeError):
             days_before = 5
 
         today = datetime.now().date()
-        all_clients = self.client_service.get_all_clients()
+        # Billing cycle is usually "current month" for recurring services
+        cycle_str = today.strftime("%Y-%m")
         stats = {"active": 0, "pendiente": 0, "suspended": 0, "processed": 0}
 
-        for client in all_clients:
-            if client["service_status"] == "cancelled":
+        transitions: dict[str, list[uuid.UUID]] = defaultdict(list)
+        actions: dict[uuid.UUID, str] = {}
+        for cid, current_status, billing_day, has_paid in self.session.exec(
+            self._billing_audit_statement(cycle_str)
+        ).all():
+            if not billing_day:
                 continue
 
-            cid = client["id"]
-            billing_day = client["billing_day"]
+            new_status, action = self._next_billing_status(
+                current_status, billing_day, has_paid, today, days_before
+            )
+            if new_status != current_status:
+                transitions[new_status].append(cid)
+                if action:
+                    actions[cid] = action
 
-            if not billing_day:
-                continue
+            stats[new_status] = stats.get(new_status, 0) + 1
+            stats["processed"] += 1
 
-            try:
-                due_date = today.replace(day=billing_day)
-            except ValueError:
-                due_date = today.replace(day=28)
-
-            # Billing cycle is usually "current month" for recurring services
-            cycle_str = due_date.strftime("%Y-%m")
-            has_paid = self.payment_service.check_payment_exists(cid, cycle_str)
-
-            new_status = client["service_status"]
-            should_suspend_technically = False
-
-            if has_paid:
-                if new_status != "active":
-                    new_status = "active"
-                    # If paid, technically reactivate in case it was cut
-                    self._ensure_service_enabled(cid)
-            else:
-                # Calculate day difference
-                days_diff = (due_date - today).days
+        for new_status, client_ids in transitions.items():
+            for i in range(0, len(client_ids), BILLING_UPDATE_CHUNK):
+                self.session.execute(
+                    update(Client)
+                    .where(Client.id.in_(client_ids[i : i + BILLING_UPDATE_CHUNK]))
+                    .values(service_status=new_status)
+                )
+        self.session.commit()
+        changed = {status: len(ids) for status, ids in transitions.items()}
+        logger.info(f"Estados actualizados: {changed}")
 
-                if days_diff < 0:
-                    # Past due date -> SUSPEND
-                    if new_status != "suspended":
-                        new_status = "suspended"
-                        should_suspend_technically = True
+        if actions:
+            results = self._apply_technical_actions(actions)
+            stats["technical_ok"] = sum(1 for r in results if r.ok)
+            stats["technical_failed"] = len(results) - stats["technical_ok"]
+            logger.info(f"Caché de planes/routers: {self.lookup.get_stats()}")
 
-                elif days_diff <= days_before:
-                    # X days remaining -> PENDING
-                    if new_status != "suspended":
-                        new_status = "pendiente"
+        return stats
 
+    def _apply_technical_actions(self, actions: dict[uuid.UUID, str]) -> list[ActionResult]:
+        """
+        Run "suspend" / "enable" for every service of the given clients through
+        the SuspensionExecutor (one session per router, routers in parallel).
+        """
+        client_ids = list(actions)
+        services = []
+        for i in range(0, len(client_ids), BILLING_UPDATE_CHUNK):
+            services += self.session.exec(
+                select(ClientServiceModel)
+                .where(ClientServiceModel.client_id.in_(client_ids[i : i + BILLING_UPDATE_CHUNK]))
+                .order_by(ClientServiceModel.created_at.desc())
+            ).all()
+        self.lookup.prefetch_plans(s.plan_id for s in services)
+        self.lookup.prefetch_routers(s.router_host for s in services)
+
+        router_actions = []
+        results = []
+        for service in services:
+            service_dict = service.model_dump()
+            try:
+                if actions[service.client_id] == "suspend":
+                    action = self._suspension_action(service_dict)
                 else:
-                    # Many days remaining -> ACTIVE (assuming previous cycle ok)
-                    if new_status == "pendiente":
-                        new_status = "active"
-
-            if new_status != client["service_status"]:
-                self.client_service.update_client(cid, {"service_status": new_status})
-                if should_suspend_technically:
-                    self._suspend_technically(cid)
+                    action = self._enable_action(service_dict)
+            except Exception as e:
+                logger.error(f"❌ Error preparando el servicio {service.id}: {e}", exc_info=True)
+                results.append(
+                    ActionResult(
+                        service.id,
+                        service.router_host,
+                        actions[service.client_id],
+                        False,
+                        str(e),
+                        service.client_id,
+                    )
+                )
+                continue
+            if action.calls:
+                router_actions.append(action)
+
+        return results + self._run_router_actions(router_actions)
+
+    def _run_router_actions(self, actions: list[ServiceAction]) -> list[ActionResult]:
+        """Resolve router credentials here (DB session, once per run) and hand off to the executor."""
+        hosts = {a.router_host for a in actions}
+        self.lookup.prefetch_routers(hosts)
+        routers = {host: self.lookup.router(host) for host in hosts}
+        passwords = {host: self.lookup.router_password(host) for host in hosts if routers[host]}
+        return SuspensionExecutor().run(actions, routers, passwords)
+
+    def _suspension_method(self, service: dict[str, Any]) -> tuple[str, Any]:
+        """(method, plan) for a service: the PLAN's method, falling back to the service's."""
+        method = None
+        plan_obj = None
+        if service.get("plan_id"):
+            plan_obj = self._plan(service["plan_id"])
+            if plan_obj:
+                method = getattr(plan_obj, "suspension_method", None)
+
+        # Fallback to service's method for backward compatibility
+        if not method:
+            method = service.get("suspension_method", "queue_limit")
+        return method, plan_obj
+
+    @staticmethod
+    def _address_list_kwargs(plan_obj) -> dict[str, str]:
+        """Address list config from plan."""
+        return {
+            "list_name": getattr(plan_obj, "address_list_name", "morosos") if plan_obj else "morosos",
+            "strategy": (
+                getattr(plan_obj, "address_list_strategy", "blacklist") if plan_obj else "blacklist"
+            ),
+        }
 
-            stats[new_status] = stats.get(new_status, 0) + 1
-            stats["processed"] += 1
+    def _suspension_action(self, service: dict[str, Any]) -> ServiceAction:
+        """Router calls to suspend one service according to configured method."""
+        ip = service.get("ip_address")
+        secret_id = service.get("router_secret_id")
+        pppoe_username = service.get("pppoe_username")
+        method, plan_obj = self._suspension_method(service)
+
+        logger.info(
+            f"🔴 Processing service {service['id']}: method={method}, host={service['router_host']}, ip={ip}, secret_id={secret_id}"
+        )
+
+        calls = []
+        # CASE 1: Address List (Total cut with warning)
+        if method == "address_list" and ip:
+            calls.append(
+                RouterCall("suspend_user_address_list", (ip,), self._address_list_kwargs(plan_obj))
+            )
 
-        return stats
+        # CASE 2: Queue Limit (Extreme slowness)
+        elif method == "queue_limit" and ip:
+            calls.append(RouterCall("suspend_user_limit", (ip,)))
 
-    def _suspend_technically(self, client_id: uuid.UUID):
-        """Suspend service according to configured method."""
-        logger.info(f"🔴 _suspend_technically called for client_id={client_id}")
-        services = self.client_service.get_client_services(client_id)
-        logger.info(f"🔴 Found {len(services)} services for client {client_id}")
+        # CASE 3: PPPoE (The classic)
+        elif method == "pppoe_secret_disable":
+            if secret_id:
+                calls.append(RouterCall("set_pppoe_secret_status", (secret_id,), {"disable": True}))
+            else:
+                logger.warning(f"⚠️ No router_secret_id found for service {service['id']}")
+        else:
+            logger.warning(
+                f"⚠️ Suspension method '{method}' not handled or missing required data"
+            )
 
-        for service in services:
-            try:
-                host = service["router_host"]
-                ip = service.get("ip_address")
-                secret_id = service.get("router_secret_id")
-                pppoe_username = service.get("pppoe_username")
-
-                # Get suspension method from PLAN (not service)
-                method = None
-                plan_obj = None
-                if service.get("plan_id"):
-                    plan_obj = self.plan_service.get_by_id(service["plan_id"])
-                    if plan_obj:
-                        method = getattr(plan_obj, "suspension_method", None)
-
-                # Fallback to service's method for backward compatibility
-                if not method:
-                    method = service.get("suspension_method", "queue_limit")
-
-                logger.info(
-                    f"🔴 Processing service {service['id']}: method={method}, host={host}, ip={ip}, secret_id={secret_id}"
+        # Kill active PPPoE connection to force immediate disconnect
+        if pppoe_username:
+            calls.append(RouterCall("kill_pppoe_connection", (pppoe_username,)))
+
+        return ServiceAction(
+            service["id"], service["router_host"], "suspend", calls, service["client_id"]
+        )
+
+    def _enable_action(self, service: dict[str, Any]) -> ServiceAction:
+        """Ensure service is active (useful for nightly sweep)."""
+        calls = []
+        if service["service_type"] == "pppoe" and service["router_secret_id"]:
+            # Only activate if not active, but RouterOS handles idempotency well
+            calls.append(
+                RouterCall(
+                    "set_pppoe_secret_status",
+                    kwargs={"secret_id": service["router_secret_id"], "disable": False},
                 )
+            )
+        return ServiceAction(
+            service["id"], service["router_host"], "enable", calls, service["client_id"]
+        )
+
+    def _reactivation_action(self, service: dict[str, Any]) -> ServiceAction:
+        """Router calls to lift the suspension of one service after a payment."""
+        ip = service.get("ip_address")
+        method, plan_obj = self._suspension_method(service)
+
+        calls = []
+        if method == "address_list" and ip:
+            calls.append(
+                RouterCall("activate_user_address_list", (ip,), self._address_list_kwargs(plan_obj))
+            )
 
-                # Get router credentials from database
-                router = self._get_router_by_host(host)
-                logger.info(f"🔴 Router credentials fetched for {host}")
-
-                with RouterService(host, router) as rs:
-                    # CASE 1: Address List (Total cut with warning)
-                    if method == "address_list" and ip:
-                        # Get address list config from plan
-                        plan_strategy = (
-                            getattr(plan_obj, "address_list_strategy", "blacklist")
-                            if plan_obj
-                            else "blacklist"
-                        )
-                        plan_list_name = (
-                            getattr(plan_obj, "address_list_name", "morosos")
-                            if plan_obj
-                            else "morosos"
-                        )
-
-                        logger.info(
-                            f"🔴 Suspending via address_list: {ip} (Plan: {plan_list_name}/{plan_strategy})"
-                        )
-                        rs.suspend_user_address_list(
-                            ip, list_name=plan_list_name, strategy=plan_strategy
-                        )
-                        logger.info(f"✅ Address list suspension completed for {ip}")
-
-                    # CASE 2: Queue Limit (Extreme slowness)
-                    elif method == "queue_limit" and ip:
-                        logger.info(f"🔴 Suspending via queue_limit: {ip}")
-                        rs.suspend_user_limit(ip)
-                        logger.info(f"✅ Queue limit suspension completed for {ip}")
-
-                    # CASE 3: PPPoE (The classic)
-                    elif method == "pppoe_secret_disable":
-                        logger.info(
-                            f"🔴 Suspending via pppoe_secret_disable: secret_id={secret_id}"
-                        )
-                        if secret_id:
-                            rs.set_pppoe_secret_status(secret_id, disable=True)
-                            logger.info(f"✅ PPPoE secret {secret_id} disabled successfully")
-                        else:
-                            logger.warning(
-                                f"⚠️ No router_secret_id found for service {service['id']}"
-                            )
-                    else:
-                        logger.warning(
-                            f"⚠️ Suspension method '{method}' not handled or missing required data"
-                        )
-
-                    # Kill active PPPoE connection to force immediate disconnect
-                    if pppoe_username:
-                        logger.info(f"🔪 Killing active PPPoE connection for {pppoe_username}")
-                        kill_result = rs.kill_pppoe_connection(pppoe_username)
-                        logger.info(f"✅ PPPoE connection kill result: {kill_result}")
+        elif method == "queue_limit" and ip:
+            # Need to know the original plan speed
+            plan_obj = self._plan(service["plan_id"])
+            plan = plan_obj.model_dump()
+            if plan:
+                calls.append(RouterCall("activate_user_limit", (ip, plan["max_limit"])))
+            else:
+                logger.warning(
+                    f"No se encontró plan para el servicio {service['id']}, no se pudo restaurar el límite de velocidad."
+                )
 
-            except Exception as e:
-                logger.error(f"❌ Error suspendiendo servicio {service['id']}: {e}", exc_info=True)
+        elif method == "pppoe_secret_disable":
+            if service.get("router_secret_id"):
+                calls.append(
+                    RouterCall("set_pppoe_secret_status", (service["router_secret_id"],), {"disable": False})
+                )
 
-    def _ensure_service_enabled(self, client_id: uuid.UUID):
-        """Helper to ensure service is active (useful for nightly sweep)."""
-        services = self.client_service.get_client_services(client_id)
-        for service in services:
-            try:
-                if service["service_type"] == "pppoe" and service["router_secret_id"]:
-                    # Get router credentials
-                    router = self._get_router_by_host(service["router_host"])
-
-                    # Only activate if not active, but RouterOS handles idempotency well
-                    with RouterService(service["router_host"], router) as rs:
-                        rs.set_pppoe_secret_status(
-                            secret_id=service["router_secret_id"], disable=False
-                        )
-            except Exception as e:
-                logger.error(f"Error asegurando servicio activo {service['id']}: {e}")
+        return ServiceAction(
+            service["id"], service["router_host"], "reactivate", calls, service["client_id"]
+        )
 
     def get_payment_receipt_context(self, payment_id: int) -> dict[str, Any]:
         """
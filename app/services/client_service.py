@@ -16,6 +16,7 @@ from ..models.cpe import CPE
 from ..models.router import Router
 from ..models.service import ClientService as ClientServiceModel
 from ..services.router_service import RouterService
+from .identity_cache import IdentityCache
 from .payment_service import PaymentService
 
 logger = logging.getLogger(__name__)
@@ -39,6 +40,7 @@ class ClientService:
         from .plan_service import PlanService
 
         self.plan_service = PlanService(session)
+        self.lookup = IdentityCache(session)
 
     def get_clients_paginated(
         self,
@@ -71,35 +73,13 @@ class ClientService:
             count_stmt = count_stmt.where(f)
         total_items = self.session.exec(count_stmt).one()
 
-        # Get page items
-        statement = select(Client).order_by(Client.name)
+        # Get page items (with CPE count and billing day in the same query)
+        statement = self._clients_with_extras_statement()
         for f in filters:
             statement = statement.where(f)
 
         statement = statement.offset((page - 1) * page_size).limit(page_size)
-        clients = self.session.exec(statement).all()
-
-        # Enhance with extra data
-        clients_dict_list = []
-        for client in clients:
-            client_dict = client.model_dump()
-            
-            # CPE Count
-            cpe_count_stmt = select(func.count()).select_from(CPE).where(CPE.client_id == client.id)
-            client_dict["cpe_count"] = self.session.exec(cpe_count_stmt).one()
-
-            # Billing Day from latest service
-            service_stmt = (
-                select(ClientServiceModel)
-                .where(ClientServiceModel.client_id == client.id)
-                .order_by(ClientServiceModel.created_at.desc())
-                .limit(1)
-            )
-            latest_service = self.session.exec(service_stmt).first()
-            if latest_service and latest_service.billing_day:
-                client_dict["billing_day"] = latest_service.billing_day
-
-            clients_dict_list.append(client_dict)
+        clients_dict_list = self._rows_to_dicts(self.session.exec(statement).all())
 
         total_pages = (total_items + page_size - 1) // page_size if page_size > 0 else 1
 
@@ -111,35 +91,66 @@ class ClientService:
             "total_pages": total_pages,
         }
 
-    def get_all_clients(self) -> list[dict[str, Any]]:
+    @staticmethod
+    def ranked_services_subquery():
         """
-        Get all clients with their CPE count.
+        (client_id, billing_day, rn) per service; rn == 1 is the client's
+        latest service.
         """
-        statement = select(Client).order_by(Client.name)
-        clients = self.session.exec(statement).all()
+        return select(
+            ClientServiceModel.client_id,
+            ClientServiceModel.billing_day,
+            func.row_number()
+            .over(
+                partition_by=ClientServiceModel.client_id,
+                order_by=(ClientServiceModel.created_at.desc(), ClientServiceModel.id.desc()),
+            )
+            .label("rn"),
+        ).subquery()
 
-        # Convert to dict format for compatibility
-        clients_dict = []
-        for client in clients:
-            client_dict = client.model_dump()
-            cpe_count_stmt = select(func.count()).select_from(CPE).where(CPE.client_id == client.id)
-            client_dict["cpe_count"] = self.session.exec(cpe_count_stmt).one()
-
-            # Fetch billing_day from latest service
-            service_stmt = (
-                select(ClientServiceModel)
-                .where(ClientServiceModel.client_id == client.id)
-                .order_by(ClientServiceModel.created_at.desc())
-                .limit(1)
+    @staticmethod
+    def _clients_with_extras_statement():
+        """
+        Clients ordered by name, with their CPE count and the billing_day of
+        their latest service. Set-based (grouped count + ROW_NUMBER subquery)
+        so the number of queries does not grow with the number of clients.
+        """
+        cpe_counts = (
+            select(CPE.client_id, func.count().label("cpe_count"))
+            .where(CPE.client_id.is_not(None))
+            .group_by(CPE.client_id)
+            .subquery()
+        )
+        ranked_services = ClientService.ranked_services_subquery()
+
+        return (
+            select(Client, cpe_counts.c.cpe_count, ranked_services.c.billing_day)
+            .outerjoin(cpe_counts, cpe_counts.c.client_id == Client.id)
+            .outerjoin(
+                ranked_services,
+                (ranked_services.c.client_id == Client.id) & (ranked_services.c.rn == 1),
             )
-            latest_service = self.session.exec(service_stmt).first()
-            if latest_service and latest_service.billing_day:
-                client_dict["billing_day"] = latest_service.billing_day
+            .order_by(Client.name)
+        )
 
+    @staticmethod
+    def _rows_to_dicts(rows) -> list[dict[str, Any]]:
+        clients_dict = []
+        for client, cpe_count, service_billing_day in rows:
+            client_dict = client.model_dump()
+            client_dict["cpe_count"] = cpe_count or 0
+            # Billing Day from latest service
+            if service_billing_day:
+                client_dict["billing_day"] = service_billing_day
             clients_dict.append(client_dict)
-
         return clients_dict
 
+    def get_all_clients(self) -> list[dict[str, Any]]:
+        """
+        Get all clients with their CPE count (single query).
+        """
+        return self._rows_to_dicts(self.session.exec(self._clients_with_extras_statement()).all())
+
     def get_client_by_id(self, client_id: uuid.UUID) -> dict[str, Any]:
         """Get a single client by ID."""
         client = self.session.get(Client, client_id)
@@ -386,19 +397,16 @@ class ClientService:
             .order_by(ClientServiceModel.created_at.desc())
         )
         services = self.session.exec(statement).all()
+        self.lookup.prefetch_plans(service.plan_id for service in services)
 
         result = []
         for service in services:
             service_dict = service.model_dump()
             # Fetch plan name and price if plan_id is set
-            if service.plan_id:
-                try:
-                    plan = self.plan_service.get_by_id(service.plan_id)
-                    service_dict["plan_name"] = plan.name
-                    service_dict["plan_price"] = plan.price
-                except Exception:
-                    service_dict["plan_name"] = None
-                    service_dict["plan_price"] = None
+            plan = self.lookup.plan(service.plan_id)
+            if plan:
+                service_dict["plan_name"] = plan.name
+                service_dict["plan_price"] = plan.price
             else:
                 service_dict["plan_name"] = None
                 service_dict["plan_price"] = None
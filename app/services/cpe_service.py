@@ -106,19 +106,14 @@ class CPEService:
         Obtiene todos los CPEs con sus datos de estado más recientes y nombre del AP.
         Unified DB version using SQL JOINs.
         """
-        # Note: Using raw SQL with text() because SQLModel doesn't easily support 
-        # complex Window Functions + CTEs + Joins + Selecting everything easily yet.
-        # But we can query from same DB now!
+        # Note: Using raw SQL with text() to select everything from the joins.
+        # Latest stats per CPE come from cpe_latest_stats (one row per MAC).
 
         query = text("""
-            WITH LatestCPEStats AS (
-                SELECT *, ROW_NUMBER() OVER(PARTITION BY cpe_mac ORDER BY timestamp DESC) as rn
-                FROM cpestats
-            )
             SELECT s.*, a.hostname as ap_hostname, c.is_enabled, c.status, c.last_seen,
                     c.ip_address as db_ip_address, c.mac as real_mac, c.hostname as real_hostname
             FROM cpes c
-            LEFT JOIN LatestCPEStats s ON s.cpe_mac = c.mac AND s.rn = 1
+            LEFT JOIN cpe_latest_stats s ON s.cpe_mac = c.mac
             LEFT JOIN aps a ON s.ap_host = a.host
             ORDER BY c.hostname, c.mac;
         """)
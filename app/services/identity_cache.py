@@ -0,0 +1,83 @@
+# app/services/identity_cache.py
+"""
+Caché de identidad de Plan y Router con el alcance de una petición o de una
+pasada de facturación.
+
+La facturación pedía el plan de cada servicio (dos veces en la rama
+queue_limit) y releía el router por servicio; tras cada commit la sesión
+expira los objetos, así que cada get() volvía a ser un SELECT. Aquí:
+
+- Cada fila se lee una vez (prefetch_* carga un lote con un IN) y se guarda
+  una copia desligada de la sesión, que sobrevive a los commits.
+- La contraseña del router se descifra una vez y vive solo en memoria,
+  mientras dure el objeto (no se comparte entre peticiones).
+
+Los hilos del SuspensionExecutor solo reciben las copias ya cargadas.
+"""
+
+from typing import Any, Iterable
+
+from sqlmodel import Session, select
+
+from ..models.plan import Plan
+from ..models.router import Router
+from ..utils.security import decrypt_data
+
+PREFETCH_CHUNK = 500
+
+
+class IdentityCache:
+    def __init__(self, session: Session):
+        self.session = session
+        self._plans: dict[int, Plan | None] = {}
+        self._routers: dict[str, Router | None] = {}
+        self._passwords: dict[str, str | None] = {}
+        self._stats = {"hits": 0, "misses": 0, "queries": 0}
+
+    def _load(self, model, key_column, store: dict, keys: Iterable[Any]) -> None:
+        missing = sorted({k for k in keys if k is not None and k not in store})
+        for i in range(0, len(missing), PREFETCH_CHUNK):
+            chunk = missing[i : i + PREFETCH_CHUNK]
+            self._stats["queries"] += 1
+            for row in self.session.exec(select(model).where(key_column.in_(chunk))).all():
+                store[getattr(row, key_column.key)] = row.model_copy()
+        for key in missing:
+            store.setdefault(key, None)  # Inexistente: no volver a buscarlo
+
+    def _get(self, model, key_column, store: dict, key: Any):
+        if key is None:
+            return None
+        if key in store:
+            self._stats["hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            self._load(model, key_column, store, [key])
+        return store[key]
+
+    def prefetch_plans(self, plan_ids: Iterable[int | None]) -> None:
+        self._load(Plan, Plan.id, self._plans, plan_ids)
+
+    def prefetch_routers(self, hosts: Iterable[str | None]) -> None:
+        self._load(Router, Router.host, self._routers, hosts)
+
+    def plan(self, plan_id: int | None) -> Plan | None:
+        return self._get(Plan, Plan.id, self._plans, plan_id)
+
+    def router(self, host: str | None) -> Router | None:
+        return self._get(Router, Router.host, self._routers, host)
+
+    def router_password(self, host: str) -> str | None:
+        """Contraseña descifrada del router (una vez por pasada)."""
+        if host not in self._passwords:
+            router = self.router(host)
+            password = router.password if router else None
+            if password:
+                try:
+                    password = decrypt_data(password)
+                except Exception:
+                    pass  # Ya en texto plano (mismo criterio que RouterService)
+            self._passwords[host] = password
+        return self._passwords[host]
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "plans": len(self._plans), "routers": len(self._routers)}
@@ -2,6 +2,7 @@ import asyncio
 import contextlib
 
 from ..core.constants import CredentialKeys
+from ..utils.device_clients.mikrotik.async_api import AsyncRouterOsApi, async_api_cache
 from ..utils.device_clients.mikrotik.channels import readonly_channels
 from .base_connector import BaseDeviceConnector
 
@@ -27,6 +28,25 @@ class MikrotikBaseConnector(BaseDeviceConnector):
         port = creds.get(CredentialKeys.PORT, 8729)
         await asyncio.to_thread(readonly_channels.release, host, port)
 
+    def _resolve_credentials(self, host: str, creds: dict = None) -> tuple[str, str, int]:
+        if creds:
+            source = creds
+        else:
+            source = self.get_credentials(host)
+        return (
+            source.get(CredentialKeys.USERNAME),
+            source.get(CredentialKeys.PASSWORD),
+            source.get(CredentialKeys.PORT, 8729),
+        )
+
+    async def async_api(self, host: str, creds: dict = None) -> AsyncRouterOsApi:
+        """
+        Devuelve la conexión asyncio nativa (compartida, multiplexada por .tag)
+        para el host. No ocupa threads del executor.
+        """
+        username, password, port = self._resolve_credentials(host, creds)
+        return await async_api_cache.get_api(host, username, password, port)
+
     @contextlib.contextmanager
     def api_session(self, host: str, creds: dict = None):
         """
@@ -41,17 +61,8 @@ class MikrotikBaseConnector(BaseDeviceConnector):
                    If provided, uses these credentials directly (ad-hoc).
                    If None, looks up credentials from active subscriptions.
         """
-        if creds:
-             # Ad-hoc connection (no subscription needed)
-             username = creds.get(CredentialKeys.USERNAME)
-             password = creds.get(CredentialKeys.PASSWORD)
-             port = creds.get(CredentialKeys.PORT, 8729)
-        else:
-             # Subscription-based connection
-             stored_creds = self.get_credentials(host)
-             username = stored_creds[CredentialKeys.USERNAME]
-             password = stored_creds[CredentialKeys.PASSWORD]
-             port = stored_creds.get(CredentialKeys.PORT, 8729)
+        # Ad-hoc (creds) or subscription-based credentials
+        username, password, port = self._resolve_credentials(host, creds)
 
         try:
             api = readonly_channels.acquire(
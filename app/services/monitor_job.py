@@ -1,11 +1,16 @@
 
 import asyncio
+import json
 import logging
 import os
+import time
+import zlib
 
 import httpx
 
 from app.db.engine import async_session_maker
+from app.db.stats_db import StatsBatch
+from app.utils.device_clients.airos_session import async_airos_sessions
 
 
 from .monitor_service import MonitorService
@@ -13,6 +18,87 @@ from .monitor_service import MonitorService
 # Configuración del logging
 logger = logging.getLogger("MonitorJob")
 
+# Modo "spread": fracción del intervalo en la que se reparten los checks.
+# Se deja margen al final para que el ciclo termine antes del siguiente disparo
+# (APScheduler usa max_instances=1 y saltaría la ejecución solapada).
+SPREAD_WINDOW_RATIO = float(os.getenv("MONITOR_SPREAD_WINDOW_RATIO", "0.8"))
+LOAD_SLOTS = int(os.getenv("MONITOR_LOAD_SLOTS", "30"))
+MONITOR_LOAD_FILE = "/tmp/umanager_monitor_load.json"
+
+
+def get_phase_offset(key: str, window: float) -> float:
+    """
+    Offset estable (en segundos) de un dispositivo dentro de la ventana.
+    Usa crc32 en lugar de hash() para que sea igual entre procesos/reinicios.
+    """
+    if window <= 0:
+        return 0.0
+    bucket = zlib.crc32(key.encode("utf-8")) / 0xFFFFFFFF
+    return bucket * window
+
+
+class SlotLoadTracker:
+    """
+    Acumula la carga de un ciclo por slot de tiempo (checks, escrituras y
+    segundos ocupados) para verificar que el modo spread aplana los picos.
+    """
+
+    def __init__(self, interval: float, slots: int = LOAD_SLOTS):
+        self.interval = max(float(interval), 1.0)
+        self.slots = max(int(slots), 1)
+        self.slot_width = self.interval / self.slots
+        self.checks = [0] * self.slots
+        self.writes = [0] * self.slots
+        self.failures = [0] * self.slots
+        self.busy = [0.0] * self.slots
+
+    def record(self, started_at: float, duration: float, wrote: bool, failed: bool = False):
+        """Registra un check que empezó `started_at` segundos tras el inicio del ciclo."""
+        slot = min(int(max(started_at, 0.0) / self.slot_width), self.slots - 1)
+        self.checks[slot] += 1
+        self.busy[slot] += duration
+        if wrote:
+            self.writes[slot] += 1
+        if failed:
+            self.failures[slot] += 1
+
+    def summary(self, mode: str, cycle_duration: float) -> dict:
+        total = sum(self.checks)
+        mean = total / self.slots
+        peak = max(self.checks)
+        return {
+            "mode": mode,
+            "timestamp": time.time(),
+            "interval": self.interval,
+            "slot_seconds": round(self.slot_width, 2),
+            "cycle_duration": round(cycle_duration, 2),
+            "devices": total,
+            "writes": sum(self.writes),
+            "failures": sum(self.failures),
+            "peak_checks_per_slot": peak,
+            # 1.0 = carga perfectamente plana; en modo burst ~= número de slots
+            "peak_to_mean": round(peak / mean, 2) if mean else 0.0,
+            "checks": self.checks,
+            "writes_per_slot": self.writes,
+            "busy_seconds": [round(b, 2) for b in self.busy],
+        }
+
+    def write(self, mode: str, cycle_duration: float) -> None:
+        try:
+            with open(MONITOR_LOAD_FILE, "w") as f:
+                json.dump(self.summary(mode, cycle_duration), f)
+        except Exception as e:
+            logger.warning(f"No se pudieron guardar las métricas de carga: {e}")
+
+
+def read_monitor_load() -> dict | None:
+    """Lee las métricas por slot del último ciclo (escritas por el proceso scheduler)."""
+    try:
+        with open(MONITOR_LOAD_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 
 def notify_api_update():
     """
@@ -53,16 +139,40 @@ def run_monitor_cycle():
         # Continue with default
         pass
 
+    schedule_mode = "burst"
+    interval = 300
+    try:
+        schedule_mode = (get_setting_sync("monitor_schedule_mode") or "burst").strip().lower()
+        interval_str = get_setting_sync("default_monitor_interval")
+        interval = int(interval_str) if interval_str and interval_str.isdigit() else 300
+    except Exception as e:
+        logger.error(f"Error fetching schedule settings: {e}")
+
     # 2. Run Async Cycle
     try:
-        asyncio.run(run_monitor_cycle_async(max_workers))
+        asyncio.run(
+            run_monitor_cycle_async(
+                max_workers, spread=schedule_mode == "spread", interval=interval
+            )
+        )
     except Exception as e:
         logger.exception(f"Error en el ciclo del monitor: {e}")
 
 
-async def run_monitor_cycle_async(max_workers: int):
+async def run_monitor_cycle_async(max_workers: int, spread: bool = False, interval: int = 300):
+    """
+    Ciclo de monitoreo. En modo burst todos los dispositivos se verifican a la vez;
+    en modo spread cada uno espera su offset de fase (hash del host) dentro de
+    SPREAD_WINDOW_RATIO * interval, repartiendo checks y escrituras en el tiempo.
+    """
     monitor_service = MonitorService()
-    logger.info(f"--- Iniciando ciclo de escaneo (concurrency: {max_workers}) ---")
+    mode = "spread" if spread else "burst"
+    window = interval * SPREAD_WINDOW_RATIO if spread else 0.0
+    tracker = SlotLoadTracker(interval)
+    cycle_start = time.monotonic()
+    logger.info(
+        f"--- Iniciando ciclo de escaneo (concurrency: {max_workers}, mode: {mode}) ---"
+    )
 
     async with async_session_maker() as session:
         devices = await monitor_service.get_active_devices(session)
@@ -72,14 +182,34 @@ async def run_monitor_cycle_async(max_workers: int):
         all_tasks = []
         # Create a semaphore to limit concurrency equivalent to max_workers
         sem = asyncio.Semaphore(max_workers)
+        # Stats de todos los APs en pocas transacciones (ver StatsBatch)
+        stats_batch = StatsBatch()
 
-        async def sem_check_ap(ap_obj):
-            async with sem:
-                await monitor_service.check_ap(session, ap_obj)
+        async def check_ap(session, ap_obj):
+            return await monitor_service.check_ap(session, ap_obj, stats_batch=stats_batch)
 
-        async def sem_check_router(router_obj):
+        async def run_check(key, check, device):
+            offset = get_phase_offset(key, window)
+            delay = cycle_start + offset - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
             async with sem:
-                await monitor_service.check_router(session, router_obj)
+                started = time.monotonic()
+                wrote, failed = False, False
+                try:
+                    wrote = bool(await check(session, device))
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Error inesperado verificando {key}: {e}")
+                tracker.record(
+                    started - cycle_start, time.monotonic() - started, wrote, failed
+                )
+
+        def sem_check_ap(ap_obj):
+            return run_check(f"ap:{ap_obj.host}", check_ap, ap_obj)
+
+        def sem_check_router(router_obj):
+            return run_check(f"router:{router_obj.host}", monitor_service.check_router, router_obj)
 
         if not aps and not routers:
             logger.info("No hay dispositivos para monitorear.")
@@ -94,6 +224,7 @@ async def run_monitor_cycle_async(max_workers: int):
 
             if all_tasks:
                 await asyncio.gather(*all_tasks)
+            await stats_batch.flush(session)
 
             # Notificar a la API
             logger.info(
@@ -104,4 +235,10 @@ async def run_monitor_cycle_async(max_workers: int):
             # notify_api_update is currently sync using httpx.post (blocking).
             await asyncio.to_thread(notify_api_update)
 
-            logger.info("--- Ciclo de escaneo completado ---")
+            # Cerrar las conexiones keep-alive de este loop (asyncio.run crea uno por ciclo);
+            # cookies/CSRF de AirOS se conservan para el siguiente ciclo
+            await async_airos_sessions.close_transport()
+
+            cycle_duration = time.monotonic() - cycle_start
+            await asyncio.to_thread(tracker.write, mode, cycle_duration)
+            logger.info(f"--- Ciclo de escaneo completado ({cycle_duration:.1f}s) ---")
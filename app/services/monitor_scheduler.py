@@ -3,11 +3,15 @@ import logging
 import os
 from datetime import datetime, timedelta
 
-from ..core.constants import DeviceStatus
+from ..core.constants import DeviceStatus, DeviceVendor
 from ..db import router_db
 from ..db.stats_db import save_router_monitor_stats
 from ..db.engine import get_session
+from ..db.status_buffer import status_buffer
 from ..utils.cache import cache_manager
+from ..utils.device_clients.mikrotik.async_api import ASYNC_CLIENT_ENABLED, async_api_cache
+from .poll_leases import poll_leases
+from .polling_engine import polling_engine
 from .router_connector import router_connector
 
 logger = logging.getLogger(__name__)
@@ -20,7 +24,10 @@ ROUTER_HISTORY_INTERVAL = int(os.getenv("ROUTER_HISTORY_INTERVAL", "300"))
 
 
 class MonitorScheduler:
-    """Scheduler centralizado: polling paralelo a routers con timeout de desconexión."""
+    """
+    Gestor de suscripciones de routers con timeout de desconexión.
+    El polling se delega al PollingEngine compartido (un job por router).
+    """
 
     def __init__(self, poll_interval: float = 2.0):
         self._running = False
@@ -68,6 +75,8 @@ class MonitorScheduler:
             # Conexión exitosa: resetear backoff
             info["consecutive_failures"] = 0
             info["backoff_until"] = None
+            if not polling_engine.is_scheduled(self._job_key(host)):
+                self._schedule(host)
             logger.info(f"[MonitorScheduler] Subscribed to {host} (ref_count={info['ref_count']})")
         except Exception as e:
             # Sanitize error message to hide passwords
@@ -106,6 +115,8 @@ class MonitorScheduler:
 
         if info["ref_count"] <= 0:
             info["last_unsubscribe_time"] = datetime.now()
+            polling_engine.unschedule(self._job_key(host))
+            await poll_leases.release(self._job_key(host))
             logger.info(
                 f"[MonitorScheduler] Marked {host} for cleanup in {self.UNSUBSCRIBE_TIMEOUT}s (ref_count=0)"
             )
@@ -136,7 +147,7 @@ class MonitorScheduler:
         logger.info("[MonitorScheduler] Cleanup task stopped")
 
     async def _do_cleanup(self, host: str):
-        """Limpia suscripciones, cache y credenciales de un router."""
+        """Limpia suscripciones, cache, sesión API asyncio y credenciales de un router."""
         if host not in self._subscribed_routers:
             return
 
@@ -148,27 +159,25 @@ class MonitorScheduler:
             return
 
         del self._subscribed_routers[host]
-        cache_manager.get_store("router_stats").delete(host)
+        polling_engine.unschedule(self._job_key(host))
+        await poll_leases.release(self._job_key(host))
+        # Si otro worker sigue sondeándolo, la entrada compartida es suya (caduca sola)
+        if not await poll_leases.polled_elsewhere(self._job_key(host)):
+            await cache_manager.get_store("router_stats").delete_async(host)
+        await async_api_cache.drop(host)
         router_connector.cleanup_credentials(host)
 
         logger.info(f"[MonitorScheduler] Fully unsubscribed from {host} (timeout expired)")
 
     async def _update_db_status(self, host: str, status: str, result: dict = None):
-        """Actualiza el estado del router en la base de datos."""
+        """Encola el estado del router (write-behind: ver db/status_buffer.py)."""
         try:
-            async for session in get_session():
-                await router_db.update_router_status(session, host, status, result)
-                # Session closes automatically due to generator? 
-                # Actually get_session yields and assumes caller handles commit/close logic via 'yield' typically?
-                # app/db/engine.py get_session typically yields session and closes in finally.
-                # So we just break after one usage.
-                break
-                
-            logger.debug(f"[MonitorScheduler] DB updated: {host} -> {status}")
+            await status_buffer.update("router", host, router_db.router_status_fields(status, result))
+            logger.debug(f"[MonitorScheduler] DB status queued: {host} -> {status}")
         except Exception as e:
             logger.error(f"[MonitorScheduler] Failed to update DB for {host}: {e}")
 
-    def reset_connection(self, host: str) -> dict:
+    async def reset_connection(self, host: str) -> dict:
         """
         Resetea el estado de conexión de un router (backoff, errores, etc.)
         sin eliminarlo ni perder su configuración.
@@ -189,7 +198,7 @@ class MonitorScheduler:
         # 2. Limpiar caché de stats
         try:
             stats_cache = cache_manager.get_store("router_stats")
-            stats_cache.delete(host)
+            await stats_cache.delete_async(host)
             logger.info(f"[MonitorScheduler] Cleared stats cache for {host}")
         except Exception as e:
             logger.warning(f"[MonitorScheduler] Could not clear cache for {host}: {e}")
@@ -199,6 +208,7 @@ class MonitorScheduler:
             from ..utils.device_clients.mikrotik import connection as mikrotik_conn
 
             mikrotik_conn.remove_pool(host)
+            await async_api_cache.drop(host)
             logger.info(f"[MonitorScheduler] Cleared connection pool for {host}")
         except Exception as e:
             logger.warning(f"[MonitorScheduler] Could not clear pool for {host}: {e}")
@@ -225,7 +235,7 @@ class MonitorScheduler:
         try:
             result = await self._poll_host(host)
             if result:
-                stats_cache.set(host, result)
+                await stats_cache.set_async(host, result)
                 await self._update_db_status(host, DeviceStatus.ONLINE, result)
                 return result
             else:
@@ -236,72 +246,90 @@ class MonitorScheduler:
             await self._update_db_status(host, DeviceStatus.OFFLINE)
             return {"error": str(e)}
 
+    @staticmethod
+    def _job_key(host: str) -> str:
+        return f"router:{host}"
+
+    def _schedule(self, host: str) -> None:
+        """Registra el router en el PollingEngine (primer poll inmediato)."""
+
+        async def on_result(result):
+            await self._handle_poll_result(host, result)
+
+        if ASYNC_CLIENT_ENABLED:
+
+            async def fetch():
+                return await router_connector.fetch_router_stats_async(host)
+
+        else:
+
+            def fetch():
+                return router_connector.fetch_router_stats(host)
+
+        polling_engine.schedule(
+            self._job_key(host),
+            fetch=fetch,
+            on_result=on_result,
+            interval=self.poll_interval,
+            pool=DeviceVendor.MIKROTIK,
+            claim=poll_leases.claimer(self._job_key(host), self.poll_interval),
+        )
+
+    async def _handle_poll_result(self, host: str, result) -> None:
+        """Procesa el resultado de un poll: cache, estado en DB e historial."""
+        info = self._subscribed_routers.get(host)
+        if info is None or info["ref_count"] <= 0:
+            return
+
+        stats_cache = cache_manager.get_store("router_stats", default_ttl=5)
+
+        if isinstance(result, Exception):
+            logger.error(f"[MonitorScheduler] Error polling {host}: {result}")
+            await stats_cache.set_async(host, {"error": str(result)})
+            await self._update_db_status(host, DeviceStatus.OFFLINE)
+        elif result:
+            await stats_cache.set_async(host, result)
+            await self._update_db_status(host, DeviceStatus.ONLINE, result)
+
+            # Save to history if enough time has passed
+            current_time = datetime.now()
+            last_save = info.get("last_history_save")
+            if (
+                last_save is None
+                or (current_time - last_save).total_seconds() >= ROUTER_HISTORY_INTERVAL
+            ):
+                try:
+                    async for session in get_session():
+                        await save_router_monitor_stats(session, host, result)
+                        break
+
+                    info["last_history_save"] = current_time
+                    logger.debug(f"[MonitorScheduler] Saved history for {host}")
+                except Exception as e:
+                    logger.error(f"[MonitorScheduler] Failed to save history for {host}: {e}")
+
     async def run(self):
-        """Loop principal Async."""
+        """
+        Loop de mantenimiento (limpieza de suscripciones expiradas).
+        El polling en sí lo ejecuta PollingEngine.run().
+        """
         self._running = True
-        logger.info("[MonitorScheduler] Iniciando loop de polling...")
-        cleanup_task = asyncio.create_task(self._cleanup_task())
-        stats_cache = cache_manager.get_store("router_stats", default_ttl=5)
+        logger.info("[MonitorScheduler] Iniciando (polling delegado a PollingEngine)...")
 
         try:
-            while self._running:
-                targets = list(self._subscribed_routers.items())
-
-                if not targets:
-                    await asyncio.sleep(1)
-                    continue
-
-                active_targets = [(host, info) for host, info in targets if info["ref_count"] > 0]
-
-                if not active_targets:
-                    await asyncio.sleep(1)
-                    continue
-
-                tasks = [self._poll_host(host) for host, _ in active_targets]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                current_time = datetime.now()
-                for (host, info), result in zip(active_targets, results):
-                    if isinstance(result, Exception):
-                        logger.error(f"[MonitorScheduler] Error polling {host}: {result}")
-                        stats_cache.set(host, {"error": str(result)})
-                        await self._update_db_status(host, DeviceStatus.OFFLINE)
-                    elif result:
-                        stats_cache.set(host, result)
-                        await self._update_db_status(host, DeviceStatus.ONLINE, result)
-
-                        # Save to history if enough time has passed
-                        last_save = info.get("last_history_save")
-                        if (
-                            last_save is None
-                            or (current_time - last_save).total_seconds() >= ROUTER_HISTORY_INTERVAL
-                        ):
-                            try:
-                                async for session in get_session():
-                                    await save_router_monitor_stats(session, host, result)
-                                    break
-                                    
-                                info["last_history_save"] = current_time
-                                logger.debug(f"[MonitorScheduler] Saved history for {host}")
-                            except Exception as e:
-                                logger.error(
-                                    f"[MonitorScheduler] Failed to save history for {host}: {e}"
-                                )
-
-                await asyncio.sleep(self.poll_interval)
+            await self._cleanup_task()
         finally:
             self._running = False
-            cleanup_task.cancel()
-            try:
-                await cleanup_task
-            except asyncio.CancelledError:
-                pass
 
         logger.info("[MonitorScheduler] Detenido.")
 
     async def _poll_host(self, host: str) -> dict:
-        """Ejecuta la consulta al router en un thread separado."""
-        return await asyncio.to_thread(router_connector.fetch_router_stats, host)
+        """Ejecuta la consulta al router en el pool de workers de MikroTik."""
+        if ASYNC_CLIENT_ENABLED:
+            return await router_connector.fetch_router_stats_async(host)
+        return await polling_engine.run_blocking(
+            DeviceVendor.MIKROTIK, router_connector.fetch_router_stats, host
+        )
 
 
 # Singleton
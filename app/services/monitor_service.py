@@ -19,7 +19,7 @@ from ..db.router_db import (
     get_router_status,
     update_router_status,
 )
-from ..db.stats_db import save_device_stats, save_router_monitor_stats
+from ..db.stats_db import StatsBatch, save_device_stats, save_router_monitor_stats
 from ..models.ap import AP
 from ..models.router import Router
 from ..services.router_service import (
@@ -30,6 +30,8 @@ from ..services.router_service import (
 )
 from ..utils.alerter import send_telegram_alert
 from ..utils.device_clients.adapter_factory import get_device_adapter
+from ..utils.device_clients.airos_session import UBIQUITI_ASYNC_HTTP
+from ..utils.device_clients.mikrotik.async_api import ASYNC_CLIENT_ENABLED
 
 from ..services.router_connector import router_connector
 
@@ -48,8 +50,14 @@ class MonitorService:
             "routers": routers,
         }
 
-    async def check_ap(self, session: AsyncSession, ap: AP):
-        """Verifica el estado de un AP usando adaptadores, guarda estadísticas y envía alertas."""
+    async def check_ap(
+        self, session: AsyncSession, ap: AP, stats_batch: StatsBatch | None = None
+    ) -> bool:
+        """
+        Verifica el estado de un AP usando adaptadores, guarda estadísticas y envía alertas.
+        Devuelve True si el AP respondió y se guardaron sus estadísticas.
+        Con stats_batch las filas se acumulan y se escriben junto con las de otros APs.
+        """
         host = ap.host
         vendor = ap.vendor or DeviceVendor.UBIQUITI
         logger.info(f"--- Verificando AP en {host} (vendor: {vendor}) ---")
@@ -72,8 +80,19 @@ class MonitorService:
                 finally:
                     adapter.disconnect()
 
-            # Run network check in thread
-            status = await asyncio.to_thread(do_network_check)
+            if vendor == DeviceVendor.UBIQUITI and UBIQUITI_ASYNC_HTTP:
+                # AirOS over the shared httpx.AsyncClient pool (no thread)
+                adapter = get_device_adapter(
+                    host=host,
+                    username=ap.username,
+                    password=ap.password,
+                    vendor=vendor,
+                    port=port,
+                )
+                status = await adapter.get_status_async()
+            else:
+                # Run network check in thread
+                status = await asyncio.to_thread(do_network_check)
             previous_status = await get_ap_status(session, host)
 
             if status and status.is_online:
@@ -82,7 +101,12 @@ class MonitorService:
                 logger.info(f"Estado de '{hostname}' ({host}): ONLINE")
 
                 # Save stats (stats_db is now async)
-                await save_device_stats(session, host, status, vendor=vendor)
+                if stats_batch is None:
+                    await save_device_stats(session, host, status, vendor=vendor)
+                else:
+                    stats_batch.add_status(host, status, vendor=vendor)
+                    if stats_batch.should_flush():
+                        await stats_batch.flush(session)
 
                 # Update AP status (async)
                 await update_ap_status(
@@ -101,6 +125,7 @@ class MonitorService:
                     message = f"✅ *AP RECUPERADO*\n\nEl AP *{hostname}* (`{host}`) ha vuelto a estar en línea."
                     await add_event_log(session, host, "ap", "success", f"El AP {hostname} ({host}) está en línea nuevamente.")
                     await asyncio.to_thread(send_telegram_alert, message)
+                return True
             else:
                 await self._handle_offline_ap(session, host, previous_status)
 
@@ -108,6 +133,7 @@ class MonitorService:
             logger.error(f"Error procesando AP {host}: {e}")
             prev_stat = await get_ap_status(session, host)
             await self._handle_offline_ap(session, host, prev_stat)
+        return False
 
     async def _handle_offline_ap(self, session: AsyncSession, host: str, previous_status: str):
         logger.warning(f"Estado de {host}: OFFLINE")
@@ -120,10 +146,10 @@ class MonitorService:
             await add_event_log(session, host, "ap", "danger", f"El AP {hostname} ({host}) ha perdido conexión.")
             await asyncio.to_thread(send_telegram_alert, message)
 
-    async def check_router(self, session: AsyncSession, router: Router):
+    async def check_router(self, session: AsyncSession, router: Router) -> bool:
         """
         Verifica el estado de un Router usando router_connector (mismo mecanismo que el dashboard).
-        Actualiza recursos y envía alertas.
+        Actualiza recursos y envía alertas. Devuelve True si el router respondió.
         """
         host = router.host
         logger.info(f"--- Verificando Router en {host} ---")
@@ -143,11 +169,15 @@ class MonitorService:
                 "port": router.api_ssl_port,
             }
 
-            # Run blocking call in thread
-            def do_check():
-                return router_connector.fetch_router_stats(host, creds=creds)
+            if ASYNC_CLIENT_ENABLED:
+                # Native asyncio client: no thread per in-flight router
+                status_data = await router_connector.fetch_router_stats_async(host, creds=creds)
+            else:
+                # Run blocking call in thread
+                def do_check():
+                    return router_connector.fetch_router_stats(host, creds=creds)
 
-            status_data = await asyncio.to_thread(do_check)
+                status_data = await asyncio.to_thread(do_check)
             
             # Check for explicit error key returned by fetch_router_stats
             if status_data and "error" in status_data:
@@ -180,6 +210,7 @@ class MonitorService:
                 message = f"✅ *ROUTER RECUPERADO*\n\nEl Router *{hostname}* (`{host}`) ha vuelto a estar en línea."
                 await add_event_log(session, host, "router", "success", f"Router {hostname} ({host}) recuperado.")
                 await asyncio.to_thread(send_telegram_alert, message)
+            return True
         else:
             current_status = DeviceStatus.OFFLINE
             logger.warning(f"Estado de Router {host}: OFFLINE")
@@ -199,3 +230,4 @@ class MonitorService:
                     f"Router {hostname} ({host}) ha dejado de responder.",
                 )
                 await asyncio.to_thread(send_telegram_alert, message)
+            return False
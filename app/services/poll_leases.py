@@ -0,0 +1,147 @@
+# app/services/poll_leases.py
+"""
+Leases por dispositivo para el polling en vivo con varios workers de uvicorn.
+
+Cada worker arranca sus propios schedulers y su tabla de suscripciones: con
+UVICORN_WORKERS=4 un router abierto en varias pestañas podía sondearse cuatro
+veces por intervalo. Con CACHE_BACKEND=redict:
+
+- Antes de cada poll el worker reclama `poll_lease:<job_key>` en Redict (lock
+  con TTL, token = instance_id del worker). Solo el dueño sondea y escribe
+  cache, estado en BD e historial; los demás leen el cache compartido.
+- El dueño renueva el lease en cada poll. Al quedarse sin suscriptores (o al
+  apagarse) lo libera y otro worker con suscriptores lo toma en su siguiente
+  vencimiento; si el dueño muere, el lease caduca (POLL_LEASE_MIN_TTL o 3
+  intervalos).
+- Los dispositivos se reparten entre los workers según quién los reclama
+  primero, en lugar de concentrar todo el polling en un único líder.
+
+Con el cache en memoria cada worker tiene su propio cache, así que todos
+siguen sondeando sus dispositivos (claim() siempre devuelve True). Si Redict
+falla, también: mejor un poll duplicado que un dashboard sin datos.
+"""
+
+import logging
+import os
+
+from ..utils.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+POLL_LEASE_MIN_TTL = float(os.getenv("POLL_LEASE_MIN_TTL", "15"))
+POLL_LEASE_PREFIX = "poll_lease:"
+
+
+def lease_ttl(interval: float) -> float:
+    """TTL del lease: cubre varios polls fallidos o lentos del dueño."""
+    return max(interval * 3, POLL_LEASE_MIN_TTL)
+
+
+class PollLeases:
+    """
+    Uso (en el PollingEngine, vía el argumento claim de schedule()):
+
+        polling_engine.schedule(key, ..., claim=poll_leases.claimer(key, interval))
+        ...
+        await poll_leases.release(key)   # al quedarse sin suscriptores
+    """
+
+    def __init__(self):
+        self._held: dict[str, object] = {}  # job_key -> redis Lock
+        self._closed = False  # Tras release_all() (shutdown) no se reclaman más
+        self._stats = {"acquired": 0, "renewed": 0, "not_owner": 0, "lost": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return cache_manager.is_using_redict
+
+    async def claim(self, key: str, interval: float) -> bool:
+        """True si este worker debe sondear `key` en este vencimiento."""
+        if not self.enabled:
+            return True
+        if self._closed:
+            return False
+
+        import redis.asyncio as redis
+        from redis.exceptions import LockError
+
+        from ..utils.cache.redict_store import redict_manager
+
+        ttl = lease_ttl(interval)
+        lock = self._held.get(key)
+        try:
+            if lock is not None:
+                lock.timeout = ttl
+                try:
+                    await lock.reacquire()
+                    self._stats["renewed"] += 1
+                    return True
+                except LockError:
+                    # Caducó y otro worker lo tomó (o Redict se reinició)
+                    self._held.pop(key, None)
+                    self._stats["lost"] += 1
+                    logger.info(f"[PollLeases] Lease de {key} perdido")
+
+            lock = redict_manager.get_client().lock(
+                f"{POLL_LEASE_PREFIX}{key}", timeout=ttl, blocking=False, thread_local=False
+            )
+            if await lock.acquire(token=redict_manager.instance_id):
+                self._held[key] = lock
+                self._stats["acquired"] += 1
+                logger.info(f"[PollLeases] Este worker sondea {key}")
+                return True
+            self._stats["not_owner"] += 1
+            return False
+        except (redis.RedisError, RuntimeError) as e:
+            self._stats["errors"] += 1
+            logger.warning(f"[PollLeases] No se pudo reclamar {key}, sondeando igualmente: {e}")
+            return True
+
+    async def polled_elsewhere(self, key: str) -> bool:
+        """
+        True si otro worker tiene el lease de `key` (o no se puede saber): su
+        entrada del cache compartido está viva y no hay que borrarla.
+        """
+        if not self.enabled or key in self._held:
+            return False
+
+        from ..utils.cache.redict_store import redict_manager
+
+        try:
+            owner = await redict_manager.get_client().get(f"{POLL_LEASE_PREFIX}{key}")
+        except Exception as e:
+            logger.debug(f"[PollLeases] No se pudo consultar el dueño de {key}: {e}")
+            return True
+        return owner is not None and owner.decode() != redict_manager.instance_id
+
+    def claimer(self, key: str, interval: float):
+        """Corutina sin argumentos para PollingEngine.schedule(claim=...)."""
+
+        async def claim() -> bool:
+            return await self.claim(key, interval)
+
+        return claim
+
+    async def release(self, key: str) -> None:
+        """Libera el lease para que otro worker con suscriptores lo tome ya."""
+        lock = self._held.pop(key, None)
+        if lock is None:
+            return
+        try:
+            await lock.release()
+            logger.info(f"[PollLeases] Lease de {key} liberado")
+        except Exception as e:
+            logger.debug(f"[PollLeases] Lease de {key} ya no era nuestro: {e}")
+
+    async def release_all(self) -> None:
+        """Shutdown: cede todos los dispositivos y deja de reclamar (polls aún en vuelo incluidos)."""
+        self._closed = True
+        for key in list(self._held):
+            await self.release(key)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "enabled": self.enabled, "held": sorted(self._held)}
+
+
+# Singleton
+poll_leases = PollLeases()
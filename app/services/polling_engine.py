@@ -0,0 +1,314 @@
+# app/services/polling_engine.py
+"""
+PollingEngine: Motor único de polling para routers, APs y switches.
+
+Reemplaza los loops independientes de MonitorScheduler, APMonitorScheduler y
+SwitchMonitorScheduler. Cada dispositivo tiene su propio "next due time" dentro
+de un heap; el dispatcher despierta cuando vence el siguiente y lanza el poll
+sin esperar a que termine el resto del lote.
+
+Las llamadas bloqueantes (routeros_api, httpx sync) se ejecutan en pools de
+threads acotados por vendor, de forma que un login lento de RouterOS no retrasa
+a los demás dispositivos ni satura el executor por defecto de asyncio.
+Si `fetch` es una corutina (cliente asyncio nativo) se ejecuta directamente en
+el loop, acotada por el mismo semáforo del pool pero sin ocupar un thread.
+
+Con varios workers de uvicorn, `claim` (ver poll_leases.py) decide en cada
+vencimiento si este proceso es el dueño del dispositivo; si no lo es, el poll
+se salta y solo se reprograma.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..core.constants import DeviceVendor
+
+logger = logging.getLogger(__name__)
+
+# Workers per vendor pool (env configurable)
+DEFAULT_POOL_SIZES = {
+    DeviceVendor.MIKROTIK.value: int(os.getenv("POLL_WORKERS_MIKROTIK", "16")),
+    DeviceVendor.UBIQUITI.value: int(os.getenv("POLL_WORKERS_UBIQUITI", "16")),
+}
+FALLBACK_POOL_SIZE = int(os.getenv("POLL_WORKERS_DEFAULT", "8"))
+MAX_IDLE_WAIT = 1.0  # Upper bound for dispatcher sleep (seconds)
+
+
+def _pool_name(pool: Any) -> str:
+    """Normaliza el nombre del pool (acepta DeviceVendor o str)."""
+    return pool.value if isinstance(pool, DeviceVendor) else str(pool)
+
+
+@dataclass
+class PollJob:
+    """Dispositivo registrado en el motor de polling."""
+
+    key: str
+    pool: str
+    fetch: Callable[[], Any]
+    on_result: Callable[[Any], Awaitable[None]]
+    interval: float
+    claim: Callable[[], Awaitable[bool]] | None = None
+    generation: int = 0
+    in_flight: bool = False
+    next_due: float = 0.0
+    last_started: float | None = None
+    last_duration: float | None = None
+
+
+@dataclass
+class _PoolStats:
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    not_owner: int = 0
+    max_lag: float = 0.0
+    lag_samples: list[float] = field(default_factory=list)
+
+
+class PollingEngine:
+    """
+    Scheduler basado en heap (next_due, seq, key) con pools de workers por vendor.
+
+    - schedule(): registra o actualiza un dispositivo (idempotente por key).
+    - unschedule(): lo retira; las entradas del heap se descartan de forma perezosa.
+    - Un dispositivo nunca tiene más de un poll en vuelo: si sigue ocupado cuando
+      vence su intervalo, se reprograma tras terminar.
+    """
+
+    def __init__(self, pool_sizes: dict[str, int] | None = None):
+        self._pool_sizes = dict(DEFAULT_POOL_SIZES)
+        if pool_sizes:
+            self._pool_sizes.update(pool_sizes)
+        self._jobs: dict[str, PollJob] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, _PoolStats] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._running = False
+
+    # --- Registro de dispositivos ---
+
+    def schedule(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        on_result: Callable[[Any], Awaitable[None]],
+        interval: float,
+        pool: str = DeviceVendor.MIKROTIK,
+        delay: float = 0.0,
+        claim: Callable[[], Awaitable[bool]] | None = None,
+    ) -> None:
+        """
+        Registra un dispositivo. Si ya existe, actualiza intervalo/callbacks y
+        lo reprograma a `now + delay`.
+
+        Args:
+            key: Identificador único (ej. "router:10.0.0.1").
+            fetch: Función bloqueante (o corutina) que devuelve el resultado del poll.
+            on_result: Corutina que recibe el resultado o la excepción.
+            interval: Segundos entre polls.
+            pool: Pool de workers a usar (normalmente el vendor).
+            delay: Retraso del primer poll (0 = inmediato).
+            claim: Corutina que devuelve False si otro worker sondea el dispositivo.
+        """
+        pool = _pool_name(pool)
+        job = self._jobs.get(key)
+        if job is None:
+            job = PollJob(
+                key=key, pool=pool, fetch=fetch, on_result=on_result, interval=interval, claim=claim
+            )
+            self._jobs[key] = job
+        else:
+            job.pool = pool
+            job.fetch = fetch
+            job.on_result = on_result
+            job.interval = interval
+            job.claim = claim
+            job.generation += 1
+
+        if not job.in_flight:
+            self._push(job, time.monotonic() + delay)
+        logger.debug(f"[PollingEngine] Scheduled {key} (pool={pool}, interval={interval}s)")
+
+    def unschedule(self, key: str) -> None:
+        """Retira un dispositivo del motor. Un poll en vuelo termina pero no se reprograma."""
+        if self._jobs.pop(key, None) is not None:
+            logger.debug(f"[PollingEngine] Unscheduled {key}")
+
+    def is_scheduled(self, key: str) -> bool:
+        return key in self._jobs
+
+    def _push(self, job: PollJob, due: float) -> None:
+        job.next_due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job.key, job.generation))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # --- Ejecución ---
+
+    def _get_executor(self, pool: str) -> ThreadPoolExecutor:
+        if pool not in self._executors:
+            size = self._pool_sizes.get(pool, FALLBACK_POOL_SIZE)
+            self._executors[pool] = ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix=f"poll-{pool}"
+            )
+            self._semaphores[pool] = asyncio.Semaphore(size)
+            self._stats[pool] = _PoolStats()
+        return self._executors[pool]
+
+    async def run_blocking(self, pool: str, func: Callable[..., Any], *args) -> Any:
+        """Ejecuta una llamada bloqueante en el pool acotado del vendor."""
+        pool = _pool_name(pool)
+        executor = self._get_executor(pool)
+        async with self._semaphores[pool]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+
+    async def _claim(self, job: PollJob) -> bool:
+        if job.claim is None:
+            return True
+        try:
+            return await job.claim()
+        except Exception as e:
+            logger.warning(f"[PollingEngine] Claim failed for {job.key}, polling anyway: {e}")
+            return True
+
+    def _reschedule(self, job: PollJob, due: float) -> None:
+        # Reprogramar solo si sigue registrado (puede haberse desuscrito mientras tanto)
+        current = self._jobs.get(job.key)
+        if current is not None and current is job:
+            next_due = max(due + job.interval, time.monotonic())
+            self._push(job, next_due)
+
+    async def _execute(self, job: PollJob, due: float) -> None:
+        stats = self._stats.setdefault(job.pool, _PoolStats())
+        executor = self._get_executor(job.pool)
+        if not await self._claim(job):
+            # Otro worker es el dueño: su resultado llega por el cache compartido
+            stats.not_owner += 1
+            job.in_flight = False
+            self._reschedule(job, due)
+            return
+
+        started = time.monotonic()
+        lag = started - due
+        stats.max_lag = max(stats.max_lag, lag)
+        stats.lag_samples.append(lag)
+        if len(stats.lag_samples) > 256:
+            del stats.lag_samples[:128]
+
+        job.last_started = started
+        stats.in_flight += 1
+        try:
+            async with self._semaphores[job.pool]:
+                if asyncio.iscoroutinefunction(job.fetch):
+                    result = await job.fetch()
+                else:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(executor, job.fetch)
+            stats.completed += 1
+        except Exception as e:
+            result = e
+            stats.failed += 1
+        finally:
+            stats.in_flight -= 1
+            job.in_flight = False
+            job.last_duration = time.monotonic() - started
+
+        try:
+            await job.on_result(result)
+        except Exception as e:
+            logger.error(f"[PollingEngine] Result handler failed for {job.key}: {e}")
+
+        self._reschedule(job, due)
+
+    def _dispatch_due(self) -> float:
+        """Lanza todos los polls vencidos. Devuelve segundos hasta el próximo vencimiento."""
+        now = time.monotonic()
+        while self._heap:
+            due, _, key, generation = self._heap[0]
+            if due > now:
+                return min(due - now, MAX_IDLE_WAIT)
+            heapq.heappop(self._heap)
+
+            job = self._jobs.get(key)
+            # Entradas obsoletas: job retirado, reprogramado o todavía en vuelo
+            if job is None or job.generation != generation or job.in_flight:
+                continue
+            if job.next_due != due:
+                continue
+
+            job.in_flight = True
+            task = asyncio.create_task(self._execute(job, due))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return MAX_IDLE_WAIT
+
+    async def run(self):
+        """Loop principal del dispatcher."""
+        if self._running:
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        logger.info(f"[PollingEngine] Iniciando dispatcher (pools: {self._pool_sizes})")
+
+        try:
+            while self._running:
+                wait = self._dispatch_due()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._running = False
+            for task in list(self._tasks):
+                task.cancel()
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._executors.clear()
+            self._semaphores.clear()
+
+        logger.info("[PollingEngine] Detenido.")
+
+    def stop(self) -> None:
+        self._running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Métricas por pool: polls en vuelo, completados, fallidos, cedidos a otro worker y lag."""
+        pools = {}
+        for name, stats in self._stats.items():
+            samples = stats.lag_samples
+            pools[name] = {
+                "workers": self._pool_sizes.get(name, FALLBACK_POOL_SIZE),
+                "in_flight": stats.in_flight,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "not_owner": stats.not_owner,
+                "avg_lag_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+                "max_lag_ms": round(stats.max_lag * 1000, 1),
+            }
+        return {
+            "running": self._running,
+            "jobs": len(self._jobs),
+            "heap_size": len(self._heap),
+            "pools": pools,
+        }
+
+
+# Singleton
+polling_engine = PollingEngine()
@@ -0,0 +1,24 @@
+# app/services/retention_job.py
+import logging
+import time
+
+from sqlmodel import Session
+
+from ..db.engine_sync import sync_engine
+from ..db.retention_db import apply_retention
+
+logger = logging.getLogger("RetentionJob")
+
+
+def run_retention_cycle():
+    """
+    Purga el histórico vencido (filas por lotes en SQLite, particiones en PostgreSQL).
+    Esta función es llamada diariamente por APScheduler.
+    """
+    started = time.monotonic()
+    try:
+        with Session(sync_engine) as session:
+            result = apply_retention(session)
+        logger.info(f"[Retention] Completada en {time.monotonic() - started:.1f}s: {result}")
+    except Exception as e:
+        logger.error(f"[Retention] Error purgando histórico: {e}")
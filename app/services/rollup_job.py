@@ -0,0 +1,30 @@
+# app/services/rollup_job.py
+import logging
+import time
+
+from sqlmodel import Session
+
+from ..db.engine_sync import sync_engine
+from ..db.rollups_db import run_rollups
+
+logger = logging.getLogger("RollupJob")
+
+ROLLUP_INTERVAL_MINUTES = 10
+
+
+def run_rollup_cycle():
+    """
+    Agrega el histórico crudo de routers/APs en buckets de 1h y 1d.
+    Esta función es llamada periódicamente por APScheduler.
+    """
+    started = time.monotonic()
+    try:
+        with Session(sync_engine) as session:
+            written = run_rollups(session)
+        total = sum(written.values())
+        if total:
+            logger.info(
+                f"[Rollups] {total} buckets actualizados en {time.monotonic() - started:.1f}s ({written})"
+            )
+    except Exception as e:
+        logger.error(f"[Rollups] Error agregando histórico: {e}")
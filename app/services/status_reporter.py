@@ -4,6 +4,7 @@ import os
 import aiofiles
 from app.utils.cache.manager import cache_manager
 from app.services.bot_manager import bot_manager
+from app.services.monitor_job import read_monitor_load
 
 STATUS_FILE = "/tmp/umanager_status.json"
 
@@ -21,6 +22,7 @@ async def status_reporter_loop():
             data = {
                 "cache": cache_stats,
                 "bots": bot_stats,
+                "monitor_load": read_monitor_load(),
                 "timestamp": asyncio.get_event_loop().time()
             }
             
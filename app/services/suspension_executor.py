@@ -0,0 +1,139 @@
+# app/services/suspension_executor.py
+"""
+Ejecutor de cortes / reactivaciones técnicas agrupados por router.
+
+Antes se abría un RouterService (un login TLS) por servicio y los routers se
+recorrían en serie. Ahora:
+
+- Las acciones se agrupan por router_host y cada grupo usa un solo
+  RouterService para todos sus cambios.
+- Routers distintos se procesan en paralelo (hilos, con tope
+  SUSPENSION_MAX_ROUTERS).
+- Cada acción devuelve un ActionResult para el resumen de facturación.
+
+Las acciones llegan ya resueltas (llamadas a RouterService con sus
+argumentos): los hilos no tocan la sesión de BD, que no es thread-safe.
+"""
+
+import logging
+import os
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..models.router import Router
+from .router_service import RouterService
+
+logger = logging.getLogger(__name__)
+
+SUSPENSION_MAX_ROUTERS = int(os.getenv("SUSPENSION_MAX_ROUTERS", "8"))
+
+
+@dataclass
+class RouterCall:
+    """Llamada a un método de RouterService."""
+
+    method: str
+    args: tuple = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ServiceAction:
+    service_id: int
+    router_host: str
+    action: str  # "suspend" | "enable" | "reactivate"
+    calls: list[RouterCall]
+    client_id: uuid.UUID | None = None
+
+
+@dataclass
+class ActionResult:
+    service_id: int
+    router_host: str
+    action: str
+    ok: bool
+    error: str | None = None
+    client_id: uuid.UUID | None = None
+
+    @classmethod
+    def failed(cls, action: ServiceAction, error: Any) -> "ActionResult":
+        return cls(
+            action.service_id, action.router_host, action.action, False, str(error), action.client_id
+        )
+
+
+class SuspensionExecutor:
+    """
+    Uso:
+
+        # routers: host -> Router; passwords: host -> contraseña ya descifrada
+        results = SuspensionExecutor().run(actions, routers, passwords)
+        failed = [r for r in results if not r.ok]
+    """
+
+    def __init__(self, max_routers: int = SUSPENSION_MAX_ROUTERS):
+        self.max_routers = max(1, max_routers)
+
+    def run(
+        self,
+        actions: list[ServiceAction],
+        routers: dict[str, Router | None],
+        passwords: dict[str, str | None] | None = None,
+    ) -> list[ActionResult]:
+        by_router: dict[str, list[ServiceAction]] = defaultdict(list)
+        for action in actions:
+            by_router[action.router_host].append(action)
+        if not by_router:
+            return []
+
+        workers = min(self.max_routers, len(by_router))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="suspension") as pool:
+            futures = [
+                pool.submit(
+                    self._run_router, host, routers.get(host), (passwords or {}).get(host), group
+                )
+                for host, group in by_router.items()
+            ]
+            results = [result for future in futures for result in future.result()]
+
+        failed = sum(1 for r in results if not r.ok)
+        logger.info(
+            f"[Suspension] {len(results)} acciones en {len(by_router)} routers "
+            f"({workers} en paralelo): {len(results) - failed} ok, {failed} con error"
+        )
+        return results
+
+    @staticmethod
+    def _run_router(
+        host: str, router: Router | None, password: str | None, actions: list[ServiceAction]
+    ) -> list[ActionResult]:
+        if router is None:
+            logger.error(f"❌ Router {host} not found in database ({len(actions)} acciones)")
+            return [ActionResult.failed(a, f"Router {host} not found in database") for a in actions]
+
+        results = []
+        try:
+            with RouterService(host, router, password) as rs:
+                for action in actions:
+                    try:
+                        for call in action.calls:
+                            getattr(rs, call.method)(*call.args, **call.kwargs)
+                        results.append(
+                            ActionResult(
+                                action.service_id, host, action.action, True, client_id=action.client_id
+                            )
+                        )
+                        logger.info(f"✅ {action.action} servicio {action.service_id} en {host}")
+                    except Exception as e:
+                        logger.error(
+                            f"❌ Error en '{action.action}' del servicio {action.service_id} ({host}): {e}"
+                        )
+                        results.append(ActionResult.failed(action, e))
+        except Exception as e:
+            # Sin conexión / no aprovisionado: fallan las acciones que quedaban
+            logger.error(f"❌ No se pudo operar el router {host}: {e}")
+            results += [ActionResult.failed(a, e) for a in actions[len(results) :]]
+        return results
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from ..db.engine import async_session_maker
 from ..models.switch import Switch
+from ..utils.device_clients.mikrotik.batch import print_cmd, run_batch
 from ..utils.security import decrypt_data
 from .mikrotik_base_connector import MikrotikBaseConnector
 from sqlmodel import select
@@ -16,6 +17,11 @@ class SwitchConnector(MikrotikBaseConnector):
     Switch specific connector.
     """
 
+    STATS_BATCH = [
+        print_cmd("/system/resource"),
+        print_cmd("/system/identity", optional=True),
+    ]
+
     async def subscribe(self, host: str, creds: dict) -> None:
         """
         Subscribe to a switch.
@@ -46,20 +52,12 @@ class SwitchConnector(MikrotikBaseConnector):
         """
         try:
             with self.api_session(host) as api:
-                # Execute /system/resource
-                resource_list = api.get_resource("/system/resource").get()
+                # resource + identity in one round-trip (pipelined)
+                resource_list, identity_list = run_batch(api, self.STATS_BATCH)
                 if not resource_list:
                     return {"error": "No data from /system/resource"}
 
                 r = resource_list[0]
-
-                # Execute /system/identity
-                identity_list = []
-                try:
-                    identity_list = api.get_resource("/system/identity").get()
-                except Exception:
-                    pass
-
                 hostname = identity_list[0].get("name") if identity_list else None
 
                 return {
@@ -5,10 +5,11 @@ from datetime import datetime
 
 from sqlmodel import select
 
-from ..core.constants import DeviceStatus
-from ..db.engine import async_session_maker
-from ..models.switch import Switch
+from ..core.constants import DeviceStatus, DeviceVendor
+from ..db.status_buffer import status_buffer
 from ..utils.cache import cache_manager
+from .poll_leases import poll_leases
+from .polling_engine import polling_engine
 from .switch_connector import switch_connector
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,7 @@ SWITCH_HISTORY_INTERVAL = int(os.getenv("SWITCH_HISTORY_INTERVAL", "300"))
 
 
 class SwitchMonitorScheduler:
-    """Scheduler centralizado: polling paralelo a switches con timeout de desconexión."""
+    """Subscription manager for switches with disconnect timeout (polling via PollingEngine)."""
 
     def __init__(self, poll_interval: float = 5.0):
         self._running = False
@@ -51,8 +52,13 @@ class SwitchMonitorScheduler:
                 f"[SwitchMonitorScheduler] Subscribed to {host} (ref_count={info['ref_count']})"
             )
 
-            # Immediate poll to populate cache right away
-            await self.refresh_host(host)
+            # Immediate poll to populate cache right away (only the worker that owns the
+            # switch polls; the others read the shared cache)
+            if await poll_leases.claim(self._job_key(host), self.poll_interval):
+                await self.refresh_host(host)
+
+            if not polling_engine.is_scheduled(self._job_key(host)):
+                self._schedule(host)
 
         except Exception as e:
             logger.error(f"[SwitchMonitorScheduler] Failed to subscribe to {host}: {e}")
@@ -70,17 +76,17 @@ class SwitchMonitorScheduler:
         try:
             result = await self._poll_host(host)
             if result and "error" not in result:
-                stats_cache.set(host, result)
+                await stats_cache.set_async(host, result)
                 await self._update_db_status(host, DeviceStatus.ONLINE, result)
                 logger.info(f"[SwitchMonitorScheduler] Immediate poll success for {host}")
                 return result
             else:
-                stats_cache.set(host, result or {"error": "No data"})
+                await stats_cache.set_async(host, result or {"error": "No data"})
                 await self._update_db_status(host, DeviceStatus.OFFLINE)
                 return result or {"error": "No data"}
         except Exception as e:
             logger.error(f"[SwitchMonitorScheduler] refresh_host failed for {host}: {e}")
-            stats_cache.set(host, {"error": str(e)})
+            await stats_cache.set_async(host, {"error": str(e)})
             await self._update_db_status(host, DeviceStatus.OFFLINE)
             return {"error": str(e)}
 
@@ -95,6 +101,8 @@ class SwitchMonitorScheduler:
 
         if info["ref_count"] <= 0:
             info["last_unsubscribe_time"] = datetime.now()
+            polling_engine.unschedule(self._job_key(host))
+            await poll_leases.release(self._job_key(host))
             logger.info(
                 f"[SwitchMonitorScheduler] Marked {host} for cleanup in {self.UNSUBSCRIBE_TIMEOUT}s"
             )
@@ -132,77 +140,84 @@ class SwitchMonitorScheduler:
             return
 
         del self._subscribed_switches[host]
-        cache_manager.get_store("switch_stats").delete(host)
+        polling_engine.unschedule(self._job_key(host))
+        await poll_leases.release(self._job_key(host))
+        # Si otro worker sigue sondeándolo, la entrada compartida es suya (caduca sola)
+        if not await poll_leases.polled_elsewhere(self._job_key(host)):
+            await cache_manager.get_store("switch_stats").delete_async(host)
         switch_connector.cleanup_credentials(host)
 
         logger.info(f"[SwitchMonitorScheduler] Fully unsubscribed from {host}")
 
     async def _update_db_status(self, host: str, status: str, result: dict = None):
-        """Update switch status in DB using async session."""
+        """Queue switch status in the write-behind buffer (see db/status_buffer.py)."""
         try:
-            async with async_session_maker() as session:
-                switch = await session.get(Switch, host)
-                if not switch:
-                    return
-
-                switch.last_status = status
-                switch.last_checked = datetime.utcnow()
-
-                if result:
-                    if result.get("name") or result.get("hostname"):
-                        switch.hostname = result.get("name") or result.get("hostname")
-                    if result.get("board_name"):
-                        switch.model = result.get("board_name")
-                    if result.get("version"):
-                        switch.firmware = result.get("version")
+            fields = {"last_status": status, "last_checked": datetime.utcnow()}
+            if result:
+                if result.get("name") or result.get("hostname"):
+                    fields["hostname"] = result.get("name") or result.get("hostname")
+                if result.get("board_name"):
+                    fields["model"] = result.get("board_name")
+                if result.get("version"):
+                    fields["firmware"] = result.get("version")
 
-                session.add(switch)
-                await session.commit()
+            await status_buffer.update("switch", host, fields)
 
         except Exception as e:
             logger.error(f"[SwitchMonitorScheduler] Failed to update DB for {host}: {e}")
 
+    @staticmethod
+    def _job_key(host: str) -> str:
+        return f"switch:{host}"
+
+    def _schedule(self, host: str) -> None:
+        """Register the switch in PollingEngine. First poll waits one interval (cache is warm)."""
+
+        async def on_result(result):
+            await self._handle_poll_result(host, result)
+
+        polling_engine.schedule(
+            self._job_key(host),
+            fetch=lambda: switch_connector.fetch_switch_stats(host),
+            on_result=on_result,
+            interval=self.poll_interval,
+            pool=DeviceVendor.MIKROTIK,
+            delay=self.poll_interval,
+            claim=poll_leases.claimer(self._job_key(host), self.poll_interval),
+        )
+
+    async def _handle_poll_result(self, host: str, result) -> None:
+        """Store poll result in cache and update DB status."""
+        info = self._subscribed_switches.get(host)
+        if info is None or info["ref_count"] <= 0:
+            return
+
+        stats_cache = cache_manager.get_store("switch_stats", default_ttl=10)
+
+        if isinstance(result, Exception):
+            logger.error(f"[SwitchMonitorScheduler] Error polling {host}: {result}")
+            await stats_cache.set_async(host, {"error": str(result)})
+            await self._update_db_status(host, DeviceStatus.OFFLINE)
+        elif result:
+            await stats_cache.set_async(host, result)
+            await self._update_db_status(host, DeviceStatus.ONLINE, result)
+
     async def run(self):
-        """Main periodic polling loop."""
+        """Maintenance loop (expired subscriptions). Polling runs in PollingEngine."""
         self._running = True
-        logger.info("[SwitchMonitorScheduler] Starting polling loop...")
-        cleanup_task = asyncio.create_task(self._cleanup_task())
-        stats_cache = cache_manager.get_store("switch_stats", default_ttl=10)
+        logger.info("[SwitchMonitorScheduler] Starting (polling delegated to PollingEngine)...")
 
         try:
-            while self._running:
-                targets = list(self._subscribed_switches.items())
-                active_targets = [(host, info) for host, info in targets if info["ref_count"] > 0]
-
-                if not active_targets:
-                    await asyncio.sleep(1)
-                    continue
-
-                tasks = [self._poll_host(host) for host, _ in active_targets]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for (host, info), result in zip(active_targets, results):
-                    if isinstance(result, Exception):
-                        logger.error(f"[SwitchMonitorScheduler] Error polling {host}: {result}")
-                        stats_cache.set(host, {"error": str(result)})
-                        await self._update_db_status(host, DeviceStatus.OFFLINE)
-                    elif result:
-                        stats_cache.set(host, result)
-                        await self._update_db_status(host, DeviceStatus.ONLINE, result)
-
-                await asyncio.sleep(self.poll_interval)
+            await self._cleanup_task()
         finally:
             self._running = False
-            cleanup_task.cancel()
-            try:
-                await cleanup_task
-            except asyncio.CancelledError:
-                pass
 
         logger.info("[SwitchMonitorScheduler] Stopped.")
 
     async def _poll_host(self, host: str) -> dict:
-        return await asyncio.to_thread(switch_connector.fetch_switch_stats, host)
+        return await polling_engine.run_blocking(
+            DeviceVendor.MIKROTIK, switch_connector.fetch_switch_stats, host
+        )
 
 
 # Singleton
@@ -4,9 +4,9 @@ Cache module with optional Redict backend.
 Falls back gracefully when redis-py is not installed.
 """
 
-from .manager import CacheStore, cache_manager
+from .manager import AsyncCacheStore, CacheStore, cache_manager
 
-__all__ = ["CacheStore", "cache_manager"]
+__all__ = ["AsyncCacheStore", "CacheStore", "cache_manager"]
 
 # Optional Redict exports (only if redis-py is installed)
 try:
@@ -0,0 +1,92 @@
+# app/utils/cache/codecs.py
+"""
+Codecs de serialización para RedictStore (CACHE_CODEC=msgpack|orjson|json).
+
+- json: el formato original, json.dumps(default=str).
+- orjson: el mismo JSON, varias veces más rápido (opcional).
+- msgpack: binario; en los payloads de ap_stats/router_stats es más pequeño
+  y más rápido que JSON (opcional, por defecto si está instalado).
+
+decode() lee cualquiera de los formatos, sea cual sea el codec configurado:
+los payloads msgpack llevan delante MSGPACK_TAG (un byte que no puede abrir
+un JSON), así conviven workers con codecs distintos durante un despliegue y
+los valores escritos antes del cambio.
+"""
+
+import json
+import logging
+import os
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "msgpack")
+MSGPACK_TAG = b"\xc1"  # Byte reservado ("never used") en msgpack, inválido en JSON/UTF-8
+
+
+class JsonCodec:
+    name = "json"
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+
+class OrjsonCodec:
+    name = "orjson"
+    # Mismo resultado que json.dumps(default=str): fechas y dataclasses pasan por str()
+    _options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson
+        else 0
+    )
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=cls._options)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return MSGPACK_TAG + msgpack.packb(value, default=str, use_bin_type=True)
+
+
+_CODECS = {"json": JsonCodec, "orjson": OrjsonCodec, "msgpack": MsgpackCodec}
+_AVAILABLE = {"json": True, "orjson": orjson is not None, "msgpack": msgpack is not None}
+
+
+def get_codec(name: str | None = None):
+    """Codec por nombre (CACHE_CODEC por defecto); JSON si la librería no está instalada."""
+    name = (name or CACHE_CODEC).lower()
+    if name not in _CODECS:
+        logger.warning(f"[Cache] Codec desconocido '{name}', usando json")
+        return JsonCodec
+    if not _AVAILABLE[name]:
+        logger.warning(f"[Cache] Codec '{name}' no disponible (falta la librería), usando json")
+        return JsonCodec
+    return _CODECS[name]
+
+
+def decode(data: bytes) -> Any:
+    """Decodifica un valor escrito con cualquier codec. Si no es válido, devuelve los bytes."""
+    try:
+        if data[:1] == MSGPACK_TAG:
+            if msgpack is None:
+                raise ValueError("msgpack payload but msgpack is not installed")
+            return msgpack.unpackb(data[1:], raw=False, strict_map_key=False)
+        return orjson.loads(data) if orjson else json.loads(data)
+    except ValueError:
+        return data
@@ -5,74 +5,199 @@ El backend se selecciona mediante la variable de entorno CACHE_BACKEND.
 """
 
 import os
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict
 from threading import RLock
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Protocol
 
 if TYPE_CHECKING:
+    from .near_cache import NearCacheStore
     from .redict_store import RedictStore
 
+SWEEP_INTERVAL = 1.0  # segundos; resolución de la rueda de expiración
+
+
+class AsyncCacheStore(Protocol):
+    """
+    Interfaz async común de CacheStore y RedictStore. Es la que se usa desde el
+    event loop (WebSockets, schedulers): en memoria no hay I/O y en Redict es
+    un round-trip sobre el pool, sin los wrappers síncronos (hilo + asyncio.run
+    + conexión nueva por llamada).
+    """
+
+    name: str
+
+    async def get_async(self, key: str) -> Any | None: ...
+
+    async def set_async(self, key: str, value: Any, ttl: int | None = None) -> None: ...
+
+    async def delete_async(self, key: str) -> bool: ...
+
+    async def clear_async(self) -> None: ...
+
+    async def mget_async(self, keys: list[str]) -> dict[str, Any]: ...
+
+    async def mset_async(self, items: dict[str, Any], ttl: int | None = None) -> None: ...
+
 
-@dataclass
 class CacheEntry:
-    value: Any
-    expires_at: datetime | None = None
-    created_at: datetime = field(default_factory=datetime.now)
+    __slots__ = ("value", "expires_at", "slot")
+
+    def __init__(self, value: Any, expires_at: float | None, slot: int | None):
+        self.value = value
+        self.expires_at = expires_at  # time.monotonic()
+        self.slot = slot  # Segundo de la rueda donde está registrada
 
 
 class CacheStore:
-    """Cache store en memoria (fallback cuando Redict no está disponible)."""
+    """
+    Cache store en memoria (fallback cuando Redict no está disponible).
+
+    - LRU en O(1): OrderedDict, lecturas y escrituras mueven la clave al final
+      y al llenarse se expulsa la primera (antes: min() sobre todas las
+      entradas en cada set con el store lleno).
+    - Expiración por rueda de tiempo: cada entrada se registra en el segundo en
+      que vence; sweep() (como mucho una vez por SWEEP_INTERVAL, desde get/set)
+      borra solo los slots vencidos, así las claves que nadie vuelve a leer no
+      se acumulan.
+    - Contadores por store (hits, misses, evictions, expirations) en get_stats().
+    """
 
     def __init__(self, name: str, default_ttl: int = 300, max_size: int = 1000):
         self.name = name
         self.default_ttl = default_ttl  # segundos
         self.max_size = max_size
-        self._data: dict[str, CacheEntry] = {}
+        self._data: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._wheel: dict[int, set[str]] = {}
+        self._next_sweep = 0.0
         self._lock = RLock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+
+    def _unlink(self, key: str, entry: CacheEntry) -> None:
+        if entry.slot is not None:
+            keys = self._wheel.get(entry.slot)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._wheel[entry.slot]
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        removed = 0
+        for slot in [slot for slot in self._wheel if slot <= now]:
+            for key in self._wheel.pop(slot):
+                entry = self._data.get(key)
+                if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                    del self._data[key]
+                    removed += 1
+        self._stats["expirations"] += removed
+        return removed
+
+    def sweep(self) -> int:
+        """Elimina ya todas las entradas vencidas. Devuelve cuántas."""
+        with self._lock:
+            return self._sweep(time.monotonic())
 
     def get(self, key: str) -> Any | None:
+        now = time.monotonic()
         with self._lock:
+            self._maybe_sweep(now)
             entry = self._data.get(key)
             if entry is None:
+                self._stats["misses"] += 1
                 return None
-            if entry.expires_at and datetime.now() > entry.expires_at:
+            if entry.expires_at is not None and now > entry.expires_at:
                 del self._data[key]
+                self._unlink(key, entry)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
                 return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
             return entry.value
 
     def set(self, key: str, value: Any, ttl: int | None = None) -> None:
-        with self._lock:
-            # Evicción LRU si excede max_size
-            if len(self._data) >= self.max_size:
-                # Simple eviction: remove oldest created
-                oldest = min(self._data.items(), key=lambda x: x[1].created_at)
-                del self._data[oldest[0]]
-
-            expires = None
-            if ttl is not None:
-                expires = datetime.now() + timedelta(seconds=ttl)
-            elif self.default_ttl:
-                expires = datetime.now() + timedelta(seconds=self.default_ttl)
+        now = time.monotonic()
+        if ttl is None:
+            ttl = self.default_ttl or None
+        expires = now + ttl if ttl is not None else None
+        # Slot = primer segundo entero >= vencimiento
+        slot = -int(-expires // 1) if expires is not None else None
 
-            self._data[key] = CacheEntry(value=value, expires_at=expires)
+        with self._lock:
+            self._maybe_sweep(now)
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._unlink(key, old)
+            elif len(self._data) >= self.max_size:
+                # Evicción LRU: la menos usada recientemente
+                lru_key, lru_entry = self._data.popitem(last=False)
+                self._unlink(lru_key, lru_entry)
+                self._stats["evictions"] += 1
+
+            self._data[key] = CacheEntry(value, expires, slot)
+            if slot is not None:
+                self._wheel.setdefault(slot, set()).add(key)
+            self._stats["sets"] += 1
 
     def delete(self, key: str) -> bool:
         with self._lock:
-            if key in self._data:
-                del self._data[key]
-                return True
-            return False
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return False
+            self._unlink(key, entry)
+            return True
 
     def clear(self) -> None:
         with self._lock:
             self._data.clear()
+            self._wheel.clear()
+
+    # Interfaz async (AsyncCacheStore): en memoria no hay I/O, misma operación
+
+    async def get_async(self, key: str) -> Any | None:
+        return self.get(key)
+
+    async def set_async(self, key: str, value: Any, ttl: int | None = None) -> None:
+        self.set(key, value, ttl)
+
+    async def delete_async(self, key: str) -> bool:
+        return self.delete(key)
+
+    async def clear_async(self) -> None:
+        self.clear()
+
+    async def mget_async(self, keys: list[str]) -> dict[str, Any]:
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    async def mset_async(self, items: dict[str, Any], ttl: int | None = None) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl)
 
     @property
     def size(self) -> int:
         with self._lock:
             return len(self._data)
 
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+            }
+
 
 class CacheManager:
     """
@@ -92,19 +217,26 @@ class CacheManager:
             cls._instance._use_redict = os.getenv("CACHE_BACKEND", "memory") == "redict"
         return cls._instance
 
-    def get_store(self, name: str, **kwargs) -> "CacheStore | RedictStore":
+    def get_store(self, name: str, **kwargs) -> "CacheStore | RedictStore | NearCacheStore":
         """
         Obtiene un store de caché por nombre.
 
-        Si CACHE_BACKEND=redict y la conexión está activa, retorna RedictStore.
+        Si CACHE_BACKEND=redict y la conexión está activa, retorna RedictStore
+        (NearCacheStore para los stores de NEAR_CACHE_STORES).
         De lo contrario, retorna CacheStore en memoria.
         """
         # Intentar usar Redict si está configurado
         if self._use_redict:
             try:
+                from .near_cache import near_cache
                 from .redict_store import redict_manager
 
                 if redict_manager.is_connected:
+                    if near_cache.enabled_for(name):
+                        # Near-cache: LRU local del worker delante de Redict
+                        near_store = near_cache.get_store(name, **kwargs)
+                        if near_store is not None:
+                            return near_store
                     redict_store = redict_manager.get_store(name, **kwargs)
                     if redict_store is not None:
                         return redict_store
@@ -122,19 +254,21 @@ class CacheManager:
 
         if self._use_redict:
             try:
+                from .near_cache import near_cache
                 from .redict_store import redict_manager
 
                 if redict_manager.is_connected:
                     stats["redict_connected"] = True
                     # RedictManager doesn't track individual stores list in memory
                     stats["stores"] = ["Distributed Redict Stores"] 
+                    stats["near_cache"] = near_cache.get_stats()
                     return stats
             except ImportError:
                 pass
 
         stats["redict_connected"] = False
         stats["memory_stores"] = {
-            name: store.size for name, store in self._memory_stores.items()
+            name: store.get_stats() for name, store in self._memory_stores.items()
         }
         return stats
 
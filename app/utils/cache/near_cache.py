@@ -0,0 +1,187 @@
+# app/utils/cache/near_cache.py
+"""
+Near-cache: LRU local por proceso delante de RedictStore (CACHE_BACKEND=redict).
+
+Con varios workers de uvicorn cada lectura de router_stats / ap_stats iba a
+Redict, aunque el mismo worker acabara de escribir el valor. Ahora:
+
+- Cada store de NEAR_CACHE_STORES tiene un CacheStore local por proceso.
+  Las lecturas lo consultan primero; un fallo lee de Redict (GET + PTTL) y
+  guarda el valor con la vida que le queda (como mucho NEAR_CACHE_TTL).
+- Las escrituras van a Redict y, en el mismo pipeline, publican las keys en
+  NEAR_CACHE_CHANNEL. Los demás workers las descartan de su copia local al
+  recibir el mensaje (el listener de start_redict_listener).
+- Solo se sirve desde memoria mientras el listener está suscrito: sin
+  suscripción (Redict caído, listener terminado) se lee siempre de Redict.
+- Un contador de generación por store evita guardar en local un valor leído
+  antes de una invalidación que llegó mientras la lectura estaba en vuelo.
+"""
+
+import json
+import logging
+import os
+from typing import Any
+
+from .manager import CacheStore
+
+logger = logging.getLogger(__name__)
+
+NEAR_CACHE_CHANNEL = os.getenv("NEAR_CACHE_CHANNEL", "cache:invalidate")
+NEAR_CACHE_STORES = frozenset(
+    name.strip()
+    for name in os.getenv("NEAR_CACHE_STORES", "router_stats,ap_stats,switch_stats").split(",")
+    if name.strip()
+)
+NEAR_CACHE_TTL = float(os.getenv("NEAR_CACHE_TTL", "10"))
+NEAR_CACHE_MAX_SIZE = int(os.getenv("NEAR_CACHE_MAX_SIZE", "1000"))
+
+
+class NearCacheStore:
+    """AsyncCacheStore de dos niveles: CacheStore local + RedictStore compartido."""
+
+    def __init__(self, remote, near: "NearCache"):
+        self.remote = remote
+        self.near = near
+        self.name = remote.name
+        self.default_ttl = remote.default_ttl
+
+    def _local_ttl(self, ttl: float | None) -> float:
+        return NEAR_CACHE_TTL if ttl is None else min(ttl, NEAR_CACHE_TTL)
+
+    async def get_async(self, key: str) -> Any | None:
+        if not self.near.active:
+            return await self.remote.get_async(key)
+        local = self.near.local(self.name)
+        value = local.get(key)
+        if value is not None:
+            return value
+
+        generation = self.near.generation(self.name)
+        value, ttl = await self.remote.get_with_ttl_async(key)
+        if value is not None and self.near.generation(self.name) == generation:
+            local.set(key, value, self._local_ttl(ttl))
+        return value
+
+    async def set_async(self, key: str, value: Any, ttl: int | None = None) -> None:
+        self.near.invalidate(self.name, [key])
+        generation = self.near.generation(self.name)
+        await self.remote.set_async(key, value, ttl)
+        if self.near.active and self.near.generation(self.name) == generation:
+            expire = ttl if ttl is not None else self.default_ttl
+            self.near.local(self.name).set(key, value, self._local_ttl(expire))
+
+    async def mget_async(self, keys: list[str]) -> dict[str, Any]:
+        """Lo que esté en local sale de memoria; el resto, de un MGET (sin poblar el local)."""
+        result = {}
+        if self.near.active:
+            local = self.near.local(self.name)
+            for key in keys:
+                value = local.get(key)
+                if value is not None:
+                    result[key] = value
+        missing = [key for key in keys if key not in result]
+        if missing:
+            result.update(await self.remote.mget_async(missing))
+        return result
+
+    async def mset_async(self, items: dict[str, Any], ttl: int | None = None) -> None:
+        self.near.invalidate(self.name, list(items))
+        await self.remote.mset_async(items, ttl)
+
+    async def delete_async(self, key: str) -> bool:
+        self.near.invalidate(self.name, [key])
+        return await self.remote.delete_async(key)
+
+    async def clear_async(self) -> None:
+        self.near.invalidate(self.name, None)
+        await self.remote.clear_async()
+
+
+class NearCache:
+    """
+    Registro de los niveles locales y estado de la invalidación.
+
+        store = near_cache.get_store("ap_stats", default_ttl=5)   # NearCacheStore
+        near_cache.activate()                # listener suscrito a NEAR_CACHE_CHANNEL
+        near_cache.handle_message(data)      # por cada mensaje recibido
+        near_cache.deactivate()              # listener terminado: vacía lo local
+    """
+
+    def __init__(self, stores: frozenset[str] = NEAR_CACHE_STORES, channel: str = NEAR_CACHE_CHANNEL):
+        self.stores = stores
+        self.channel = channel
+        self.active = False
+        self._locals: dict[str, CacheStore] = {}
+        self._generations: dict[str, int] = {}
+        self._stats = {"invalidations_received": 0, "keys_invalidated": 0, "bad_messages": 0}
+
+    def enabled_for(self, name: str) -> bool:
+        return name in self.stores
+
+    def get_store(self, name: str, **kwargs) -> NearCacheStore | None:
+        from .redict_store import redict_manager
+
+        remote = redict_manager.get_store(name, invalidation_channel=self.channel, **kwargs)
+        return NearCacheStore(remote, self) if remote is not None else None
+
+    def local(self, name: str) -> CacheStore:
+        if name not in self._locals:
+            self._locals[name] = CacheStore(
+                name=f"near:{name}", default_ttl=NEAR_CACHE_TTL, max_size=NEAR_CACHE_MAX_SIZE
+            )
+        return self._locals[name]
+
+    def generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    def invalidate(self, name: str, keys: list[str] | None) -> None:
+        """Descarta keys del nivel local (keys=None: todo el store)."""
+        self._generations[name] = self.generation(name) + 1
+        local = self._locals.get(name)
+        if local is None:
+            return
+        if keys is None:
+            local.clear()
+        else:
+            for key in keys:
+                local.delete(key)
+
+    def activate(self) -> None:
+        self.active = True
+        logger.info(f"[NearCache] Activo para {sorted(self.stores)} (canal '{self.channel}')")
+
+    def deactivate(self) -> None:
+        """Sin invalidaciones la copia local no es fiable: se vacía y se deja de usar."""
+        self.active = False
+        for name in list(self._locals):
+            self.invalidate(name, None)
+        logger.info("[NearCache] Desactivado, lecturas directas a Redict")
+
+    def handle_message(self, data: bytes | str) -> None:
+        try:
+            message = json.loads(data)
+            store, keys = message["store"], message["keys"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._stats["bad_messages"] += 1
+            logger.warning(f"[NearCache] Mensaje de invalidación inválido: {e}")
+            return
+
+        from .redict_store import redict_manager
+
+        if message.get("origin") == redict_manager.instance_id:
+            return  # Escritura propia: el nivel local ya está al día
+        self._stats["invalidations_received"] += 1
+        self._stats["keys_invalidated"] += len(keys) if keys is not None else 1
+        self.invalidate(store, keys)
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "active": self.active,
+            "channel": self.channel,
+            "stores": {name: store.get_stats() for name, store in self._locals.items()},
+        }
+
+
+# Singleton
+near_cache = NearCache()
@@ -8,10 +8,13 @@ import asyncio
 import json
 import logging
 import os
+import socket
 from typing import Any
 
 import redis.asyncio as redis
 
+from .codecs import decode, get_codec
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +30,7 @@ class RedictManager:
     _connected: bool = False
     _pid: int | None = None
     _pool_loop: asyncio.AbstractEventLoop | None = None
+    _client: redis.Redis | None = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -36,6 +40,7 @@ class RedictManager:
             cls._instance._connected = False
             cls._instance._pid = None
             cls._instance._pool_loop = None
+            cls._instance._client = None
         return cls._instance
 
     def _get_main_pool(self) -> redis.ConnectionPool:
@@ -55,6 +60,7 @@ class RedictManager:
         if self._pid != current_pid:
             self._pool = None
             self._pool_loop = None
+            self._client = None
             self._pid = current_pid
         
         # Si no hay pool, crearlo
@@ -115,8 +121,11 @@ class RedictManager:
         
         # Verificación de Loop
         if self._pool_loop == current_loop:
-            # ✅ Safe: Mismo loop, usar pool compartido
-            return redis.Redis(connection_pool=main_pool)
+            # ✅ Safe: Mismo loop, usar pool compartido. El cliente también se
+            # reutiliza: sin conexión propia, su aclose() no cierra nada.
+            if self._client is None or self._client.connection_pool is not main_pool:
+                self._client = redis.Redis(connection_pool=main_pool)
+            return self._client
         else:
             # ⚠️ Loop diferente detectado (ej. wrapper sync): NO USAR POOL
             # Crear conexión fresca para este contexto
@@ -136,8 +145,14 @@ class RedictManager:
                 pass
             self._pool = None
             self._pool_loop = None
+            self._client = None
         logger.info("Redict desconectado")
 
+    @property
+    def instance_id(self) -> str:
+        """Identifica a este proceso (worker) en los mensajes Pub/Sub."""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
     @property
     def is_connected(self) -> bool:
         return self._connected and self._url is not None
@@ -190,10 +205,15 @@ class RedictStore:
         self,
         name: str,
         default_ttl: int = 300,
+        codec: str | None = None,
+        invalidation_channel: str | None = None,
     ):
         # No guardamos pool ni client, los pedimos on-demand
         self.name = name
         self.default_ttl = default_ttl
+        self.codec = get_codec(codec)
+        # Si se indica, cada escritura publica las keys tocadas (near-cache de otros workers)
+        self.invalidation_channel = invalidation_channel
         self._prefix = f"{name}:"
 
     def _get_client(self) -> redis.Redis:
@@ -204,6 +224,12 @@ class RedictStore:
         """Genera key con prefijo de namespace."""
         return f"{self._prefix}{key}"
 
+    def _queue_invalidation(self, pipe, keys: list[str] | None) -> None:
+        """Añade al pipeline el PUBLISH de invalidación (keys=None: todo el store)."""
+        if self.invalidation_channel:
+            message = {"origin": RedictManager().instance_id, "store": self.name, "keys": keys}
+            pipe.publish(self.invalidation_channel, json.dumps(message))
+
     async def get_async(self, key: str) -> Any | None:
         """Obtiene valor de forma asíncrona."""
         client = self._get_client()
@@ -211,12 +237,27 @@ class RedictStore:
             data = await client.get(self._make_key(key))
             if data is None:
                 return None
-            return json.loads(data)
+            return decode(data)
         except redis.RedisError as e:
             logger.warning(f"Redict GET error for {key}: {e}")
             return None
-        except json.JSONDecodeError:
-            return data
+        finally:
+            await client.aclose()
+
+    async def get_with_ttl_async(self, key: str) -> tuple[Any | None, float | None]:
+        """Valor y segundos de vida restantes (None = sin expiración) en un round-trip."""
+        client = self._get_client()
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(self._make_key(key))
+            pipe.pttl(self._make_key(key))
+            data, pttl = await pipe.execute()
+            if data is None:
+                return None, None
+            return decode(data), (pttl / 1000 if pttl >= 0 else None)
+        except redis.RedisError as e:
+            logger.warning(f"Redict GET error for {key}: {e}")
+            return None, None
         finally:
             await client.aclose()
 
@@ -225,8 +266,10 @@ class RedictStore:
         client = self._get_client()
         try:
             expire = ttl if ttl is not None else self.default_ttl
-            serialized = json.dumps(value, default=str)
-            await client.set(self._make_key(key), serialized, ex=expire)
+            pipe = client.pipeline(transaction=False)
+            pipe.set(self._make_key(key), self.codec.encode(value), ex=expire)
+            self._queue_invalidation(pipe, [key])
+            await pipe.execute()
         except redis.RedisError as e:
             logger.warning(f"Redict SET error for {key}: {e}")
         except (TypeError, ValueError) as e:
@@ -234,11 +277,48 @@ class RedictStore:
         finally:
             await client.aclose()
 
+    async def mget_async(self, keys: list[str]) -> dict[str, Any]:
+        """Varias keys en un solo MGET. Las que no existen no aparecen en el resultado."""
+        if not keys:
+            return {}
+        client = self._get_client()
+        try:
+            values = await client.mget([self._make_key(k) for k in keys])
+            return {k: decode(v) for k, v in zip(keys, values) if v is not None}
+        except redis.RedisError as e:
+            logger.warning(f"Redict MGET error ({len(keys)} keys): {e}")
+            return {}
+        finally:
+            await client.aclose()
+
+    async def mset_async(self, items: dict[str, Any], ttl: int | None = None) -> None:
+        """Varias keys (mismo TTL) en un round-trip: pipeline sin MULTI de SET ... EX."""
+        if not items:
+            return
+        client = self._get_client()
+        try:
+            expire = ttl if ttl is not None else self.default_ttl
+            pipe = client.pipeline(transaction=False)
+            for key, value in items.items():
+                try:
+                    pipe.set(self._make_key(key), self.codec.encode(value), ex=expire)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Serialization error for {key}: {e}")
+            self._queue_invalidation(pipe, list(items))
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redict MSET error ({len(items)} keys): {e}")
+        finally:
+            await client.aclose()
+
     async def delete_async(self, key: str) -> bool:
         """Elimina key de forma asíncrona."""
         client = self._get_client()
         try:
-            result = await client.delete(self._make_key(key))
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(self._make_key(key))
+            self._queue_invalidation(pipe, [key])
+            result = (await pipe.execute())[0]
             return result > 0
         except redis.RedisError as e:
             logger.warning(f"Redict DELETE error for {key}: {e}")
@@ -258,14 +338,20 @@ class RedictStore:
                     await client.delete(*keys)
                 if cursor == 0:
                     break
+            if self.invalidation_channel:
+                pipe = client.pipeline(transaction=False)
+                self._queue_invalidation(pipe, None)
+                await pipe.execute()
         except redis.RedisError as e:
             logger.warning(f"Redict CLEAR error: {e}")
         finally:
             await client.aclose()
 
-    # Métodos síncronos (Wrappers)
+    # Métodos síncronos (Wrappers) - solo para código síncrono (hilos, scripts).
     # Importante: Estos métodos usan asyncio.run() que crea un NUEVO loop efímero.
     # El Manager detectará esto y entregará una conexión fresca en lugar del pool compartido.
+    # Desde el event loop usar get_async/set_async/delete_async (AsyncCacheStore):
+    # aquí cada llamada costaría un hilo y una conexión nueva.
 
     def get(self, key: str) -> Any | None:
         try:
@@ -32,7 +32,7 @@ class MikrotikRouterAdapter(BaseDeviceAdapter):
     ):
         super().__init__(host, username, password, port)
         self._external_api = api
-        self._pool_ref = None
+        self._session = None  # RouterSession checked out from the shared pool
         self._internal_api = None  # Cache for local connection reuse
 
     @property
@@ -49,14 +49,21 @@ class MikrotikRouterAdapter(BaseDeviceAdapter):
         if self._internal_api:
             return self._internal_api
 
-        # Use centralized connection manager but FORCE fresh connection (managed by this adapter)
-        # to ensure proper isolation and cleanup
-        self._pool_ref = mikrotik_connection.get_pool(
-            self.host, self.username, self.password, self.port, force_new=True
+        # Exclusive session from the shared pool (reused across adapters, no new
+        # TLS handshake/login when an idle one exists). Returned on disconnect().
+        self._session = mikrotik_connection.session_pool.checkout(
+            self.host, self.username, self.password, self.port
         )
-        self._internal_api = self._pool_ref.get_api()
+        self._internal_api = self._session.api
         return self._internal_api
 
+    def _discard_session(self):
+        """Drops the current pooled session (broken socket) so the next call opens a new one."""
+        if self._session:
+            mikrotik_connection.session_pool.checkin(self._session, broken=True)
+        self._session = None
+        self._internal_api = None
+
     def _exec_with_retry(self, callback):
         """
         Executes a callback that takes 'api' as argument.
@@ -66,19 +73,13 @@ class MikrotikRouterAdapter(BaseDeviceAdapter):
             api = self._get_api()
             return callback(api)
         except Exception as e:
-            # Basic detection of connection/SSL errors
-            err_str = str(e).lower()
-            retryable = any(
-                x in err_str
-                for x in ["connection", "closed", "file descriptor", "ssl", "broken pipe"]
-            )
-
-            if retryable:
+            # Detection of connection/SSL errors (incl. "Malformed sentence")
+            if not self._external_api and mikrotik_connection.is_connection_error(e):
                 logger.warning(
                     f"Connection error in adapter ({e}). Retrying with fresh connection..."
                 )
-                # 1. Clear local cache
-                self._internal_api = None
+                # 1. Discard broken session
+                self._discard_session()
                 # 2. Get fresh API (this triggers pool logic if needed)
                 api = self._get_api()
                 # 3. Retry action
@@ -113,6 +114,8 @@ class MikrotikRouterAdapter(BaseDeviceAdapter):
             )
         except Exception as e:
             logger.error(f"Error getting router status: {e}")
+            if mikrotik_connection.is_connection_error(e):
+                self._discard_session()
             return DeviceStatus(
                 host=self.host,
                 vendor=self.vendor,
@@ -138,14 +141,10 @@ class MikrotikRouterAdapter(BaseDeviceAdapter):
             self._external_api = None
             return
 
-        # CRITICAL FIX: Do NOT destroy the shared pool on standard disconnect.
-        # But DO close our local cached connection instance to prevent leaks.
-        if self._pool_ref:
-            try:
-                self._pool_ref.disconnect()
-            except Exception:  # nosec B110 - Pool disconnect cleanup
-                pass
-            self._pool_ref = None
+        # Return the session to the shared pool (it is closed there if the pool is full).
+        if self._session:
+            mikrotik_connection.session_pool.checkin(self._session)
+            self._session = None
             self._internal_api = None
 
     # --- Router Specific Methods (Migrated from RouterService) ---
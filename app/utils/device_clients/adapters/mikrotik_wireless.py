@@ -49,21 +49,19 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
         try:
             api = self._get_api()
 
-            # 1. System Resources (Shared Module)
-            system_data = mikrotik_system.get_system_resources(api)
-
-            # 2. Wireless Info (Shared Module)
-            # Get detailed list of interfaces
-            wireless_interfaces = mikrotik_wireless_lib.get_wireless_interfaces_detailed(api)
+            # Single collection pass: every RouterOS resource is fetched at most
+            # once (system, interfaces, monitor, traffic, registrations, ARP/DHCP)
+            snapshot = mikrotik_wireless_lib.collect_ap_status(api, self.host)
+            system_data = snapshot["system"]
+            wireless_interfaces = snapshot["interfaces"]
+            wireless_type = snapshot["wireless_type"]
 
             # Detect main properties from the first found wireless interface
             wireless_info = {}
-            wireless_type = None
 
             if wireless_interfaces:
                 # Use the first interface as the "Main" one for AP summary
                 main_iface = wireless_interfaces[0]
-                wireless_type = main_iface.get("type")
 
                 wireless_info = {
                     "ssid": (
@@ -77,15 +75,9 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
                     "mac": main_iface.get("original_record", {}).get("mac-address"),
                     "tx_power": main_iface.get("tx_power"),
                 }
-            else:
-                # Check if we at least detected a type even without active interfaces
-                wireless_type = mikrotik_wireless_lib.get_wireless_type(api)
-
-            # 3. Aggregate Stats (Shared Module)
-            stats = mikrotik_wireless_lib.get_aggregate_interface_stats(api)
 
-            # 4. Connected Clients (Shared Module)
-            clients_list = mikrotik_wireless_lib.get_connected_clients(api)
+            stats = snapshot["stats"]
+            clients_list = snapshot["clients"]
 
             # Convert dicts to ConnectedClient objects
             connected_clients = []
@@ -142,17 +134,11 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
             # 5. System MAC fallback
             system_mac = wireless_info.get("mac")
             if not system_mac:
-                # Fallback to finding an ethernet mac
-                try:
-                    all_ethers = mikrotik_system.get_interfaces(
-                        api
-                    )  # Reusing existing system module function
-                    for iface in all_ethers:
-                        if iface.get("mac-address"):
-                            system_mac = iface.get("mac-address")
-                            break
-                except Exception:
-                    pass
+                # Fallback to the first interface with a MAC (already fetched in the pass)
+                for iface in snapshot["interface_rows"]:
+                    if iface.get("mac-address"):
+                        system_mac = iface.get("mac-address")
+                        break
 
             uptime_seconds = mikrotik_parsers.parse_uptime(system_data.get("uptime", "0s"))
 
@@ -207,8 +193,8 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
 
         except Exception as e:
             logger.error(f"Error getting status from {self.host}: {e}")
-            # On error, invalidate the cached pool so next request creates fresh connection
-            self.disconnect()
+            # On error, discard the pooled session so next request creates fresh connection
+            self._discard_session()
             return DeviceStatus(
                 host=self.host,
                 vendor=self.vendor,
@@ -222,7 +208,7 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
         api = self._get_api()
 
         # Use shared module
-        clients_data = mikrotik_wireless_lib.get_connected_clients(api)
+        clients_data = mikrotik_wireless_lib.get_connected_clients(api, host=self.host)
 
         # Convert to objects
         return [
@@ -259,5 +245,5 @@ class MikrotikWirelessAdapter(MikrotikRouterAdapter):
             return True if resources else False
         except Exception as e:
             logger.error(f"Connection test failed for {self.host}: {e}")
-            self.disconnect()
+            self._discard_session()
             return False
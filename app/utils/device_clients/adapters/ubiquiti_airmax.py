@@ -4,9 +4,12 @@ Ubiquiti AirMAX adapter.
 Uses HTTP API to communicate with AirOS devices.
 """
 
+import time
+
 import httpx
 
 from ....core.constants import DeviceRole, DeviceVendor
+from ..airos_session import AsyncAirOSSession, airos_sessions, async_airos_sessions
 from .base import BaseDeviceAdapter, ConnectedClient, DeviceStatus
 
 # httpx maneja certificados autofirmados con verify=False, no es necesario
@@ -17,6 +20,10 @@ class UbiquitiAirmaxAdapter(BaseDeviceAdapter):
     """
     Adapter for Ubiquiti AirMAX devices (AirOS).
     Communicates via HTTP/HTTPS API.
+
+    The authenticated HTTP session (cookies + CSRF token) comes from the shared
+    airos_sessions cache, so consecutive adapters for the same device reuse it.
+    get_status_async() does the same over httpx.AsyncClient (no worker thread).
     """
 
     def __init__(
@@ -26,90 +33,105 @@ class UbiquitiAirmaxAdapter(BaseDeviceAdapter):
         self.use_https = use_https
         protocol = "https" if use_https else "http"
         self.base_url = f"{protocol}://{host}:{port}"
-        self._is_authenticated = False
-
-        # Inicializamos el cliente httpx con headers por defecto
-        self._default_headers = {
-            "User-Agent": "Mozilla/5.0 UManager/1.0",
-            "Connection": "keep-alive",
-        }
-        self.session = httpx.Client(verify=False, headers=self._default_headers, timeout=15)
+        self._airos = None  # Sync session, acquired on first use
 
     @property
     def vendor(self) -> str:
         return DeviceVendor.UBIQUITI
 
+    def _sync_session(self):
+        # Long-lived adapters (live polling) may outlive an evicted session
+        if self._airos is None or self._airos.client.is_closed:
+            self._airos = airos_sessions.get(self.base_url, self.username, self.password)
+        return self._airos
+
+    @property
+    def session(self) -> httpx.Client:
+        airos = self._sync_session()
+        airos.last_used = time.monotonic()
+        return airos.client
+
     def _authenticate(self) -> bool:
         """Authenticate with the AirOS device."""
-        self.session.cookies.clear()
-        self._is_authenticated = False
-
-        auth_url = f"{self.base_url}/api/auth"
-        payload = {"username": self.username, "password": self.password}
+        return self._sync_session().authenticate()
 
-        try:
-            response = self.session.post(auth_url, data=payload)
-            response.raise_for_status()
-
-            csrf_token = response.headers.get("X-CSRF-ID")
-            if csrf_token:
-                self.session.headers["X-CSRF-ID"] = csrf_token
-                self._is_authenticated = True
-                return True
-            return False
-        except (httpx.RequestError, httpx.HTTPStatusError):
-            return False
-
-    def _get_status_data(self) -> dict | None:
-        """Fetch raw status data from the device."""
+    def _get_status_data(self) -> tuple[dict | None, bool]:
+        """
+        Fetch raw status data from the device.
+        Returns (data, auth_required): auth_required is True only on 401/403.
+        """
         status_url = f"{self.base_url}/status.cgi"
         try:
             response = self.session.get(status_url)
-            if response.status_code in [401, 403]:
-                return None
-            response.raise_for_status()
-            data = response.json()
-            if "host" not in data:
-                return None
-            return data
+            return self._parse_status_response(response)
+        except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
+            return None, False
+
+    @staticmethod
+    def _parse_status_response(response: httpx.Response) -> tuple[dict | None, bool]:
+        if response.status_code in [401, 403]:
+            return None, True
+        response.raise_for_status()
+        data = response.json()
+        if "host" not in data:
+            # AirOS answers the login page (no JSON "host") when the session is gone
+            return None, True
+        return data, False
+
+    async def _get_status_data_async(self, airos: AsyncAirOSSession) -> tuple[dict | None, bool]:
+        try:
+            response = await airos.client.get(f"{self.base_url}/status.cgi")
+            return self._parse_status_response(response)
         except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
-            return None
+            return None, False
+
+    def _offline_status(self, error: str) -> DeviceStatus:
+        return DeviceStatus(
+            host=self.host,
+            vendor=self.vendor,
+            role=DeviceRole.ACCESS_POINT,
+            is_online=False,
+            last_error=error,
+        )
+
+    async def get_status_async(self) -> DeviceStatus:
+        """Async variant of get_status() over the shared httpx.AsyncClient pool."""
+        airos = async_airos_sessions.get(self.base_url, self.username, self.password)
+
+        if not airos.authenticated and not await airos.authenticate():
+            return self._offline_status("Authentication failed")
+
+        data, auth_required = await self._get_status_data_async(airos)
+        if data is None and auth_required:
+            if not await airos.authenticate():
+                return self._offline_status("Session expired and re-auth failed")
+            data, _ = await self._get_status_data_async(airos)
+        if data is None:
+            return self._offline_status("Could not fetch status data")
+
+        return self._build_status(data)
 
     def get_status(self) -> DeviceStatus:
         """Fetch live status from the AirMAX device."""
-        # Authenticate if needed
-        if not self._is_authenticated:
+        # Authenticate if needed (shared session may already be logged in)
+        if not self._sync_session().authenticated:
             if not self._authenticate():
-                return DeviceStatus(
-                    host=self.host,
-                    vendor=self.vendor,
-                    role=DeviceRole.ACCESS_POINT,
-                    is_online=False,
-                    last_error="Authentication failed",
-                )
+                return self._offline_status("Authentication failed")
 
         # Get data
-        data = self._get_status_data()
-        if data is None:
-            # Try re-auth
+        data, auth_required = self._get_status_data()
+        if data is None and auth_required:
+            # Session expired on the device: re-auth once
             if not self._authenticate():
-                return DeviceStatus(
-                    host=self.host,
-                    vendor=self.vendor,
-                    role=DeviceRole.ACCESS_POINT,
-                    is_online=False,
-                    last_error="Session expired and re-auth failed",
-                )
-            data = self._get_status_data()
-            if data is None:
-                return DeviceStatus(
-                    host=self.host,
-                    vendor=self.vendor,
-                    role=DeviceRole.ACCESS_POINT,
-                    is_online=False,
-                    last_error="Could not fetch status data",
-                )
+                return self._offline_status("Session expired and re-auth failed")
+            data, _ = self._get_status_data()
+        if data is None:
+            return self._offline_status("Could not fetch status data")
+
+        return self._build_status(data)
 
+    def _build_status(self, data: dict) -> DeviceStatus:
+        """Map status.cgi JSON to DeviceStatus."""
         # Parse the data
         host_info = data.get("host", {})
         wireless_info = data.get("wireless", {})
@@ -196,12 +218,9 @@ class UbiquitiAirmaxAdapter(BaseDeviceAdapter):
         return self._authenticate()
 
     def disconnect(self):
-        """Logout and close session."""
-        try:
-            logout_url = f"{self.base_url}/api/auth/logout"
-            self.session.post(logout_url)
-        except httpx.RequestError:
-            pass
-        finally:
-            self.session.close()
-            self._is_authenticated = False
+        """
+        Release the adapter. The shared session stays logged in for reuse;
+        it is logged out when it idles past AIROS_SESSION_IDLE_TTL or is evicted.
+        """
+        if self._airos is not None:
+            self._airos.last_used = time.monotonic()
@@ -0,0 +1,331 @@
+# app/utils/device_clients/airos_session.py
+"""
+Caché compartida de sesiones HTTP autenticadas para AirOS (Ubiquiti).
+
+Cada login en AirOS cuesta un handshake HTTPS + POST /api/auth. Antes se hacía
+en cada ciclo del monitor y en cada petición de datos en vivo, y se cerraba
+con logout. Aquí la sesión (cookies + token X-CSRF-ID) se mantiene viva entre
+usos, se re-autentica solo ante 401/403 y se cierra tras un TTL de inactividad.
+
+AsyncAirOSSessionCache es la variante asyncio: todas las sesiones comparten un
+único pool de conexiones (httpx.AsyncHTTPTransport con keep-alive), de modo que
+cientos de APs se consultan en paralelo sin ocupar threads.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+AIROS_SESSION_CACHE_SIZE = int(os.getenv("AIROS_SESSION_CACHE_SIZE", "512"))
+AIROS_SESSION_IDLE_TTL = float(os.getenv("AIROS_SESSION_IDLE_TTL", "300"))
+AIROS_MAX_CONNECTIONS = int(os.getenv("AIROS_MAX_CONNECTIONS", "200"))
+# Usa httpx.AsyncClient para el polling de Ubiquiti (monitor y live)
+UBIQUITI_ASYNC_HTTP = os.getenv("UBIQUITI_ASYNC_HTTP", "true").lower() == "true"
+SWEEP_INTERVAL = 30.0
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 UManager/1.0",
+    "Connection": "keep-alive",
+}
+
+
+class AirOSSession:
+    """Cliente httpx + estado de autenticación de un dispositivo AirOS."""
+
+    def __init__(self, base_url: str, username: str, password: str):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.client = httpx.Client(verify=False, headers=DEFAULT_HEADERS, timeout=15)  # nosec B501
+        self.authenticated = False
+        self.last_used = time.monotonic()
+        self.auth_lock = threading.Lock()
+
+    def authenticate(self) -> bool:
+        """POST /api/auth y guarda el token CSRF en los headers del cliente."""
+        with self.auth_lock:
+            self.client.cookies.clear()
+            self.client.headers.pop("X-CSRF-ID", None)
+            self.authenticated = False
+
+            try:
+                response = self.client.post(
+                    f"{self.base_url}/api/auth",
+                    data={"username": self.username, "password": self.password},
+                )
+                response.raise_for_status()
+            except (httpx.RequestError, httpx.HTTPStatusError):
+                return False
+
+            csrf_token = response.headers.get("X-CSRF-ID")
+            if csrf_token:
+                self.client.headers["X-CSRF-ID"] = csrf_token
+                self.authenticated = True
+            return self.authenticated
+
+    def close(self) -> None:
+        try:
+            if self.authenticated:
+                self.client.post(f"{self.base_url}/api/auth/logout")
+        except httpx.RequestError:
+            pass
+        finally:
+            self.client.close()
+            self.authenticated = False
+
+
+def _close_in_background(sessions: list[AirOSSession]) -> None:
+    if not sessions:
+        return
+
+    def close_all():
+        for session in sessions:
+            session.close()
+
+    threading.Thread(target=close_all, name="airos-logout", daemon=True).start()
+
+
+class AirOSSessionCache:
+    """
+    LRU acotada (AIROS_SESSION_CACHE_SIZE) de AirOSSession por
+    (base_url, username, hash del password). Thread-safe.
+    """
+
+    def __init__(self, max_size: int = AIROS_SESSION_CACHE_SIZE, idle_ttl: float = AIROS_SESSION_IDLE_TTL):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._sessions: OrderedDict[tuple, AirOSSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stats = {"created": 0, "reused": 0, "expired": 0, "evicted": 0}
+
+    @staticmethod
+    def _key(base_url: str, username: str, password: str) -> tuple:
+        digest = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+        return (base_url, username, digest)
+
+    def get(self, base_url: str, username: str, password: str) -> AirOSSession:
+        key = self._key(base_url, username, password)
+        now = time.monotonic()
+        to_close = []
+
+        with self._lock:
+            if now - self._last_sweep >= SWEEP_INTERVAL:
+                to_close += self._pop_expired(now)
+
+            session = self._sessions.get(key)
+            if session is not None and now - session.last_used < self.idle_ttl:
+                self._sessions.move_to_end(key)
+                self._stats["reused"] += 1
+            else:
+                if session is not None:
+                    to_close.append(self._sessions.pop(key))
+                    self._stats["expired"] += 1
+                session = AirOSSession(base_url, username, password)
+                self._sessions[key] = session
+                self._stats["created"] += 1
+                while len(self._sessions) > self.max_size:
+                    _, oldest = self._sessions.popitem(last=False)
+                    to_close.append(oldest)
+                    self._stats["evicted"] += 1
+            session.last_used = now
+
+        # Logout/close fuera del lock y en segundo plano (hace I/O; get() puede
+        # llamarse desde el event loop)
+        _close_in_background(to_close)
+        return session
+
+    def invalidate(self, base_url: str | None = None) -> None:
+        """Cierra las sesiones de un dispositivo (todas si base_url es None)."""
+        with self._lock:
+            keys = [k for k in self._sessions if base_url is None or k[0] == base_url]
+            sessions = [self._sessions.pop(k) for k in keys]
+        _close_in_background(sessions)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            expired = self._pop_expired(time.monotonic())
+        _close_in_background(expired)
+        return len(expired)
+
+    def _pop_expired(self, now: float) -> list[AirOSSession]:
+        self._last_sweep = now
+        keys = [k for k, s in self._sessions.items() if now - s.last_used >= self.idle_ttl]
+        self._stats["expired"] += len(keys)
+        return [self._sessions.pop(k) for k in keys]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "sessions": len(self._sessions)}
+
+
+class AsyncAirOSSession:
+    """
+    Variante asyncio de AirOSSession. Cookies y token CSRF sobreviven a un
+    cambio de event loop (el monitor job usa uno por ciclo): solo se recrea el
+    AsyncClient sobre el transporte del loop actual.
+    """
+
+    def __init__(self, base_url: str, username: str, password: str):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.cookies = httpx.Cookies()
+        self.csrf_token: str | None = None
+        self.authenticated = False
+        self.last_used = time.monotonic()
+        self._client: httpx.AsyncClient | None = None
+        self._auth_lock: asyncio.Lock | None = None
+        self._transport: httpx.AsyncHTTPTransport | None = None
+
+    def bind(self, transport: httpx.AsyncHTTPTransport) -> None:
+        """(Re)crea el cliente sobre el transporte compartido del loop actual."""
+        self._transport = transport
+        if self._client is not None:
+            self.cookies = self._client.cookies
+        headers = dict(DEFAULT_HEADERS)
+        if self.csrf_token:
+            headers["X-CSRF-ID"] = self.csrf_token
+        # No se cierra nunca con aclose(): cerraría el transporte compartido
+        self._client = httpx.AsyncClient(
+            transport=transport, headers=headers, cookies=self.cookies, timeout=15
+        )
+        self._auth_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        self.last_used = time.monotonic()
+        return self._client
+
+    async def authenticate(self) -> bool:
+        async with self._auth_lock:
+            self._client.cookies.clear()
+            self._client.headers.pop("X-CSRF-ID", None)
+            self.csrf_token = None
+            self.authenticated = False
+
+            try:
+                response = await self.client.post(
+                    f"{self.base_url}/api/auth",
+                    data={"username": self.username, "password": self.password},
+                )
+                response.raise_for_status()
+            except (httpx.RequestError, httpx.HTTPStatusError):
+                return False
+
+            csrf_token = response.headers.get("X-CSRF-ID")
+            if csrf_token:
+                self.csrf_token = csrf_token
+                self._client.headers["X-CSRF-ID"] = csrf_token
+                self.authenticated = True
+            return self.authenticated
+
+    async def logout(self) -> None:
+        if not self.authenticated:
+            return
+        try:
+            await self._client.post(f"{self.base_url}/api/auth/logout")
+        except httpx.RequestError:
+            pass
+        finally:
+            self.authenticated = False
+
+
+class AsyncAirOSSessionCache:
+    """
+    LRU acotada de AsyncAirOSSession con un transporte (pool de conexiones
+    keep-alive) compartido por event loop.
+    """
+
+    def __init__(self, max_size: int = AIROS_SESSION_CACHE_SIZE, idle_ttl: float = AIROS_SESSION_IDLE_TTL):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._sessions: OrderedDict[tuple, AsyncAirOSSession] = OrderedDict()
+        self._transport: httpx.AsyncHTTPTransport | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._last_sweep = time.monotonic()
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = {"created": 0, "reused": 0, "expired": 0, "evicted": 0}
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport(
+                verify=False,  # nosec B501 - AirOS usa certificados autofirmados
+                limits=httpx.Limits(
+                    max_connections=AIROS_MAX_CONNECTIONS,
+                    max_keepalive_connections=AIROS_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            )
+            self._loop = loop
+        return self._transport
+
+    def get(self, base_url: str, username: str, password: str) -> AsyncAirOSSession:
+        """Debe llamarse dentro del event loop."""
+        transport = self._get_transport()
+        key = AirOSSessionCache._key(base_url, username, password)
+        now = time.monotonic()
+        to_logout = []
+
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self._last_sweep = now
+            expired = [k for k, s in self._sessions.items() if now - s.last_used >= self.idle_ttl]
+            self._stats["expired"] += len(expired)
+            to_logout += [self._sessions.pop(k) for k in expired]
+
+        session = self._sessions.get(key)
+        if session is not None and now - session.last_used < self.idle_ttl:
+            self._sessions.move_to_end(key)
+            self._stats["reused"] += 1
+        else:
+            if session is not None:
+                to_logout.append(self._sessions.pop(key))
+                self._stats["expired"] += 1
+            session = AsyncAirOSSession(base_url, username, password)
+            self._sessions[key] = session
+            self._stats["created"] += 1
+            while len(self._sessions) > self.max_size:
+                _, oldest = self._sessions.popitem(last=False)
+                to_logout.append(oldest)
+                self._stats["evicted"] += 1
+
+        # Sesión nueva (o que sustituye a una expirada/expulsada) o transporte de otro loop
+        if session._client is None or session._transport is not transport:
+            session.bind(transport)
+        session.last_used = now
+
+        for old in to_logout:
+            if old._client is not None:
+                task = asyncio.create_task(old.logout())
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return session
+
+    async def close_transport(self) -> None:
+        """
+        Cierra las conexiones del loop actual (ej. al final de un ciclo del
+        monitor). Las sesiones lógicas (cookies/CSRF) se conservan.
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._transport is not None:
+            await self._transport.aclose()
+        self._transport = None
+        self._loop = None
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "sessions": len(self._sessions)}
+
+
+# Singletons
+airos_sessions = AirOSSessionCache()
+async_airos_sessions = AsyncAirOSSessionCache()
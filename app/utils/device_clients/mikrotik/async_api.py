@@ -0,0 +1,387 @@
+# app/utils/device_clients/mikrotik/async_api.py
+"""
+Cliente asyncio nativo para la API de RouterOS (protocolo de sentencias, API/API-SSL).
+
+Expone la misma interfaz que usan los módulos mikrotik/* con routeros_api
+(`api.get_resource(path).get()/.call()/.add()/.set()/.remove()`), pero con
+métodos awaitables. Cada comando lleva su propio `.tag`, de modo que varias
+corutinas pueden compartir una misma conexión: un único reader por socket
+reparte las respuestas a quien las pidió. Así se pueden sondear miles de
+dispositivos desde un solo event loop, sin un thread por petición en vuelo.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import ssl
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Activa el cliente async en los caminos de monitoreo de routers
+ASYNC_CLIENT_ENABLED = os.getenv("ROUTEROS_ASYNC_CLIENT", "false").lower() == "true"
+DEFAULT_TIMEOUT = float(os.getenv("ROUTEROS_ASYNC_TIMEOUT", "30"))
+
+
+class AsyncRouterOsError(Exception):
+    """Error devuelto por el router (!trap)."""
+
+
+class AsyncRouterOsConnectionError(AsyncRouterOsError):
+    """Conexión cerrada, !fatal o timeout de transporte."""
+
+
+# --- Codificación del protocolo ---
+
+
+def encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes([length])
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, "big")
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, "big")
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, "big")
+    return b"\xf0" + length.to_bytes(4, "big")
+
+
+def encode_sentence(words: list[str]) -> bytes:
+    data = bytearray()
+    for word in words:
+        raw = word.encode("utf-8")
+        data += encode_length(len(raw))
+        data += raw
+    data += b"\x00"
+    return bytes(data)
+
+
+async def read_length(reader: asyncio.StreamReader) -> int:
+    first = (await reader.readexactly(1))[0]
+    if first < 0x80:
+        return first
+    if first & 0xC0 == 0x80:
+        extra, value = 1, first & 0x3F
+    elif first & 0xE0 == 0xC0:
+        extra, value = 2, first & 0x1F
+    elif first & 0xF0 == 0xE0:
+        extra, value = 3, first & 0x0F
+    elif first == 0xF0:
+        extra, value = 4, 0
+    else:
+        raise AsyncRouterOsConnectionError(f"Invalid length prefix: {first:#x}")
+    for byte in await reader.readexactly(extra):
+        value = (value << 8) | byte
+    return value
+
+
+async def read_sentence(reader: asyncio.StreamReader) -> list[str]:
+    words = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        raw = await reader.readexactly(length)
+        words.append(raw.decode("utf-8", errors="replace"))
+
+
+def parse_attributes(words: list[str]) -> tuple[dict[str, str], str | None]:
+    """Separa atributos (=key=value) y el .tag de una sentencia de respuesta."""
+    attrs: dict[str, str] = {}
+    tag = None
+    for word in words:
+        if word.startswith("="):
+            key, _, value = word[1:].partition("=")
+            attrs[key] = value
+        elif word.startswith(".tag="):
+            tag = word[5:]
+    return attrs, tag
+
+
+def _to_api_key(key: str) -> str:
+    # Igual que routeros_api: '_' -> '-', 'id'/'proplist' -> '.id'/'.proplist'
+    key = key.replace("_", "-")
+    return "." + key if key in ("id", "proplist") else key
+
+
+def _from_api_key(key: str) -> str:
+    return key[1:] if key in (".id", ".proplist") else key
+
+
+# --- Cliente ---
+
+
+class AsyncResponse(list):
+    """Lista de filas (!re) con el mensaje de !done (ej. 'ret' de un add)."""
+
+    def __init__(self, rows=(), done_message: dict | None = None):
+        super().__init__(rows)
+        self.done_message = done_message or {}
+
+
+class _Pending:
+    __slots__ = ("future", "rows", "trap")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.rows: list[dict[str, str]] = []
+        self.trap: dict[str, str] | None = None
+
+
+class AsyncRouterOsResource:
+    def __init__(self, api: "AsyncRouterOsApi", path: str):
+        self.api = api
+        self.path = "/" + path.strip("/") if path.strip("/") else ""
+
+    async def get(self, **kwargs) -> AsyncResponse:
+        return await self.call("print", queries=kwargs)
+
+    async def call(
+        self,
+        command: str,
+        arguments: dict[str, Any] | None = None,
+        queries: dict[str, Any] | None = None,
+        any_of: tuple[tuple[str, Any], ...] = (),
+    ) -> AsyncResponse:
+        """any_of: pares (key, value) combinados con OR (`?k=v ... ?#|`)."""
+        words = [f"{self.path}/{command}"]
+        words += [f"={_to_api_key(k)}={v}" for k, v in (arguments or {}).items()]
+        words += [f"?{_to_api_key(k)}={v}" for k, v in (queries or {}).items()]
+        if any_of:
+            words += [f"?{k}={v}" for k, v in any_of]
+            if len(any_of) > 1:
+                words.append("?#" + "|" * (len(any_of) - 1))
+        response = await self.api.talk(words)
+        rows = [{_from_api_key(k): v for k, v in row.items()} for row in response]
+        return AsyncResponse(rows, response.done_message)
+
+    async def add(self, **kwargs) -> AsyncResponse:
+        return await self.call("add", kwargs)
+
+    async def set(self, **kwargs) -> AsyncResponse:
+        return await self.call("set", kwargs)
+
+    async def remove(self, **kwargs) -> AsyncResponse:
+        return await self.call("remove", kwargs)
+
+
+class AsyncRouterOsApi:
+    """
+    Conexión API a un router. Multiplexa comandos concurrentes por `.tag`.
+    Crear con `await AsyncRouterOsApi.connect(...)`.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        host: str,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.host = host
+        self.timeout = timeout
+        self._reader = reader
+        self._writer = writer
+        self._tags = itertools.count(1)
+        self._pending: dict[str, _Pending] = {}
+        self._closed = False
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(
+        cls,
+        host: str,
+        username: str,
+        password: str,
+        port: int = 8729,
+        use_ssl: bool = True,
+        ssl_context: ssl.SSLContext | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> "AsyncRouterOsApi":
+        if use_ssl and ssl_context is None:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context if use_ssl else None),
+                timeout=timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise AsyncRouterOsConnectionError(f"Cannot connect to {host}:{port}: {e}") from e
+
+        api = cls(reader, writer, host, timeout)
+        try:
+            await api.login(username, password)
+        except Exception:
+            await api.close()
+            raise
+        return api
+
+    async def login(self, username: str, password: str) -> None:
+        """Login plaintext (RouterOS >= 6.43) con fallback a challenge MD5."""
+        response = await self.talk(["/login", f"=name={username}", f"=password={password}"])
+        challenge = response.done_message.get("ret")
+        if challenge:
+            digest = hashlib.md5(  # nosec B324 - Required by legacy RouterOS login
+                b"\x00" + password.encode("utf-8") + bytes.fromhex(challenge)
+            ).hexdigest()
+            await self.talk(["/login", f"=name={username}", f"=response=00{digest}"])
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def get_resource(self, path: str) -> AsyncRouterOsResource:
+        return AsyncRouterOsResource(self, path)
+
+    async def talk(self, words: list[str], timeout: float | None = None) -> AsyncResponse:
+        """Envía un comando etiquetado y espera su !done."""
+        if self._closed:
+            raise AsyncRouterOsConnectionError(f"Connection to {self.host} is closed")
+
+        tag = str(next(self._tags))
+        pending = _Pending(asyncio.get_running_loop().create_future())
+        self._pending[tag] = pending
+        try:
+            # Una sola escritura por sentencia: no se intercalan aunque haya concurrencia
+            self._writer.write(encode_sentence(words + [f".tag={tag}"]))
+            await self._writer.drain()
+            return await asyncio.wait_for(pending.future, timeout=timeout or self.timeout)
+        except asyncio.TimeoutError as e:
+            raise AsyncRouterOsConnectionError(
+                f"Timeout waiting for {words[0]} on {self.host}"
+            ) from e
+        except (ConnectionError, OSError) as e:
+            await self.close()
+            raise AsyncRouterOsConnectionError(f"{self.host}: {e}") from e
+        finally:
+            self._pending.pop(tag, None)
+
+    async def _read_loop(self) -> None:
+        error: Exception = AsyncRouterOsConnectionError(f"Connection to {self.host} closed")
+        try:
+            while True:
+                words = await read_sentence(self._reader)
+                if not words:
+                    continue
+                reply = words[0]
+                attrs, tag = parse_attributes(words[1:])
+
+                if reply == "!fatal":
+                    message = attrs.get("message") or (words[1] if len(words) > 1 else "")
+                    error = AsyncRouterOsConnectionError(f"!fatal from {self.host}: {message}")
+                    break
+
+                pending = self._pending.get(tag) if tag is not None else None
+                if pending is None or pending.future.done():
+                    continue  # Respuesta tardía de un comando ya expirado
+
+                if reply == "!re":
+                    pending.rows.append(attrs)
+                elif reply == "!trap":
+                    pending.trap = attrs
+                elif reply == "!done":
+                    if pending.trap is not None:
+                        message = pending.trap.get("message", "unknown error")
+                        pending.future.set_exception(AsyncRouterOsError(message))
+                    else:
+                        pending.future.set_result(AsyncResponse(pending.rows, attrs))
+                # "!empty" (RouterOS 7.18+) no aporta filas; se espera el !done
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            error = AsyncRouterOsConnectionError(f"Connection to {self.host} lost: {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._closed = True
+            for pending in list(self._pending.values()):
+                if not pending.future.done():
+                    pending.future.set_exception(error)
+            try:
+                self._writer.close()
+            except Exception:  # nosec B110 - Socket may already be closed
+                pass
+
+    async def close(self) -> None:
+        if self._closed and self._reader_task.done():
+            return
+        self._closed = True
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except (asyncio.CancelledError, Exception):  # nosec B110 - Shutdown
+            pass
+        try:
+            self._writer.close()
+            await self._writer.wait_closed()
+        except Exception:  # nosec B110 - Socket may already be closed
+            pass
+
+
+class AsyncApiCache:
+    """
+    Una conexión compartida por (host, port, username, hash del password)
+    dentro del event loop. Gracias al multiplexado por `.tag` no hace falta
+    checkout exclusivo. Si cambia el password se cierra la sesión anterior en
+    lugar de reutilizarla.
+    """
+
+    def __init__(self):
+        self._apis: dict[tuple, AsyncRouterOsApi] = {}
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def get_api(
+        self, host: str, username: str, password: str, port: int = 8729
+    ) -> AsyncRouterOsApi:
+        # Las conexiones pertenecen a un loop: el monitor job crea uno por ciclo
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._apis.clear()
+            self._locks.clear()
+            self._loop = loop
+
+        digest = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+        key = (host, port, username, digest)
+        api = self._apis.get(key)
+        if api is not None and not api.closed:
+            return api
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            api = self._apis.get(key)
+            if api is None or api.closed:
+                # Sesiones autenticadas con un password anterior
+                for stale in [k for k in self._apis if k[:3] == key[:3] and k != key]:
+                    await self._apis.pop(stale).close()
+                    self._locks.pop(stale, None)
+                api = await AsyncRouterOsApi.connect(host, username, password, port)
+                self._apis[key] = api
+                logger.debug(f"[AsyncRouterOs] Connected to {host}:{port}")
+            return api
+
+    async def drop(self, host: str, port: int | None = None, username: str | None = None):
+        keys = [
+            key
+            for key in self._apis
+            if key[0] == host
+            and (port is None or key[1] == port)
+            and (username is None or key[2] == username)
+        ]
+        for key in keys:
+            await self._apis.pop(key).close()
+
+    async def close_all(self) -> None:
+        for api in list(self._apis.values()):
+            await api.close()
+        self._apis.clear()
+
+    def get_stats(self) -> dict:
+        return {"connections": sum(1 for api in self._apis.values() if not api.closed)}
+
+
+# Singleton
+async_api_cache = AsyncApiCache()
@@ -0,0 +1,131 @@
+# app/utils/device_clients/mikrotik/batch.py
+"""
+Peticiones RouterOS en lote (pipelining con `.tag`).
+
+En vez de N round-trips secuenciales (enviar → esperar !done → enviar...), se
+envían todos los comandos seguidos, cada uno con su `.tag`, y después se
+recogen las respuestas. En enlaces con 50–200 ms de latencia un poll pasa a
+costar ~1 RTT en lugar de 3–5.
+
+- run_batch(): API bloqueante de routeros_api (usa `call_async`, que ya
+  etiqueta cada comando y bufferiza las respuestas por tag).
+- run_batch_async(): cliente asyncio nativo (async_api).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from routeros_api.query import IsEqualQuery, OrQuery
+
+from .async_api import AsyncRouterOsConnectionError
+from .connection import is_connection_error
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchCommand:
+    """
+    Un comando del lote.
+
+    optional=True: un !trap (ej. /system/health en equipos sin sensores)
+    devuelve [] en lugar de hacer fallar el lote completo.
+    any_of: pares (key, value) combinados con OR (`?k=v ... ?#|`), ej. buscar
+    varias MACs en una sola consulta.
+    """
+
+    path: str
+    command: str = "print"
+    arguments: dict[str, Any] = field(default_factory=dict)
+    queries: dict[str, Any] = field(default_factory=dict)
+    optional: bool = False
+    any_of: tuple[tuple[str, str], ...] = ()
+
+
+def print_cmd(path: str, optional: bool = False, **queries) -> BatchCommand:
+    """Atajo para `resource.get(**queries)`."""
+    return BatchCommand(path, "print", queries=queries, optional=optional)
+
+
+class FailedRows(list):
+    """
+    Resultado vacío de un comando opcional que falló. Se comporta como [] pero
+    conserva el error, por si el llamador quiere un fallback.
+    """
+
+    def __init__(self, error: Exception):
+        super().__init__()
+        self.error = error
+
+
+def _additional_queries(cmd: BatchCommand) -> tuple:
+    if not cmd.any_of:
+        return ()
+    terms = [IsEqualQuery(key, value) for key, value in cmd.any_of]
+    return (terms[0] if len(terms) == 1 else OrQuery(*terms),)
+
+
+def _collect(commands: list[BatchCommand], outcomes: list[Any]) -> list[list[dict]]:
+    results = []
+    first_error = None
+    for cmd, outcome in zip(commands, outcomes):
+        if isinstance(outcome, Exception):
+            if not cmd.optional and first_error is None:
+                first_error = outcome
+            results.append(FailedRows(outcome))
+        else:
+            results.append(list(outcome))
+    if first_error is not None:
+        raise first_error
+    return results
+
+
+def run_batch(api, commands: list[BatchCommand]) -> list[list[dict]]:
+    """
+    Ejecuta los comandos en un solo viaje y devuelve las filas de cada uno
+    (en el mismo orden). Requiere uso exclusivo del socket durante la llamada.
+    """
+    promises = []
+    for cmd in commands:
+        resource = api.get_resource(cmd.path)
+        if not hasattr(resource, "call_async"):
+            # API sin soporte de promesas: secuencial
+            promises.append(None)
+            continue
+        promises.append(
+            resource.call_async(cmd.command, cmd.arguments, cmd.queries, _additional_queries(cmd))
+        )
+
+    outcomes = []
+    for cmd, promise in zip(commands, promises):
+        try:
+            if promise is None:
+                resource = api.get_resource(cmd.path)
+                outcomes.append(
+                    resource.call(cmd.command, cmd.arguments, cmd.queries, _additional_queries(cmd))
+                )
+            else:
+                outcomes.append(promise.get())
+        except Exception as e:
+            # Con el socket roto no tiene sentido seguir leyendo respuestas
+            if is_connection_error(e):
+                raise
+            outcomes.append(e)
+    return _collect(commands, outcomes)
+
+
+async def run_batch_async(api, commands: list[BatchCommand]) -> list[list[dict]]:
+    """Versión para AsyncRouterOsApi: los comandos se multiplexan en la misma conexión."""
+    outcomes = await asyncio.gather(
+        *(
+            api.get_resource(cmd.path).call(cmd.command, cmd.arguments, cmd.queries, cmd.any_of)
+            for cmd in commands
+        ),
+        return_exceptions=True,
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, AsyncRouterOsConnectionError):
+            raise outcome
+    return _collect(commands, outcomes)
@@ -0,0 +1,157 @@
+# app/utils/device_clients/mikrotik/capabilities.py
+"""
+Caché por host de las capacidades de un equipo MikroTik.
+
+Detectar el paquete inalámbrico ('wireless', 'wifi' o 'wifiwave2') obliga a
+probar hasta tres paths, y get_status de un AP lo hacía varias veces por poll.
+Aquí la detección se hace una sola vez (en un lote pipelined junto con
+/system/resource y /system/routerboard) y se guarda por host. Solo se repite
+cuando cambia la versión de RouterOS o cuando el path cacheado falla. Un equipo
+sin paquete inalámbrico se vuelve a sondear tras CAPABILITY_NO_WIRELESS_TTL:
+instalar/habilitar el paquete wifi o crear la primera interfaz no cambia la
+versión.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from routeros_api.api import RouterOsApi
+
+from . import parsers as mikrotik_parsers
+from .batch import print_cmd, run_batch
+
+logger = logging.getLogger(__name__)
+
+CAPABILITY_NO_WIRELESS_TTL = float(os.getenv("CAPABILITY_NO_WIRELESS_TTL", "300"))
+
+# (tipo, path) en orden de preferencia
+WIRELESS_PACKAGES = [
+    ("wireless", "/interface/wireless"),
+    ("wifi", "/interface/wifi"),
+    ("wifiwave2", "/interface/wifiwave2"),
+]
+WIRELESS_PATHS = dict(WIRELESS_PACKAGES)
+
+CAPABILITY_PROBE_BATCH = [
+    print_cmd("/system/resource"),
+    print_cmd("/system/routerboard", optional=True),  # CHR/x86 no tienen routerboard
+] + [print_cmd(path, optional=True) for _, path in WIRELESS_PACKAGES]
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """Lo que se sabe de un equipo sin tener que volver a preguntarlo."""
+
+    wireless_type: str | None = None
+    interface_path: str | None = None
+    registration_path: str | None = None
+    ros_version: str | None = None
+    ros_major: int | None = None
+    board_name: str | None = None
+    architecture: str | None = None
+    model: str | None = None
+    is_routerboard: bool = False
+    detected_at: float = field(default_factory=time.monotonic)
+
+
+def detect_capabilities(api: RouterOsApi) -> tuple[DeviceCapabilities, list[dict[str, Any]]]:
+    """
+    Sondea el equipo en un solo round-trip.
+
+    Returns:
+        Tuple of (capabilities, wireless_interfaces). Las interfaces del paquete
+        detectado se devuelven para no pedirlas otra vez.
+    """
+    resource, routerboard, *wireless = run_batch(api, CAPABILITY_PROBE_BATCH)
+
+    wireless_type, interface_path, interfaces = None, None, []
+    for (wtype, path), rows in zip(WIRELESS_PACKAGES, wireless):
+        if rows:  # Has at least one interface of this type
+            wireless_type, interface_path, interfaces = wtype, path, rows
+            break
+
+    res = resource[0] if resource else {}
+    rb = routerboard[0] if routerboard else {}
+    version = res.get("version")
+    caps = DeviceCapabilities(
+        wireless_type=wireless_type,
+        interface_path=interface_path,
+        registration_path=f"{interface_path}/registration-table" if interface_path else None,
+        ros_version=version,
+        ros_major=mikrotik_parsers.parse_ros_major(version),
+        board_name=res.get("board-name"),
+        architecture=res.get("architecture-name"),
+        model=rb.get("model"),
+        is_routerboard=rb.get("routerboard") == "true",
+    )
+    return caps, interfaces
+
+
+class CapabilityCache:
+    """Capacidades por host. Thread-safe (lo usan los workers del polling)."""
+
+    def __init__(self, no_wireless_ttl: float = CAPABILITY_NO_WIRELESS_TTL):
+        self.no_wireless_ttl = no_wireless_ttl
+        self._entries: dict[str, DeviceCapabilities] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "probes": 0, "invalidations": 0, "expired": 0}
+
+    def get(self, host: str) -> DeviceCapabilities | None:
+        """Capacidades cacheadas; None si hay que detectar (sin entrada o sin wireless caducado)."""
+        with self._lock:
+            caps = self._entries.get(host)
+            if (
+                caps is not None
+                and caps.interface_path is None
+                and time.monotonic() - caps.detected_at >= self.no_wireless_ttl
+            ):
+                del self._entries[host]
+                self._stats["expired"] += 1
+                caps = None
+            self._stats["hits" if caps is not None else "misses"] += 1
+            return caps
+
+    def put(self, host: str, caps: DeviceCapabilities) -> None:
+        with self._lock:
+            self._entries[host] = caps
+            self._stats["probes"] += 1
+        logger.debug(
+            f"[Capabilities] {host}: wireless={caps.wireless_type}, "
+            f"ros={caps.ros_version}, board={caps.board_name}"
+        )
+
+    def invalidate(self, host: str | None = None) -> None:
+        """Olvida un host (todos si host es None)."""
+        with self._lock:
+            if host is None:
+                self._stats["invalidations"] += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(host, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def observe_version(self, host: str, version: str | None) -> None:
+        """
+        Llamar con la versión leída en cada poll (/system/resource). Si cambió
+        (actualización de RouterOS, posible cambio de paquete wifi) se re-detecta.
+        """
+        if not version:
+            return
+        with self._lock:
+            caps = self._entries.get(host)
+            if caps is None or caps.ros_version == version:
+                return
+            del self._entries[host]
+            self._stats["invalidations"] += 1
+        logger.info(f"[Capabilities] {host}: RouterOS {caps.ros_version} -> {version}, re-detecting")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "hosts": len(self._entries)}
+
+
+# Singleton
+capability_cache = CapabilityCache()
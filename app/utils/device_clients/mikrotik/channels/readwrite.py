@@ -1,8 +1,7 @@
 import logging
-import ssl
 from contextlib import contextmanager
 
-from routeros_api import RouterOsApiPool
+from ..connection import is_connection_error, session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -11,32 +10,16 @@ logger = logging.getLogger(__name__)
 def get_config_channel(host: str, username: str, password: str, port: int = 8729):
     """
     Context manager para operaciones de escritura / config.
-    Abre conexión, entrega API, y cierra automáticamente al salir.
-    ESTRICTAMENTE ONE-SHOT.
+    Toma una sesión autenticada del RouterSessionPool (uso exclusivo mientras
+    dure el bloque) y la devuelve al salir; si la conexión falló, se descarta.
     """
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-
-    pool = RouterOsApiPool(
-        host,
-        username=username,
-        password=password,
-        port=port,
-        use_ssl=True,
-        ssl_context=ssl_context,
-        plaintext_login=True,
-    )
-    pool.set_timeout(30)
-
+    session = session_pool.checkout(host, username, password, port)
+    broken = False
     try:
-        api = pool.get_api()
-        yield api
+        yield session.api
     except Exception as e:
+        broken = is_connection_error(e)
         logger.error(f"[ConfigChannel] Error en operación config {host}: {e}")
         raise
     finally:
-        try:
-            pool.disconnect()
-        except Exception:  # nosec B110 - Disconnect cleanup, safe to ignore
-            pass
+        session_pool.checkin(session, broken=broken)
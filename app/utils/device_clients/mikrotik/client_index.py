@@ -0,0 +1,190 @@
+# app/utils/device_clients/mikrotik/client_index.py
+"""
+Índice incremental por AP: MAC -> entrada ARP / lease DHCP (IP y hostname).
+
+Antes cada poll descargaba /ip/arp y /ip/dhcp-server/lease completas solo
+para enriquecer las estaciones del registration-table; en APs que además
+enrutan miles de hosts era el mayor payload del poll. Ahora:
+
+- Resincronización completa cada CLIENT_INDEX_RESYNC segundos, pidiendo solo
+  las columnas necesarias (`.proplist`).
+- Entre resincronizaciones, las MACs nuevas se buscan con una consulta OR
+  (`?mac-address=A ?mac-address=B ?#|`) que devuelve solo esas filas. Las que
+  se buscaron y no aparecen se recuerdan CLIENT_INDEX_MISS_TTL segundos (una
+  estación suele asociarse antes de tener lease o entrada ARP).
+- build_clients() consulta los dicts del índice en O(1) por MAC.
+
+No se usa `listen`: las sesiones del pool se prestan por poll y un listen
+dejaría una conexión ocupada de forma permanente por AP.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .batch import BatchCommand, FailedRows
+
+logger = logging.getLogger(__name__)
+
+CLIENT_INDEX_RESYNC = float(os.getenv("CLIENT_INDEX_RESYNC", "900"))
+CLIENT_INDEX_MISS_TTL = float(os.getenv("CLIENT_INDEX_MISS_TTL", "60"))
+LOOKUP_CHUNK = 32  # MACs por consulta OR
+
+ARP_PATH = "/ip/arp"
+DHCP_PATH = "/ip/dhcp-server/lease"
+ARP_PROPLIST = "mac-address,address,comment"
+DHCP_PROPLIST = "mac-address,address,host-name"
+
+
+@dataclass
+class _HostIndex:
+    arp: dict[str, dict[str, Any]] = field(default_factory=dict)
+    dhcp: dict[str, dict[str, Any]] = field(default_factory=dict)
+    misses: dict[str, float] = field(default_factory=dict)  # MAC -> monotonic del fallo
+    synced_at: float = 0.0
+
+
+def _full_commands() -> list[BatchCommand]:
+    return [
+        BatchCommand(ARP_PATH, arguments={"proplist": ARP_PROPLIST}, optional=True),
+        BatchCommand(DHCP_PATH, arguments={"proplist": DHCP_PROPLIST}, optional=True),
+    ]
+
+
+def _lookup_commands(macs: list[str]) -> list[BatchCommand]:
+    commands = []
+    for i in range(0, len(macs), LOOKUP_CHUNK):
+        any_of = tuple(("mac-address", mac) for mac in macs[i : i + LOOKUP_CHUNK])
+        commands += [
+            BatchCommand(ARP_PATH, arguments={"proplist": ARP_PROPLIST}, optional=True, any_of=any_of),
+            BatchCommand(DHCP_PATH, arguments={"proplist": DHCP_PROPLIST}, optional=True, any_of=any_of),
+        ]
+    return commands
+
+
+def _index_rows(rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    # MAC en mayúsculas para un match consistente con el registration-table
+    return {mac.upper(): row for row in rows if (mac := row.get("mac-address"))}
+
+
+class ClientIndex:
+    """
+    Índices por host. Uso en dos pasos (para ir en el mismo lote que el resto
+    del poll):
+
+        commands = client_index.plan(host, macs)
+        rows = run_batch(api, commands)
+        arp_map, dhcp_map = client_index.apply(host, commands, rows, macs)
+    """
+
+    def __init__(self, resync_interval: float = CLIENT_INDEX_RESYNC, miss_ttl: float = CLIENT_INDEX_MISS_TTL):
+        self.resync_interval = resync_interval
+        self.miss_ttl = miss_ttl
+        self._hosts: dict[str, _HostIndex] = {}
+        self._lock = threading.Lock()
+        self._stats = {"resyncs": 0, "lookups": 0, "hits": 0, "misses": 0}
+
+    def _needs_resync(self, entry: _HostIndex | None) -> bool:
+        return entry is None or time.monotonic() - entry.synced_at >= self.resync_interval
+
+    def plan(self, host: str | None, macs: list[str], force: bool = False) -> list[BatchCommand]:
+        """Comandos necesarios para poder resolver `macs` (vacío si ya se conocen todas)."""
+        with self._lock:
+            entry = self._hosts.get(host) if host else None
+            if force or self._needs_resync(entry):
+                return _full_commands()
+            now = time.monotonic()
+            unknown = sorted(
+                {
+                    mac
+                    for m in macs
+                    if (mac := m.upper()) not in entry.arp
+                    and mac not in entry.dhcp
+                    and now - entry.misses.get(mac, float("-inf")) >= self.miss_ttl
+                }
+            )
+        return _lookup_commands(unknown)
+
+    def apply(
+        self,
+        host: str | None,
+        commands: list[BatchCommand],
+        rows: list[list[dict[str, Any]]],
+        macs: list[str],
+    ) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+        """
+        Incorpora el resultado de plan() y devuelve (arp_map, dhcp_map).
+
+        Solo se recuerda como fallo una MAC que alguna de estas consultas buscó
+        (resync completo o su any_of) sin que ninguna fallara; el resto se
+        vuelve a planificar en el próximo poll.
+        """
+        full = bool(commands) and not commands[0].any_of
+        if any(isinstance(res, FailedRows) for res in rows):
+            searched = set()
+        elif full:
+            searched = {m.upper() for m in macs}
+        else:
+            searched = {mac for cmd in commands for _, mac in cmd.any_of}
+        arp_rows = [r for cmd, res in zip(commands, rows) if cmd.path == ARP_PATH for r in res]
+        dhcp_rows = [r for cmd, res in zip(commands, rows) if cmd.path == DHCP_PATH for r in res]
+
+        if not host:
+            return _index_rows(arp_rows), _index_rows(dhcp_rows)
+
+        with self._lock:
+            entry = self._hosts.get(host)
+            if full:
+                entry = _HostIndex(
+                    arp=_index_rows(arp_rows), dhcp=_index_rows(dhcp_rows), synced_at=time.monotonic()
+                )
+                self._hosts[host] = entry
+                self._stats["resyncs"] += 1
+            elif entry is None:
+                return {}, {}  # Nothing fetched yet (no stations to resolve)
+            elif commands:
+                entry.arp.update(_index_rows(arp_rows))
+                entry.dhcp.update(_index_rows(dhcp_rows))
+                self._stats["lookups"] += 1
+
+            now = time.monotonic()
+            for m in macs:
+                mac = m.upper()
+                if mac in entry.arp or mac in entry.dhcp:
+                    entry.misses.pop(mac, None)
+                    self._stats["hits"] += 1
+                elif mac in searched:
+                    entry.misses[mac] = now
+                    self._stats["misses"] += 1
+            return entry.arp, entry.dhcp
+
+    def lookup(self, host: str, mac: str) -> tuple[dict | None, dict | None]:
+        """(entrada ARP, lease DHCP) de una MAC, sin I/O."""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                return None, None
+            mac = mac.upper()
+            return entry.arp.get(mac), entry.dhcp.get(mac)
+
+    def invalidate(self, host: str | None = None) -> None:
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "hosts": len(self._hosts),
+                "entries": sum(len(e.arp) + len(e.dhcp) for e in self._hosts.values()),
+            }
+
+
+# Singleton
+client_index = ClientIndex()
@@ -4,10 +4,21 @@ Centralized MikroTik connection manager.
 
 Provides a shared connection pool cache for MikroTik devices,
 eliminating duplication between RouterService and device adapters.
+
+RouterSessionPool keeps authenticated API-SSL sessions per (host, port, user)
+so RouterService / config channels skip the TLS handshake + login on every use.
+Each session is checked out exclusively by one thread at a time: sharing a
+socket between threads is what produced the "Malformed sentence" and
+"Bad file descriptor" errors that got the old pool cache disabled.
 """
 
 import logging
+import os
 import ssl
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 
 from routeros_api import RouterOsApiPool
 from routeros_api.api import RouterOsApi
@@ -18,6 +29,238 @@ logger = logging.getLogger(__name__)
 # Key: (host, port, username), Value: RouterOsApiPool
 _pool_cache: dict[tuple, RouterOsApiPool] = {}
 
+# Session pool tuning (env configurable)
+SESSION_POOL_SIZE = int(os.getenv("ROUTER_SESSION_POOL_SIZE", "4"))  # idle sessions kept per key
+SESSION_IDLE_TIMEOUT = float(os.getenv("ROUTER_SESSION_IDLE_TIMEOUT", "120"))
+SESSION_PROBE_AFTER = float(os.getenv("ROUTER_SESSION_PROBE_AFTER", "10"))
+SESSION_MAX_AGE = float(os.getenv("ROUTER_SESSION_MAX_AGE", "1800"))
+SWEEP_INTERVAL = 30.0
+
+# Substrings of errors that mean the socket/session is no longer usable
+CONNECTION_ERROR_MARKERS = (
+    "malformed sentence",
+    "bad file descriptor",
+    "ssl",
+    "record_layer",
+    "connection closed",
+    "connection reset",
+    "connection refused",
+    "connection aborted",
+    "broken pipe",
+    "timed out",
+    "eof occurred",
+)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """True si el error indica que la sesión API está rota y debe descartarse."""
+    if isinstance(error, (ssl.SSLError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, OSError) and getattr(error, "errno", None) == 9:  # EBADF
+        return True
+    error_str = str(error).lower()
+    return any(marker in error_str for marker in CONNECTION_ERROR_MARKERS)
+
+
+def _create_api_pool(host: str, username: str, password: str, port: int) -> RouterOsApiPool:
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+
+    api_pool = RouterOsApiPool(
+        host,
+        username=username,
+        password=password,
+        port=port,
+        use_ssl=True,
+        ssl_context=ssl_context,
+        plaintext_login=True,
+    )
+    api_pool.set_timeout(30)
+    return api_pool
+
+
+@dataclass
+class RouterSession:
+    """Sesión API autenticada. Solo un thread la usa a la vez (checkout/checkin)."""
+
+    key: tuple
+    password: str
+    api_pool: RouterOsApiPool
+    api: RouterOsApi
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def close(self) -> None:
+        try:
+            self.api_pool.disconnect()
+        except Exception:  # nosec B110 - Socket may already be dead
+            pass
+
+
+class RouterSessionPool:
+    """
+    Pool thread-safe de sesiones RouterOS por (host, port, username).
+
+    - checkout(): devuelve una sesión idle (sondeada con /system/identity si lleva
+      más de SESSION_PROBE_AFTER segundos sin uso) o abre una nueva.
+    - checkin(): la devuelve al pool; si se marca broken, o el pool ya tiene
+      SESSION_POOL_SIZE sesiones idle, se cierra.
+    - Las sesiones idle más de SESSION_IDLE_TIMEOUT se cierran en un barrido perezoso.
+    """
+
+    def __init__(self, max_idle: int = SESSION_POOL_SIZE):
+        self._max_idle = max_idle
+        self._idle: dict[tuple, list[RouterSession]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "probe_failures": 0,
+            "discarded": 0,
+            "evicted_idle": 0,
+        }
+
+    def checkout(self, host: str, username: str, password: str, port: int = 8729) -> RouterSession:
+        key = (host, port, username)
+        self._maybe_sweep()
+
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                session = idle.pop() if idle else None
+            if session is None:
+                break
+
+            if session.password != password or self._is_expired(session, time.monotonic()):
+                self._close(session, "discarded")
+                continue
+
+            if time.monotonic() - session.last_used >= SESSION_PROBE_AFTER and not self._probe(session):
+                with self._lock:
+                    self._stats["probe_failures"] += 1
+                self._close(session, "discarded")
+                continue
+
+            with self._lock:
+                self._stats["reused"] += 1
+            session.last_used = time.monotonic()
+            return session
+
+        # Sin sesiones reutilizables: handshake TLS + login (fuera del lock)
+        api_pool = _create_api_pool(host, username, password, port)
+        api = api_pool.get_api()
+        with self._lock:
+            self._stats["created"] += 1
+        logger.debug(f"[RouterSessionPool] New session for {host}:{port}")
+        return RouterSession(key=key, password=password, api_pool=api_pool, api=api)
+
+    def checkin(self, session: RouterSession, broken: bool = False) -> None:
+        if broken:
+            self._close(session, "discarded")
+            return
+
+        session.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(session.key, [])
+            if len(idle) < self._max_idle:
+                idle.append(session)
+                return
+        self._close(session, None)
+
+    @contextmanager
+    def session(self, host: str, username: str, password: str, port: int = 8729):
+        """Context manager: entrega un RouterOsApi y lo devuelve al pool al salir."""
+        session = self.checkout(host, username, password, port)
+        broken = False
+        try:
+            yield session.api
+        except Exception as e:
+            broken = is_connection_error(e)
+            raise
+        finally:
+            self.checkin(session, broken=broken)
+
+    def drain(self, host: str | None = None, port: int | None = None, username: str | None = None):
+        """Cierra las sesiones idle que coincidan (todas si host es None)."""
+        with self._lock:
+            keys = [
+                key
+                for key in self._idle
+                if (host is None or key[0] == host)
+                and (port is None or key[1] == port)
+                and (username is None or key[2] == username)
+            ]
+            sessions = [s for key in keys for s in self._idle.pop(key)]
+        for session in sessions:
+            session.close()
+
+    def evict_idle(self) -> int:
+        """Cierra sesiones idle expiradas. Devuelve cuántas se cerraron."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._last_sweep = now
+            for key in list(self._idle):
+                keep = []
+                for session in self._idle[key]:
+                    if self._is_expired(session, now):
+                        expired.append(session)
+                    else:
+                        keep.append(session)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            self._stats["evicted_idle"] += len(expired)
+        for session in expired:
+            session.close()
+        if expired:
+            logger.debug(f"[RouterSessionPool] Evicted {len(expired)} idle sessions")
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "hosts": len(self._idle),
+                "idle_sessions": sum(len(v) for v in self._idle.values()),
+            }
+
+    # --- Internos ---
+
+    @staticmethod
+    def _is_expired(session: RouterSession, now: float) -> bool:
+        return (
+            now - session.last_used >= SESSION_IDLE_TIMEOUT
+            or now - session.created_at >= SESSION_MAX_AGE
+        )
+
+    @staticmethod
+    def _probe(session: RouterSession) -> bool:
+        """Sondeo barato: /system/identity (una sola fila)."""
+        try:
+            session.api.get_resource("/system/identity").get()
+            return True
+        except Exception as e:
+            logger.debug(f"[RouterSessionPool] Probe failed for {session.key[0]}: {e}")
+            return False
+
+    def _close(self, session: RouterSession, reason: str | None) -> None:
+        if reason:
+            with self._lock:
+                self._stats[reason] += 1
+        session.close()
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL:
+            self.evict_idle()
+
+
+# Singleton
+session_pool = RouterSessionPool()
+
 
 def get_pool(
     host: str, username: str, password: str, port: int = 8729, force_new: bool = False
@@ -28,20 +271,7 @@ def get_pool(
     cache_key = (host, port, username)
 
     if force_new or cache_key not in _pool_cache:
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        new_pool = RouterOsApiPool(
-            host,
-            username=username,
-            password=password,
-            port=port,
-            use_ssl=True,
-            ssl_context=ssl_context,
-            plaintext_login=True,
-        )
-        new_pool.set_timeout(30)
+        new_pool = _create_api_pool(host, username, password, port)
 
         if force_new:
             return new_pool
@@ -115,6 +345,7 @@ def remove_pool(host: str, port: int = 8729, username: str = None):
         and (port is None or key[1] == port)
         and (username is None or key[2] == username)
     ]
+    session_pool.drain(host, port, username)
     for key in keys_to_remove:
         try:
             _pool_cache[key].disconnect()
@@ -134,4 +365,5 @@ def clear_all_pools():
         except Exception:
             pass
     _pool_cache.clear()
+    session_pool.drain()
     logger.debug("[MikroTik] All connection pools cleared")
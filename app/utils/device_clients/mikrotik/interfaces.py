@@ -5,11 +5,14 @@ from routeros_api.api import RouterOsApi
 
 logger = logging.getLogger(__name__)
 from .base import get_id
+from .capabilities import capability_cache, detect_capabilities
 
 
 class MikrotikInterfaceManager:
-    def __init__(self, api: RouterOsApi):
+    def __init__(self, api: RouterOsApi, host: str | None = None):
         self.api = api
+        # Con host, la detección del paquete inalámbrico se cachea (capabilities)
+        self.host = host
 
     def get_wireless_interfaces(self) -> tuple[list[dict[str, Any]], str | None]:
         """
@@ -20,28 +23,43 @@ class MikrotikInterfaceManager:
         - 'wifi': New wifi package (RouterOS 7.13+)
         - 'wifiwave2': Wave2 package (RouterOS 7.x)
 
+        If the manager has a host, the detected package is cached per host and
+        later calls only read the known path (re-detected on error or when the
+        RouterOS version changes). A "no wireless" result is only cached for
+        CAPABILITY_NO_WIRELESS_TTL seconds.
+
         Returns:
             Tuple of (list_of_interfaces, detected_type).
             detected_type can be: 'wireless', 'wifi', 'wifiwave2', or None if no wireless.
         """
-        wireless_paths = [
-            ("/interface/wireless", "wireless"),
-            ("/interface/wifi", "wifi"),
-            ("/interface/wifiwave2", "wifiwave2"),
-        ]
-
-        for path, wtype in wireless_paths:
-            try:
-                result = self.api.get_resource(path).get()
-                if result:  # Has at least one interface of this type
-                    logger.debug(f"Detected wireless type '{wtype}' with {len(result)} interfaces")
-                    return result, wtype
-            except Exception:
-                # This path doesn't exist or isn't accessible on this device
-                continue
-
-        logger.debug("No wireless interfaces detected on this device")
-        return [], None
+        if self.host:
+            caps = capability_cache.get(self.host)
+            if caps is not None:
+                if caps.interface_path is None:
+                    return [], None
+                try:
+                    return self.api.get_resource(caps.interface_path).get(), caps.wireless_type
+                except Exception as e:
+                    logger.debug(f"Cached wireless path failed on {self.host}, re-detecting: {e}")
+                    capability_cache.invalidate(self.host)
+
+        try:
+            caps, interfaces = detect_capabilities(self.api)
+        except Exception as e:
+            # Device not reachable or paths not accessible
+            logger.debug(f"Wireless detection failed: {e}")
+            return [], None
+
+        if self.host:
+            capability_cache.put(self.host, caps)
+
+        if caps.wireless_type:
+            logger.debug(
+                f"Detected wireless type '{caps.wireless_type}' with {len(interfaces)} interfaces"
+            )
+        else:
+            logger.debug("No wireless interfaces detected on this device")
+        return interfaces, caps.wireless_type
 
     def get_wireless_interface_path(self, wireless_type: str | None) -> str | None:
         """
@@ -267,3 +267,19 @@ def parse_snr(snr_str: str | None) -> int | None:
         return int(str(snr_str).strip())
     except (ValueError, TypeError):
         return None
+
+
+def parse_ros_major(version_str: str | None) -> int | None:
+    """
+    Parse the RouterOS major version.
+
+    Args:
+        version_str: Version string (e.g., "7.15.3 (stable)", "6.49.10").
+
+    Returns:
+        Major version as integer (e.g., 7), or None.
+    """
+    if not version_str:
+        return None
+    match = re.match(r"\s*(\d+)\.", str(version_str))
+    return int(match.group(1)) if match else None
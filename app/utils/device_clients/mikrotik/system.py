@@ -5,6 +5,7 @@ from typing import Any
 from routeros_api.api import RouterOsApi
 
 from .base import get_id
+from .batch import print_cmd, run_batch
 
 
 def provision_router_api_ssl(
@@ -70,13 +71,28 @@ def provision_router_api_ssl(
         return {"status": "error", "message": f"Error interno: {e}"}
 
 
+# Comandos de get_system_resources, enviados en un solo round-trip
+SYSTEM_RESOURCES_BATCH = [
+    print_cmd("/system/resource"),
+    print_cmd("/system/identity"),
+    print_cmd("/system/routerboard", optional=True),  # CHR/x86 no tienen routerboard
+    print_cmd("/system/license", optional=True),
+    print_cmd("/system/health", optional=True),
+]
+
+
 def get_system_resources(api: RouterOsApi) -> dict[str, Any]:
-    resource_info = api.get_resource("/system/resource").get()
-    identity_info = api.get_resource("/system/identity").get()
-    routerboard_info = api.get_resource("/system/routerboard").get()
-    license_info = api.get_resource("/system/license").get()
-    health_info = api.get_resource("/system/health").get()
+    return parse_system_resources(*run_batch(api, SYSTEM_RESOURCES_BATCH))
+
 
+def parse_system_resources(
+    resource_info: list[dict[str, Any]],
+    identity_info: list[dict[str, Any]],
+    routerboard_info: list[dict[str, Any]] | None = None,
+    license_info: list[dict[str, Any]] | None = None,
+    health_info: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Normaliza las filas de SYSTEM_RESOURCES_BATCH (las opcionales pueden faltar)."""
     data = {}
 
     # From /system/resource
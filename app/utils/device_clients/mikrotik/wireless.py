@@ -3,52 +3,93 @@ from typing import Any
 
 from routeros_api.api import RouterOsApi
 
-from . import ip as mikrotik_ip
-
 # Import shared parsers and interfaces
 from . import parsers as mikrotik_parsers
+from . import system as mikrotik_system
+from .batch import BatchCommand, FailedRows, print_cmd, run_batch
+from .capabilities import WIRELESS_PATHS, capability_cache
+from .client_index import client_index
 from .interfaces import MikrotikInterfaceManager
 
 logger = logging.getLogger(__name__)
 
+# Sistema para el status de un AP (sin license/health, que el AP no usa)
+AP_SYSTEM_BATCH = [
+    print_cmd("/system/resource"),
+    print_cmd("/system/identity"),
+    print_cmd("/system/routerboard", optional=True),
+]
+
 # --- Wireless Connection & Status Management ---
 
 
-def get_wireless_type(api: RouterOsApi) -> str | None:
+def get_wireless_type(api: RouterOsApi, host: str | None = None) -> str | None:
     """
     Detects the type of wireless package installed (wireless vs wifi/wifiwave2).
-    Uses the InterfaceManager for detection.
+    Uses the InterfaceManager for detection (cached per host when given).
     """
-    manager = MikrotikInterfaceManager(api)
+    manager = MikrotikInterfaceManager(api, host)
     _, wtype = manager.get_wireless_interfaces()
     return wtype
 
 
-def get_wireless_interfaces_detailed(api: RouterOsApi) -> list[dict[str, Any]]:
+def get_wireless_interfaces_detailed(
+    api: RouterOsApi, host: str | None = None
+) -> list[dict[str, Any]]:
     """
     Returns a normalized list of wireless interfaces with details (frequency, band, etc.).
     Handles both legacy 'wireless' and new 'wifi' packages.
     """
-    manager = MikrotikInterfaceManager(api)
+    manager = MikrotikInterfaceManager(api, host)
     raw_interfaces, wtype = manager.get_wireless_interfaces()
 
     if not wtype:
         return []
 
-    detailed_interfaces = []
+    monitor_cmds = _monitor_commands(raw_interfaces, wtype)
+    monitor_rows = run_batch(api, monitor_cmds) if monitor_cmds else []
+    return build_wireless_interfaces(raw_interfaces, wtype, _monitor_map(monitor_cmds, monitor_rows))
 
-    # helper for monitor commands
-    def _get_monitor_data(path: str, iface_name: str) -> dict[str, Any]:
-        try:
-            res = api.get_resource(path).call("monitor", {"numbers": iface_name, "once": ""})
-            return res[0] if res else {}
-        except Exception:
-            return {}
 
-    resource_path = manager.get_wireless_interface_path(wtype)
+def _interface_name(iface: dict[str, Any]) -> str | None:
+    return iface.get("name") or iface.get("default-name")
+
+
+def _monitor_commands(raw_interfaces: list[dict[str, Any]], wtype: str | None) -> list[BatchCommand]:
+    """`monitor once` por interfaz (solo wifi/wifiwave2: frecuencia real y tx-power)."""
+    if wtype not in ["wifi", "wifiwave2"]:
+        return []
+    path = WIRELESS_PATHS[wtype]
+    return [
+        BatchCommand(path, "monitor", {"numbers": name, "once": ""}, optional=True)
+        for name in filter(None, map(_interface_name, raw_interfaces))
+    ]
+
+
+def _monitor_map(commands: list[BatchCommand], rows: list[list[dict]]) -> dict[str, dict[str, Any]]:
+    return {cmd.arguments["numbers"]: (res[0] if res else {}) for cmd, res in zip(commands, rows)}
+
+
+def build_wireless_interfaces(
+    raw_interfaces: list[dict[str, Any]],
+    wtype: str | None,
+    monitor_map: dict[str, dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """
+    Normaliza las interfaces inalámbricas a partir de datos ya descargados.
+
+    Args:
+        raw_interfaces: Filas de /interface/<wireless|wifi|wifiwave2>.
+        wtype: Paquete detectado.
+        monitor_map: nombre -> fila de `monitor once` (wifi/wifiwave2).
+    """
+    if not wtype:
+        return []
+
+    detailed_interfaces = []
 
     for iface in raw_interfaces:
-        name = iface.get("name") or iface.get("default-name")
+        name = _interface_name(iface)
         if not name:
             continue
 
@@ -75,7 +116,7 @@ def get_wireless_interfaces_detailed(api: RouterOsApi) -> list[dict[str, Any]]:
                     band = "2ghz"
 
             # Get real-time data from monitor
-            mon_data = _get_monitor_data(resource_path, name)
+            mon_data = monitor_map.get(name, {})
             if mon_data:
                 # Parse channel string "5220/ax/eeCe"
                 channel_info = mon_data.get("channel", "")
@@ -146,7 +187,9 @@ def get_wireless_interfaces_detailed(api: RouterOsApi) -> list[dict[str, Any]]:
     return detailed_interfaces
 
 
-def get_connected_clients(api: RouterOsApi, fetch_arp: bool = True) -> list[dict[str, Any]]:
+def get_connected_clients(
+    api: RouterOsApi, fetch_arp: bool = True, host: str | None = None
+) -> list[dict[str, Any]]:
     """
     Returns a unified list of connected clients (CPEs) with parsed statistics.
     Handles legacy and modern wireless packages transparently.
@@ -156,14 +199,14 @@ def get_connected_clients(api: RouterOsApi, fetch_arp: bool = True) -> list[dict
         api: RouterOS API connection.
         fetch_arp: If True, fetches ARP table to enrich hostname/IP. Default True.
                    Set to False for lightweight polling where names come from DB.
+        host: Device host; enables the per-host wireless capability cache.
     """
-    manager = MikrotikInterfaceManager(api)
+    manager = MikrotikInterfaceManager(api, host)
     # Detect type first
     _, wtype = manager.get_wireless_interfaces()
     if not wtype:
         return []
 
-
     reg_path = manager.get_registration_table_path(wtype)
     if not reg_path:
         return []
@@ -171,7 +214,7 @@ def get_connected_clients(api: RouterOsApi, fetch_arp: bool = True) -> list[dict
     # Build interface map for backfilling SSID/band on legacy devices
     interface_map: dict[str, dict[str, Any]] = {}
     try:
-        detailed_interfaces = get_wireless_interfaces_detailed(api)
+        detailed_interfaces = get_wireless_interfaces_detailed(api, host)
         interface_map = {iface["name"]: iface for iface in detailed_interfaces}
     except Exception as e:
         logger.warning(f"Failed to get detailed interface info for backfill: {e}")
@@ -187,29 +230,33 @@ def get_connected_clients(api: RouterOsApi, fetch_arp: bool = True) -> list[dict
         except Exception:
             return []
 
-    # Fetch ARP table for enrichment (only if fetch_arp=True)
+    # Fetch ARP/DHCP for enrichment (only if fetch_arp=True). Full resync of the
+    # per-host index, limited to the columns we use (.proplist)
     arp_map = {}
     dhcp_map = {}
     if fetch_arp:
-        try:
-            arp_entries = mikrotik_ip.get_arp_entries(api)
-            for entry in arp_entries:
-                if mac := entry.get("mac-address"):
-                    # Normalize MAC to uppercase for consistent matching
-                    arp_map[mac.upper()] = entry
-        except Exception as e:
-            logger.warning(f"Failed to fetch ARP table for enrichment: {e}")
-        
-        # Fetch DHCP leases for hostname (especially useful for v6)
-        try:
-            dhcp_leases = mikrotik_ip.get_dhcp_leases(api)
-            for lease in dhcp_leases:
-                if mac := lease.get("mac-address"):
-                    # Normalize MAC to uppercase for consistent matching
-                    dhcp_map[mac.upper()] = lease
-        except Exception as e:
-            logger.warning(f"Failed to fetch DHCP leases for enrichment: {e}")
+        macs = [mac for reg in registrations if (mac := reg.get("mac-address"))]
+        commands = client_index.plan(host, macs, force=True)
+        arp_map, dhcp_map = client_index.apply(host, commands, run_batch(api, commands), macs)
+
+    return build_clients(registrations, interface_map, arp_map, dhcp_map)
+
+
+def build_clients(
+    registrations: list[dict[str, Any]],
+    interface_map: dict[str, dict[str, Any]],
+    arp_map: dict[str, dict[str, Any]],
+    dhcp_map: dict[str, dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """
+    Convierte filas del registration-table en clientes normalizados.
 
+    Args:
+        registrations: Filas de `registration-table print stats`.
+        interface_map: nombre -> interfaz detallada (backfill de SSID/band en v6).
+        arp_map / dhcp_map: MAC (mayúsculas) -> entrada, para IP y hostname
+            (dicts del client_index: búsqueda O(1) por MAC).
+    """
     clients = []
     for reg in registrations:
         # Parse fields using the shared parser module
@@ -317,22 +364,32 @@ def get_connected_clients(api: RouterOsApi, fetch_arp: bool = True) -> list[dict
     return clients
 
 
-def get_aggregate_interface_stats(api: RouterOsApi) -> dict[str, int]:
+def get_aggregate_interface_stats(api: RouterOsApi, host: str | None = None) -> dict[str, int]:
     """
     Calculates total TX/RX bytes from physical wireless interfaces.
     Returns: {"tx_bytes": int, "rx_bytes": int, "tx_throughput": int, "rx_throughput": int}
     """
-    manager = MikrotikInterfaceManager(api)
+    manager = MikrotikInterfaceManager(api, host)
     raw_interfaces, wtype = manager.get_wireless_interfaces()
 
-    total_tx = 0
-    total_rx = 0
-    total_tx_speed = 0
-    total_rx_speed = 0
-
     if not wtype:
-        return {"tx_bytes": 0, "rx_bytes": 0, "tx_throughput": 0, "rx_throughput": 0}
-
+        return build_aggregate_stats([], [], [])
+
+    names = _traffic_interfaces(raw_interfaces)
+    commands = [BatchCommand("/interface", "print", {"stats": ""}, optional=True)]
+    if names:
+        commands.append(_monitor_traffic_command(names))
+    interface_stats, *traffic = run_batch(api, commands)
+    traffic = traffic[0] if traffic else []
+    if isinstance(interface_stats, FailedRows):
+        logger.warning(f"Failed to get interface stats: {interface_stats.error}")
+    if isinstance(traffic, FailedRows):
+        logger.warning(f"Failed to monitor traffic for {names}: {traffic.error}")
+    return build_aggregate_stats(names, interface_stats, traffic)
+
+
+def _traffic_interfaces(raw_interfaces: list[dict[str, Any]]) -> list[str]:
+    """Interfaces físicas cuyo tráfico se suma en las estadísticas agregadas."""
     # Helper: Check if interface is a physical master (simplistic check for wifi1, wlan1 etc)
     # or check if it has no master.
     physical_interfaces = []
@@ -358,41 +415,47 @@ def get_aggregate_interface_stats(api: RouterOsApi) -> dict[str, int]:
 
     # If no standard names found, use all found wireless
     if not filtered_interfaces:
-        filtered_interfaces = [i.get("name") for i in raw_interfaces]
+        filtered_interfaces = [i.get("name") for i in raw_interfaces if i.get("name")]
+    return filtered_interfaces
 
-    # Batch get stats
-    try:
-        all_stats = api.get_resource("/interface").call("print", {"stats": ""})
-        for stat in all_stats:
-            if stat.get("name") in filtered_interfaces:
-                t = mikrotik_parsers.parse_int(stat.get("tx-byte"))
-                r = mikrotik_parsers.parse_int(stat.get("rx-byte"))
-                if t:
-                    total_tx += t
-                if r:
-                    total_rx += r
-
-                # Traffic monitor is separate command usually, but 'stats' print might have packet rates but NOT current bits/sec.
-                # Current bits/sec usually requires /interface/monitor-traffic or is in 'print stats' in newer versions?
-                # 'print stats' usually has cumulative bytes.
-                # 'monitor-traffic' is needed for live throughput.
-    except Exception as e:
-        logger.warning(f"Failed to get interface stats: {e}")
 
-    # Monitor traffic for throughput (expensive if many interfaces, but accurate)
-    for iface_name in filtered_interfaces:
-        try:
-            res = api.get_resource("/interface").call(
-                "monitor-traffic", {"interface": iface_name, "once": ""}
-            )
-            if res:
-                data = res[0]
-                tx_bps = mikrotik_parsers.parse_throughput_bps(data.get("tx-bits-per-second")) or 0
-                rx_bps = mikrotik_parsers.parse_throughput_bps(data.get("rx-bits-per-second")) or 0
-                total_tx_speed += tx_bps
-                total_rx_speed += rx_bps
-        except Exception as e:
-            logger.warning(f"Failed to monitor traffic for {iface_name}: {e}")
+def _monitor_traffic_command(names: list[str]) -> BatchCommand:
+    # Un solo monitor-traffic para todas las interfaces: devuelve una fila por interfaz
+    return BatchCommand(
+        "/interface", "monitor-traffic", {"interface": ",".join(names), "once": ""}, optional=True
+    )
+
+
+def build_aggregate_stats(
+    names: list[str],
+    interface_stats: list[dict[str, Any]],
+    traffic: list[dict[str, Any]],
+) -> dict[str, int]:
+    """
+    Suma bytes (de `/interface print stats`) y throughput (de monitor-traffic)
+    de las interfaces indicadas.
+    """
+    total_tx = 0
+    total_rx = 0
+    total_tx_speed = 0
+    total_rx_speed = 0
+
+    for stat in interface_stats:
+        if stat.get("name") in names:
+            t = mikrotik_parsers.parse_int(stat.get("tx-byte"))
+            r = mikrotik_parsers.parse_int(stat.get("rx-byte"))
+            if t:
+                total_tx += t
+            if r:
+                total_rx += r
+
+    # 'print stats' only has cumulative bytes; live throughput comes from monitor-traffic
+    # (already limited to `names`)
+    for data in traffic:
+        tx_bps = mikrotik_parsers.parse_throughput_bps(data.get("tx-bits-per-second")) or 0
+        rx_bps = mikrotik_parsers.parse_throughput_bps(data.get("rx-bits-per-second")) or 0
+        total_tx_speed += tx_bps
+        total_rx_speed += rx_bps
 
     return {
         "tx_bytes": total_tx,
@@ -400,3 +463,104 @@ def get_aggregate_interface_stats(api: RouterOsApi) -> dict[str, int]:
         "tx_throughput": int(total_tx_speed),
         "rx_throughput": int(total_rx_speed),
     }
+
+
+# --- Single-pass AP status ---
+
+
+def collect_ap_status(api: RouterOsApi, host: str | None = None) -> dict[str, Any]:
+    """
+    Recolecta en una sola pasada todo lo que necesita el status de un AP.
+
+    Cada recurso se pide como mucho una vez, en dos round-trips pipelined:
+      1. sistema + interfaces inalámbricas + registration-table + /interface stats
+      2. `monitor once` por interfaz wifi + un monitor-traffic para todas
+         + búsqueda de MACs nuevas en el índice ARP/DHCP (client_index)
+
+    Returns:
+        Dict con: system, wireless_type, interfaces (detalladas), stats,
+        clients e interface_rows (filas de /interface, para el MAC de fallback).
+    """
+    caps = capability_cache.get(host) if host else None
+    raw_interfaces = None
+    if caps is not None:
+        wtype = caps.wireless_type
+    else:
+        # Primera vez (o tras invalidar): detección en su propio lote
+        raw_interfaces, wtype = MikrotikInterfaceManager(api, host).get_wireless_interfaces()
+
+    iface_path = WIRELESS_PATHS.get(wtype)
+    reg_path = f"{iface_path}/registration-table" if iface_path else None
+
+    # --- Pasada 1 ---
+    commands = AP_SYSTEM_BATCH + [BatchCommand("/interface", "print", {"stats": ""}, optional=True)]
+    if iface_path:
+        if raw_interfaces is None:
+            commands.append(print_cmd(iface_path, optional=True))
+        # With stats: needed for ROS7 wifi throughput
+        commands.append(BatchCommand(reg_path, "print", {"stats": ""}, optional=True))
+
+    resource, identity, routerboard, interface_rows, *rest = run_batch(api, commands)
+    system_data = mikrotik_system.parse_system_resources(resource, identity, routerboard)
+    if host:
+        capability_cache.observe_version(host, system_data.get("version"))
+
+    registrations = []
+    if iface_path:
+        if raw_interfaces is None:
+            raw_interfaces = rest.pop(0)
+            if isinstance(raw_interfaces, FailedRows):
+                # El path cacheado ya no responde: re-detectar en el próximo poll
+                logger.debug(f"Cached wireless path failed on {host}: {raw_interfaces.error}")
+                capability_cache.invalidate(host)
+        registrations = rest.pop(0)
+    raw_interfaces = raw_interfaces or []
+
+    result = {
+        "system": system_data,
+        "wireless_type": wtype,
+        "interfaces": [],
+        "stats": build_aggregate_stats([], [], []),
+        "clients": [],
+        "interface_rows": interface_rows,
+    }
+    if not wtype:
+        return result
+
+    # --- Pasada 2 ---
+    monitor_cmds = _monitor_commands(raw_interfaces, wtype)
+    traffic_names = _traffic_interfaces(raw_interfaces)
+    commands = list(monitor_cmds)
+    if traffic_names:
+        commands.append(_monitor_traffic_command(traffic_names))
+    refetch_registrations = isinstance(registrations, FailedRows)
+    if refetch_registrations:
+        # Fallback to simple print if print stats fails
+        commands.append(print_cmd(reg_path, optional=True))
+
+    # Enrichment: only MACs not yet in the per-host index (full resync on its own schedule)
+    macs = [mac for reg in registrations if (mac := reg.get("mac-address"))]
+    index_cmds = client_index.plan(host, macs) if macs else []
+    commands += index_cmds
+
+    rows = run_batch(api, commands) if commands else []
+    monitor_rows, rest = rows[: len(monitor_cmds)], rows[len(monitor_cmds) :]
+    traffic = rest.pop(0) if traffic_names else []
+    if refetch_registrations:
+        # Las MACs solo se conocen ahora: búsqueda en un round-trip extra
+        registrations = rest.pop(0)
+        macs = [mac for reg in registrations if (mac := reg.get("mac-address"))]
+        index_cmds = client_index.plan(host, macs) if macs else []
+        rest = run_batch(api, index_cmds) if index_cmds else []
+    arp_map, dhcp_map = client_index.apply(host, index_cmds, rest, macs)
+
+    interfaces = build_wireless_interfaces(
+        raw_interfaces, wtype, _monitor_map(monitor_cmds, monitor_rows)
+    )
+    interface_map = {iface["name"]: iface for iface in interfaces}
+
+    result["interfaces"] = interfaces
+    result["stats"] = build_aggregate_stats(traffic_names, interface_rows, traffic)
+    result["clients"] = build_clients(registrations, interface_map, arp_map, dhcp_map)
+    return result
+
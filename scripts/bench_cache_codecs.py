@@ -0,0 +1,191 @@
+"""
+Benchmark de los codecs de RedictStore con payloads de ap_stats/router_stats.
+
+Mide tamaño y tiempo de encode/decode de cada codec disponible frente a
+JSON y comprueba que el valor vuelve igual. Con --url compara además
+set_async/get_async por key contra mset_async/mget_async en un Redict real.
+
+Uso:
+    python scripts/bench_cache_codecs.py
+    python scripts/bench_cache_codecs.py --clients 250 --url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+
+def ap_payload(host: str, clients: int) -> dict:
+    """Misma forma que APConnector._status_to_stats."""
+    rnd = random.Random(host)
+    return {
+        "host": host,
+        "hostname": f"AP-{host}",
+        "model": "LiteBeam 5AC Gen2",
+        "mac": "F4:92:BF:00:00:01",
+        "firmware": "WA.v8.7.11",
+        "vendor": "ubiquiti",
+        "client_count": clients,
+        "noise_floor": -92,
+        "chanbw": 40,
+        "frequency": 5745,
+        "essid": "WISP-SECTOR-1",
+        "total_tx_bytes": rnd.randrange(10**12),
+        "total_rx_bytes": rnd.randrange(10**12),
+        "total_throughput_tx": rnd.randrange(10**6),
+        "total_throughput_rx": rnd.randrange(10**6),
+        "airtime_total_usage": 41.5,
+        "airtime_tx_usage": 22.1,
+        "airtime_rx_usage": 19.4,
+        "clients": [
+            {
+                "mac": f"AA:BB:CC:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+                "hostname": f"cpe-{i}",
+                "ip_address": f"10.20.{i // 250}.{i % 250 + 2}",
+                "signal": -rnd.randint(45, 80),
+                "signal_chain0": -rnd.randint(45, 80),
+                "signal_chain1": -rnd.randint(45, 80),
+                "noisefloor": -92,
+                "tx_rate": rnd.choice([144.4, 300.0, 433.3, 866.7]),
+                "rx_rate": rnd.choice([144.4, 300.0, 433.3, 866.7]),
+                "ccq": rnd.randint(60, 100),
+                "tx_bytes": rnd.randrange(10**11),
+                "rx_bytes": rnd.randrange(10**11),
+                "tx_throughput_kbps": rnd.randrange(50000),
+                "rx_throughput_kbps": rnd.randrange(50000),
+                "extra": {"distance": rnd.randint(100, 9000), "lastip": None, "uptime": rnd.randrange(10**6)},
+            }
+            for i in range(clients)
+        ],
+        "extra": {
+            "cpu_load": 7,
+            "free_memory": 38000,
+            "total_memory": 128000,
+            "uptime": "12d 4h 3m",
+            "platform": "LiteBeam",
+            "wireless_type": "ac",
+        },
+        "interfaces": [{"name": f"ath{i}", "running": True, "mtu": 1500} for i in range(4)],
+        "timestamp": datetime(2026, 10, 16, 12, 0, 0).isoformat(),
+    }
+
+
+def router_payload(host: str) -> dict:
+    return {
+        "host": host,
+        "name": "CORE-01",
+        "board-name": "CCR2004-1G-12S+2XS",
+        "version": "7.16.1 (stable)",
+        "uptime": "3w2d04:11:09",
+        "cpu-load": "12",
+        "free-memory": "3456212992",
+        "total-memory": "4294967296",
+        "free-hdd-space": "98234368",
+        "total-hdd-space": "134217728",
+        "voltage": "24.1",
+        "temperature": "47",
+        "cpu-temperature": "52",
+        "cpu-count": "4",
+        "cpu-frequency": "1700",
+        "architecture-name": "arm64",
+    }
+
+
+def bench(codecs_mod, codec, payload, rounds: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        data = codec.encode(payload)
+    encode_us = (time.perf_counter() - started) / rounds * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        value = codecs_mod.decode(data)
+    decode_us = (time.perf_counter() - started) / rounds * 1e6
+    return {"size": len(data), "encode_us": encode_us, "decode_us": decode_us, "ok": value == payload}
+
+
+def run_codecs(clients: int, rounds: int) -> bool:
+    from app.utils.cache import codecs
+
+    payloads = {
+        f"ap_stats ({clients} clientes)": ap_payload("10.0.0.10", clients),
+        "router_stats": router_payload("10.0.0.1"),
+    }
+    ok = True
+    for label, payload in payloads.items():
+        print(f"\n{label}")
+        baseline = None
+        for name in ("json", "orjson", "msgpack"):
+            if not codecs._AVAILABLE[name]:
+                print(f"  {name:<8} (no instalado)")
+                continue
+            r = bench(codecs, codecs.get_codec(name), payload, rounds)
+            baseline = baseline or r
+            ok &= r["ok"]
+            print(
+                f"  {'✅' if r['ok'] else '❌'} {name:<8} {r['size']:>7} B ({r['size'] / baseline['size']:.0%})"
+                f"  encode {r['encode_us']:>7.1f}µs  decode {r['decode_us']:>7.1f}µs"
+                f"  ({(baseline['encode_us'] + baseline['decode_us']) / (r['encode_us'] + r['decode_us']):.1f}x)"
+            )
+    return ok
+
+
+async def run_redict(url: str, clients: int, hosts: int) -> bool:
+    from app.utils.cache.redict_store import RedictStore, redict_manager
+
+    if not await redict_manager.connect(url):
+        print(f"❌ No se pudo conectar a {url}")
+        return False
+
+    items = {f"10.0.{i // 250}.{i % 250 + 2}": ap_payload(f"h{i}", clients) for i in range(hosts)}
+    ok = True
+    try:
+        for codec in ("json", "msgpack"):
+            store = RedictStore(f"bench_{codec}", default_ttl=60, codec=codec)
+            started = time.perf_counter()
+            for key, value in items.items():
+                await store.set_async(key, value)
+            single = [await store.get_async(key) for key in items]
+            per_key_ms = (time.perf_counter() - started) * 1000
+
+            await store.clear_async()
+            started = time.perf_counter()
+            await store.mset_async(items)
+            batch = await store.mget_async(list(items))
+            batch_ms = (time.perf_counter() - started) * 1000
+
+            same = single == list(items.values()) and batch == items
+            ok &= same
+            print(
+                f"{'✅' if same else '❌'} {codec:<8} {hosts} hosts: por key {per_key_ms:.1f}ms, "
+                f"mset/mget {batch_ms:.1f}ms"
+            )
+            await store.clear_async()
+    finally:
+        await redict_manager.disconnect()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of cache codecs and Redict batching")
+    parser.add_argument("--clients", type=int, default=120, help="CPEs per AP payload")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--url", help="Redict URL for the round-trip benchmark (optional)")
+    parser.add_argument("--hosts", type=int, default=200)
+    args = parser.parse_args()
+
+    ok = run_codecs(args.clients, args.rounds)
+    if args.url:
+        print()
+        ok &= asyncio.run(run_redict(args.url, args.clients, args.hosts))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Regresión del AsyncAirOSSessionCache: una key que vuelve a pedirse después de
+expirar (TTL de inactividad o barrido) o de ser expulsada por la LRU debe
+devolver una sesión ligada al transporte, capaz de autenticarse.
+
+No necesita un AP: authenticate() contra un puerto cerrado debe devolver
+False (error de conexión), no fallar con un cliente sin ligar.
+
+Uso:
+    python scripts/check_airos_sessions.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+UNREACHABLE = "https://127.0.0.1:9"
+
+
+async def run() -> bool:
+    from app.utils.device_clients.airos_session import AsyncAirOSSessionCache
+
+    ok = True
+
+    async def check(label: str, session) -> None:
+        nonlocal ok
+        try:
+            bound = session._client is not None and await session.authenticate() is False
+        except Exception as e:
+            bound = False
+            label += f" ({type(e).__name__}: {e})"
+        ok &= bound
+        print(f"{'✅' if bound else '❌'} {label}")
+
+    cache = AsyncAirOSSessionCache(max_size=1, idle_ttl=0.05)
+    first = cache.get(UNREACHABLE, "ubnt", "ubnt")
+    await check("new session", first)
+
+    await asyncio.sleep(0.1)
+    again = cache.get(UNREACHABLE, "ubnt", "ubnt")
+    await check("re-fetch after idle expiry", again)
+
+    await asyncio.sleep(0.1)
+    cache._last_sweep = time.monotonic() - 3600  # fuerza el barrido
+    cache.get(f"{UNREACHABLE}/other", "ubnt", "ubnt")
+    swept = cache.get(UNREACHABLE, "ubnt", "ubnt")
+    await check("re-fetch after sweep", swept)
+
+    cache.idle_ttl = 3600
+    cache.get(f"{UNREACHABLE}/evictor", "ubnt", "ubnt")  # max_size=1: expulsa la anterior
+    evicted = cache.get(UNREACHABLE, "ubnt", "ubnt")
+    await check("re-fetch after LRU eviction", evicted)
+
+    await cache.close_transport()
+    rebound = cache.get(UNREACHABLE, "ubnt", "ubnt")
+    await check("re-fetch after close_transport", rebound)
+    await cache.close_transport()
+    return ok
+
+
+def main():
+    ok = asyncio.run(run())
+    print("🎉 Sessions rebind correctly!" if ok else "Unbound session detected")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
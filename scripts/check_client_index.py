@@ -0,0 +1,133 @@
+"""
+Regresión del índice ARP/DHCP por AP (client_index) en collect_ap_status.
+
+Simula con un API falso en memoria un AP RouterOS 7 (paquete wifi) cuyo
+`registration-table print stats` falla, así que cada poll usa el print simple
+de fallback. Comprueba que:
+
+- una estación nueva entre resincronizaciones se busca y recibe IP/hostname;
+- una MAC sin lease todavía no se vuelve a buscar dentro de
+  CLIENT_INDEX_MISS_TTL, pero sí después, y entonces se resuelve;
+- una MAC que ninguna consulta buscó no queda marcada como fallo.
+
+Uso:
+    python scripts/check_client_index.py
+"""
+
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+HOST = "10.0.0.50"
+
+
+class FakeResource:
+    def __init__(self, api, path):
+        self.api, self.path = api, path
+
+    def call(self, command, arguments=None, queries=None, additional_queries=()):
+        arguments = arguments or {}
+        self.api.calls.append((self.path, command, bool(additional_queries)))
+        if self.path.endswith("/registration-table") and "stats" in arguments:
+            raise RuntimeError("no such command")
+        if command != "print":
+            return []
+        rows = self.api.tables.get(self.path, [])
+        if additional_queries:
+            query = additional_queries[0]
+            wanted = {q.value.decode() for q in getattr(query, "others", (query,))}
+            rows = [r for r in rows if r.get("mac-address") in wanted]
+        return [dict(r) for r in rows]
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = []
+        self.tables = {
+            "/system/resource": [{"version": "7.15.3 (stable)", "board-name": "cAP ax"}],
+            "/system/identity": [{"name": "AP-TEST"}],
+            "/interface": [{"name": "wifi1"}],
+            "/interface/wifi": [{"name": "wifi1", "running": "true"}],
+            "/interface/wifi/registration-table": [],
+            "/ip/arp": [],
+            "/ip/dhcp-server/lease": [],
+        }
+
+    def get_resource(self, path):
+        return FakeResource(self, path)
+
+    def associate(self, mac, ip=None, hostname=None):
+        self.tables["/interface/wifi/registration-table"].append({"mac-address": mac, "interface": "wifi1"})
+        if ip:
+            self.lease(mac, ip, hostname)
+
+    def lease(self, mac, ip, hostname=None):
+        self.tables["/ip/dhcp-server/lease"].append({"mac-address": mac, "address": ip, "host-name": hostname})
+
+    def lookups(self):
+        return sum(1 for path, _, filtered in self.calls if path == "/ip/dhcp-server/lease" and filtered)
+
+
+def run() -> bool:
+    from app.utils.device_clients.mikrotik.client_index import client_index
+    from app.utils.device_clients.mikrotik.wireless import collect_ap_status
+
+    ok = True
+
+    def check(label: str, passed: bool) -> None:
+        nonlocal ok
+        ok &= passed
+        print(f"{'✅' if passed else '❌'} {label}")
+
+    def poll(api):
+        api.calls.clear()
+        return {c["mac"]: c for c in collect_ap_status(api, HOST)["clients"]}
+
+    api = FakeApi()
+    api.associate("AA:00:00:00:00:01", "10.20.0.2", "cpe-1")
+    clients = poll(api)
+    check("full resync resolves the first station", clients["AA:00:00:00:00:01"]["ip_address"] == "10.20.0.2")
+
+    api.associate("AA:00:00:00:00:02", "10.20.0.3", "cpe-2")
+    clients = poll(api)
+    check(
+        "station joining between resyncs is looked up (fallback print)",
+        api.lookups() == 1 and clients["AA:00:00:00:00:02"]["ip_address"] == "10.20.0.3",
+    )
+
+    api.associate("AA:00:00:00:00:03")  # asociada antes de tener lease
+    clients = poll(api)
+    check("station without lease yet: looked up, no IP", api.lookups() == 1 and not clients["AA:00:00:00:00:03"]["ip_address"])
+
+    api.lease("AA:00:00:00:00:03", "10.20.0.4", "cpe-3")
+    poll(api)
+    check("miss is not looked up again within CLIENT_INDEX_MISS_TTL", api.lookups() == 0)
+
+    client_index.miss_ttl = 0.05
+    time.sleep(0.1)
+    clients = poll(api)
+    check(
+        "miss is retried after CLIENT_INDEX_MISS_TTL and resolves",
+        api.lookups() == 1 and clients["AA:00:00:00:00:03"]["ip_address"] == "10.20.0.4",
+    )
+
+    # Un apply() sin consultas no debe marcar fallos
+    client_index.miss_ttl = 60
+    commands = client_index.plan("h", [], force=True)
+    client_index.apply("h", commands, [[], []], [])
+    client_index.apply("h", [], [], ["BB"])
+    check("MAC never queried is not recorded as a miss", bool(client_index.plan("h", ["BB"])))
+    return ok
+
+
+def main():
+    ok = run()
+    print("🎉 New stations get resolved!" if ok else "Client index regression detected")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Regresión de N+1 en los listados de clientes.
+
+Crea una base SQLite temporal con clientes, CPEs y servicios, cuenta las
+sentencias SQL de ClientService.get_clients_paginated() / get_all_clients()
+y comprueba que no crecen con el número de clientes. También compara
+cpe_count y billing_day con el cálculo cliente a cliente.
+
+Uso:
+    python scripts/check_client_queries.py
+    python scripts/check_client_queries.py --clients 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+PAGE_QUERIES = 2  # count + página
+ALL_QUERIES = 1
+
+
+def run(url: str, clients: int) -> bool:
+    from sqlalchemy import event
+    from sqlmodel import Session, SQLModel, create_engine, func, select
+
+    from app.models import Client
+    from app.models.cpe import CPE
+    from app.models.service import ClientService as ClientServiceModel
+    from app.services.client_service import ClientService
+
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+
+    base = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        all_clients = [Client(name=f"Cliente {i:05d}", billing_day=1) for i in range(clients)]
+        session.add_all(all_clients)
+        session.flush()
+        for i, client in enumerate(all_clients):
+            for j in range(i % 3):
+                session.add(CPE(mac=f"AA:00:00:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}:{j:02X}", client_id=client.id))
+            for j in range(i % 4):  # el último servicio trae billing_day = j + 10
+                session.add(
+                    ClientServiceModel(
+                        client_id=client.id,
+                        router_host="10.0.0.1",
+                        suspension_method="address_list",
+                        billing_day=j + 10,
+                        created_at=base + timedelta(days=j),
+                    )
+                )
+        session.commit()
+
+    statements = [0]
+    event.listen(
+        engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1)
+    )
+
+    def count(fn):
+        statements[0] = 0
+        started = time.perf_counter()
+        result = fn()
+        return result, statements[0], (time.perf_counter() - started) * 1000
+
+    ok = True
+    with Session(engine) as session:
+        service = ClientService(session)
+
+        for page_size in (10, 100):
+            _, n, ms = count(lambda: service.get_clients_paginated(page=2, page_size=page_size))
+            status = "✅" if n == PAGE_QUERIES else "❌"
+            ok &= n == PAGE_QUERIES
+            print(f"{status} get_clients_paginated(page_size={page_size}): {n} statements, {ms:.1f}ms")
+
+        everything, n, ms = count(service.get_all_clients)
+        status = "✅" if n == ALL_QUERIES and len(everything) == clients else "❌"
+        ok &= n == ALL_QUERIES and len(everything) == clients
+        print(f"{status} get_all_clients(): {len(everything)} clients, {n} statements, {ms:.1f}ms")
+
+        # Mismos valores que la consulta cliente a cliente
+        mismatches = 0
+        for item in everything:
+            cpes = session.exec(select(func.count()).select_from(CPE).where(CPE.client_id == item["id"])).one()
+            latest = session.exec(
+                select(ClientServiceModel)
+                .where(ClientServiceModel.client_id == item["id"])
+                .order_by(ClientServiceModel.created_at.desc())
+                .limit(1)
+            ).first()
+            billing_day = latest.billing_day if latest and latest.billing_day else 1
+            if item["cpe_count"] != cpes or item["billing_day"] != billing_day:
+                mismatches += 1
+        ok &= mismatches == 0
+        print(f"{'✅' if mismatches == 0 else '❌'} cpe_count / billing_day match ({mismatches} mismatches)")
+
+    engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query-count regression for client listings")
+    parser.add_argument("--clients", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = run(f"sqlite:///{os.path.join(tmp, 'clients.sqlite')}", args.clients)
+    print("🎉 Constant query count!" if ok else "N+1 regression detected")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
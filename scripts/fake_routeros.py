@@ -0,0 +1,310 @@
+"""
+Servidor RouterOS API falso (protocolo de sentencias) para pruebas locales.
+
+Responde /login y `print` sobre un árbol de recursos en memoria, respeta
+`.tag`, queries `?key=value` y puede simular latencia o errores. Sirve para
+probar el cliente asyncio (app/utils/device_clients/mikrotik/async_api.py) o
+medir cuántos "routers" aguanta un event loop sin hardware real.
+
+Uso:
+    python scripts/fake_routeros.py --port 8728 --delay 0.05
+    python scripts/fake_routeros.py --selftest
+"""
+
+import argparse
+import asyncio
+import copy
+import itertools
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.utils.device_clients.mikrotik.async_api import (  # noqa: E402
+    AsyncRouterOsApi,
+    AsyncRouterOsError,
+    encode_sentence,
+    parse_attributes,
+    read_sentence,
+)
+from app.utils.device_clients.mikrotik.batch import print_cmd, run_batch_async  # noqa: E402
+
+DEFAULT_RESOURCES = {
+    "/system/resource": [
+        {
+            "uptime": "1w2d3h",
+            "version": "7.15.3 (stable)",
+            "cpu-load": "7",
+            "free-memory": "412000000",
+            "total-memory": "1073741824",
+            "free-hdd-space": "90000000",
+            "total-hdd-space": "134217728",
+            "board-name": "RB5009UG+S+",
+            "platform": "MikroTik",
+        }
+    ],
+    "/system/identity": [{"name": "fake-router"}],
+    "/system/health": [
+        {".id": "*1", "name": "voltage", "value": "24.1", "type": "V"},
+        {".id": "*2", "name": "temperature", "value": "41", "type": "C"},
+    ],
+    "/interface": [
+        {".id": "*1", "name": "ether1", "type": "ether", "running": "true", "disabled": "false"},
+        {".id": "*2", "name": "wlan1", "type": "wlan", "running": "true", "disabled": "false"},
+    ],
+    "/ip/arp": [
+        {".id": "*1", "address": "10.0.0.2", "mac-address": "AA:00:00:00:00:02", "interface": "wlan1"},
+        {".id": "*2", "address": "10.0.0.3", "mac-address": "AA:00:00:00:00:03", "interface": "wlan1"},
+        {".id": "*3", "address": "10.0.0.4", "mac-address": "AA:00:00:00:00:04", "interface": "wlan1"},
+    ],
+}
+
+
+def _matches(row: dict, queries: list[str]) -> bool:
+    """Evalúa las queries de la API (`?k=v`, `?k`, `?#|`, `?#&`, `?#!`) como una pila."""
+    stack = []
+    for word in queries:
+        if word.startswith("?#"):
+            for op in word[2:]:
+                if op == "!":
+                    stack.append(not stack.pop())
+                else:
+                    right, left = stack.pop(), stack.pop()
+                    stack.append(left or right if op == "|" else left and right)
+        elif "=" in word:
+            key, _, value = word[1:].partition("=")
+            stack.append(row.get(key) == value)
+        else:
+            stack.append(word[1:] in row)
+    return all(stack)
+
+
+class FakeRouterOS:
+    """
+    Args:
+        username/password: Credenciales aceptadas por /login.
+        resources: path -> lista de filas (se copia).
+        delay: Latencia simulada por comando (segundos).
+        fail_paths: Paths que responden con !trap.
+    """
+
+    def __init__(
+        self,
+        username: str = "admin",
+        password: str = "admin",
+        resources: dict | None = None,
+        delay: float = 0.0,
+        fail_paths: set[str] | None = None,
+    ):
+        self.username = username
+        self.password = password
+        self.resources = copy.deepcopy(resources or DEFAULT_RESOURCES)
+        self.delay = delay
+        self.fail_paths = fail_paths or set()
+        self.commands = 0
+        self.connections = 0
+        self._ids = itertools.count(100)
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, ssl_context=None) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port, ssl=ssl_context)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        authenticated = False
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                words = await read_sentence(reader)
+                if not words:
+                    continue
+                command = words[0]
+                args, tag = parse_attributes(words[1:])
+                queries = [w for w in words[1:] if w.startswith("?")]
+
+                if command == "/login":
+                    authenticated = (
+                        args.get("name") == self.username and args.get("password") == self.password
+                    )
+                    if authenticated:
+                        await self._send(writer, write_lock, [["!done"]], tag)
+                    else:
+                        await self._send(
+                            writer,
+                            write_lock,
+                            [["!trap", "=message=invalid user name or password (6)"], ["!done"]],
+                            tag,
+                        )
+                    continue
+
+                if not authenticated:
+                    writer.write(encode_sentence(["!fatal", "not logged in"]))
+                    await writer.drain()
+                    break
+
+                # Cada comando se responde en su propia tarea: respuestas intercaladas por tag
+                task = asyncio.create_task(
+                    self._run_command(writer, write_lock, command, args, queries, tag)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _run_command(self, writer, write_lock, command, args, queries, tag):
+        self.commands += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        path, _, action = command.rpartition("/")
+        if path in self.fail_paths or (path not in self.resources and action != "cancel"):
+            await self._send(
+                writer, write_lock, [["!trap", "=message=no such command prefix"], ["!done"]], tag
+            )
+            return
+
+        rows = self.resources.get(path, [])
+        if action == "print":
+            matched = [r for r in rows if _matches(r, queries)]
+            proplist = args.get(".proplist")
+            if proplist:
+                fields = proplist.split(",")
+                matched = [{k: r[k] for k in fields if k in r} for r in matched]
+            replies = [["!re"] + [f"={k}={v}" for k, v in row.items()] for row in matched]
+            await self._send(writer, write_lock, replies + [["!done"]], tag)
+        elif action == "add":
+            new_id = f"*{next(self._ids):X}"
+            rows.append({".id": new_id, **args})
+            await self._send(writer, write_lock, [["!done", f"=ret={new_id}"]], tag)
+        elif action in ("set", "remove"):
+            target = [r for r in rows if r.get(".id") == args.get(".id")]
+            if not target:
+                await self._send(
+                    writer, write_lock, [["!trap", "=message=no such item"], ["!done"]], tag
+                )
+                return
+            if action == "set":
+                target[0].update({k: v for k, v in args.items() if k != ".id"})
+            else:
+                rows.remove(target[0])
+            await self._send(writer, write_lock, [["!done"]], tag)
+        else:
+            await self._send(writer, write_lock, [["!done"]], tag)
+
+    @staticmethod
+    async def _send(writer, write_lock, sentences: list[list[str]], tag: str | None):
+        data = b"".join(
+            encode_sentence(words + ([f".tag={tag}"] if tag is not None else []))
+            for words in sentences
+        )
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+
+async def selftest():
+    print("Testing AsyncRouterOsApi against FakeRouterOS...")
+    fake = FakeRouterOS(delay=0.2, fail_paths={"/system/health"})
+    port = await fake.start()
+
+    api = await AsyncRouterOsApi.connect("127.0.0.1", "admin", "admin", port=port, use_ssl=False)
+
+    # Concurrent commands on one connection (tagged)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    resource, identity, interfaces = await asyncio.gather(
+        api.get_resource("/system/resource").get(),
+        api.get_resource("/system/identity").get(),
+        api.get_resource("/interface").get(type="wlan"),
+    )
+    elapsed = loop.time() - started
+    assert resource[0]["board-name"] == "RB5009UG+S+"
+    assert identity[0]["name"] == "fake-router"
+    assert [i["name"] for i in interfaces] == ["wlan1"]
+    assert elapsed < 0.4, f"commands were not pipelined ({elapsed:.2f}s)"
+    print(f"✅ 3 concurrent commands in {elapsed:.2f}s")
+
+    # add / set / remove
+    added = await api.get_resource("/interface").add(name="vlan10", type="vlan")
+    new_id = added.done_message["ret"]
+    await api.get_resource("/interface").set(id=new_id, disabled="true")
+    assert (await api.get_resource("/interface").get(name="vlan10"))[0]["disabled"] == "true"
+    await api.get_resource("/interface").remove(id=new_id)
+    assert not await api.get_resource("/interface").get(name="vlan10")
+    print("✅ add/set/remove")
+
+    # Pipelined batch: optional commands that trap return []
+    started = loop.time()
+    resource, health = await run_batch_async(
+        api, [print_cmd("/system/resource"), print_cmd("/system/health", optional=True)]
+    )
+    assert resource and health == []
+    print(f"✅ batch of 2 in {loop.time() - started:.2f}s")
+
+    # OR query + .proplist
+    rows = await api.get_resource("/ip/arp").call(
+        "print",
+        {"proplist": "mac-address,address"},
+        any_of=(("mac-address", "AA:00:00:00:00:02"), ("mac-address", "AA:00:00:00:00:04")),
+    )
+    assert [r["address"] for r in rows] == ["10.0.0.2", "10.0.0.4"]
+    assert all(set(r) == {"mac-address", "address"} for r in rows)
+    print("✅ OR query with .proplist")
+
+    # !trap -> AsyncRouterOsError, connection still usable
+    try:
+        await api.get_resource("/system/health").get()
+        raise AssertionError("expected !trap")
+    except AsyncRouterOsError as e:
+        print(f"✅ trap raised: {e}")
+    assert (await api.get_resource("/system/identity").get())[0]["name"] == "fake-router"
+
+    # Bad credentials
+    try:
+        await AsyncRouterOsApi.connect("127.0.0.1", "admin", "wrong", port=port, use_ssl=False)
+        raise AssertionError("expected login failure")
+    except AsyncRouterOsError as e:
+        print(f"✅ login rejected: {e}")
+
+    await api.close()
+    await fake.stop()
+    print("🎉 All tests passed!")
+
+
+async def serve(args):
+    fake = FakeRouterOS(args.username, args.password, delay=args.delay)
+    port = await fake.start(args.host, args.port)
+    print(f"Fake RouterOS API listening on {args.host}:{port} (user={args.username})")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake RouterOS API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8728)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--delay", type=float, default=0.0, help="Latencia por comando (s)")
+    parser.add_argument("--selftest", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(selftest() if args.selftest else serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ document.addEventListener('alpine:init', () => {
 
         default_monitor_interval: '',
         monitor_max_workers: '',
+        monitor_schedule_mode: 'burst',
         dashboard_refresh_interval: '',
         backup_frequency: 'daily',
         backup_day_of_week: 'mon',
@@ -59,6 +60,7 @@ document.addEventListener('alpine:init', () => {
 
                 default_monitor_interval: this.default_monitor_interval,
                 monitor_max_workers: this.monitor_max_workers,
+                monitor_schedule_mode: this.monitor_schedule_mode,
                 dashboard_refresh_interval: this.dashboard_refresh_interval,
                 backup_frequency: this.backup_frequency,
                 backup_day_of_week: this.backup_day_of_week,